@@ -0,0 +1,40 @@
+"""add notification counters
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Contador de notificações não lidas por usuário
+    op.create_table(
+        'notification_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('unread_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    
+    # Preencher contadores a partir das notificações existentes
+    op.execute(
+        sa.text(
+            "INSERT INTO notification_counters (user_id, unread_count) "
+            "SELECT user_id, COUNT(*) FROM notifications "
+            "WHERE is_read = :lida OR is_read IS NULL "
+            "GROUP BY user_id"
+        ).bindparams(lida=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('notification_counters')
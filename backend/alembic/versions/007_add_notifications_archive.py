@@ -0,0 +1,42 @@
+"""add notifications archive
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Notificações lidas antigas movidas pela retenção
+    op.create_table(
+        'notifications_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('related_id', sa.Integer(), nullable=True),
+        sa.Column('related_type', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notifications_archive_user_id_created_at', 'notifications_archive', ['user_id', 'created_at'], unique=False)
+    
+    # Índice usado pela retenção para localizar notificações lidas antigas
+    op.create_index('ix_notifications_is_read_created_at', 'notifications', ['is_read', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_is_read_created_at', table_name='notifications')
+    op.drop_index('ix_notifications_archive_user_id_created_at', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
@@ -0,0 +1,42 @@
+"""add composite indexes for hot query predicates
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+# (nome do índice, tabela, colunas) - espelhados em __table_args__ dos models
+INDICES = [
+    ('ix_appointments_psychologist_id_date_status', 'appointments', ['psychologist_id', 'appointment_date', 'status']),
+    ('ix_appointments_user_id_status', 'appointments', ['user_id', 'status']),
+    ('ix_notifications_user_id_is_read_created_at', 'notifications', ['user_id', 'is_read', 'created_at']),
+    ('ix_reviews_psychologist_id_created_at', 'reviews', ['psychologist_id', 'created_at']),
+    ('ix_emotion_diaries_user_id_date', 'emotion_diaries', ['user_id', 'date']),
+    ('ix_forum_comments_post_id_created_at', 'forum_comments', ['post_id', 'created_at']),
+    ('ix_payments_appointment_id', 'payments', ['appointment_id']),
+    ('ix_psychologists_is_verified_rating', 'psychologists', ['is_verified', 'rating']),
+    ('ix_favorites_psychologist_id', 'favorites', ['psychologist_id']),
+    ('ix_psychologist_specialties_psychologist_id_specialty_id', 'psychologist_specialties', ['psychologist_id', 'specialty_id']),
+    ('ix_psychologist_specialties_specialty_id_psychologist_id', 'psychologist_specialties', ['specialty_id', 'psychologist_id']),
+    ('ix_psychologist_approaches_psychologist_id_approach_id', 'psychologist_approaches', ['psychologist_id', 'approach_id']),
+    ('ix_psychologist_approaches_approach_id_psychologist_id', 'psychologist_approaches', ['approach_id', 'psychologist_id']),
+]
+
+
+def upgrade() -> None:
+    for nome, tabela, colunas in INDICES:
+        op.create_index(nome, tabela, colunas, unique=False)
+
+
+def downgrade() -> None:
+    for nome, tabela, _ in reversed(INDICES):
+        op.drop_index(nome, table_name=tabela)
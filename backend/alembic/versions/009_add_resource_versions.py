@@ -0,0 +1,33 @@
+"""add version counters for ETags
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Versão do perfil do psicólogo (incrementada a cada alteração)
+    op.add_column('psychologists', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    
+    # Versões de recursos agregados (especialidades, abordagens, agenda por psicólogo)
+    op.create_table(
+        'resource_versions',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('resource_versions')
+    op.drop_column('psychologists', 'version')
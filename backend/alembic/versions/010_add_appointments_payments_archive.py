@@ -0,0 +1,73 @@
+"""add appointments and payments archive
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Agendamentos encerrados antigos; no PostgreSQL particionada por mês
+    # (partições criadas pelo arquivamento, ver app/particionamento.py)
+    op.create_table(
+        'appointments_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('appointment_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('psychologist_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('appointment_type', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('rejection_reason', sa.Text(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('payment_status', sa.String(), nullable=True),
+        sa.Column('payment_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'appointment_date'),
+        postgresql_partition_by='RANGE (appointment_date)'
+    )
+    op.create_index('ix_appointments_archive_user_id_date', 'appointments_archive', ['user_id', 'appointment_date'], unique=False)
+    op.create_index('ix_appointments_archive_psychologist_id_date', 'appointments_archive', ['psychologist_id', 'appointment_date'], unique=False)
+    
+    # Pagamentos dos agendamentos arquivados; no PostgreSQL particionada por mês
+    op.create_table(
+        'payments_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('appointment_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('payment_method', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('payment_id', sa.String(), nullable=True),
+        sa.Column('transaction_id', sa.String(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_payments_archive_user_id_created_at', 'payments_archive', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_payments_archive_appointment_id', 'payments_archive', ['appointment_id'], unique=False)
+    
+    # Índice usado pelo arquivamento para localizar agendamentos encerrados antigos
+    op.create_index('ix_appointments_status_date', 'appointments', ['status', 'appointment_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointments_status_date', table_name='appointments')
+    op.drop_index('ix_payments_archive_appointment_id', table_name='payments_archive')
+    op.drop_index('ix_payments_archive_user_id_created_at', table_name='payments_archive')
+    op.drop_table('payments_archive')
+    op.drop_index('ix_appointments_archive_psychologist_id_date', table_name='appointments_archive')
+    op.drop_index('ix_appointments_archive_user_id_date', table_name='appointments_archive')
+    op.drop_table('appointments_archive')
@@ -0,0 +1,66 @@
+"""notifications archive surrogate key
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def _criar_tabela(nome: str, chave_propria: bool) -> None:
+    colunas = [sa.Column('id', sa.Integer(), nullable=False)]
+    if chave_propria:
+        colunas.append(sa.Column('notification_id', sa.Integer(), nullable=False))
+    op.create_table(
+        nome,
+        *colunas,
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('related_id', sa.Integer(), nullable=True),
+        sa.Column('related_type', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+COLUNAS = "user_id, title, message, type, related_id, related_type, created_at, archived_at"
+
+
+def upgrade() -> None:
+    # O ID da notificação original deixa de ser a chave: no SQLite ele pode ser
+    # reutilizado depois que as notificações com os maiores IDs são arquivadas
+    _criar_tabela('notifications_archive_new', chave_propria=True)
+    op.execute(
+        f"INSERT INTO notifications_archive_new (notification_id, {COLUNAS}) "
+        f"SELECT id, {COLUNAS} FROM notifications_archive ORDER BY id"
+    )
+    op.drop_index('ix_notifications_archive_user_id_created_at', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
+    op.rename_table('notifications_archive_new', 'notifications_archive')
+    op.create_index('ix_notifications_archive_user_id_created_at', 'notifications_archive', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_notifications_archive_notification_id', 'notifications_archive', ['notification_id'], unique=False)
+
+
+def downgrade() -> None:
+    # IDs repetidos no arquivo (reutilizados) ficam só com a cópia mais recente
+    _criar_tabela('notifications_archive_old', chave_propria=False)
+    op.execute(
+        f"INSERT INTO notifications_archive_old (id, {COLUNAS}) "
+        f"SELECT notification_id, {COLUNAS} FROM notifications_archive "
+        f"WHERE id IN (SELECT MAX(id) FROM notifications_archive GROUP BY notification_id)"
+    )
+    op.drop_index('ix_notifications_archive_notification_id', table_name='notifications_archive')
+    op.drop_index('ix_notifications_archive_user_id_created_at', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
+    op.rename_table('notifications_archive_old', 'notifications_archive')
+    op.create_index('ix_notifications_archive_user_id_created_at', 'notifications_archive', ['user_id', 'created_at'], unique=False)
@@ -0,0 +1,44 @@
+"""appointments and payments autoincrement on sqlite
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+# Tabela -> tabela de arquivo com os mesmos IDs
+TABELAS = {'appointments': 'appointments_archive', 'payments': 'payments_archive'}
+
+
+def upgrade() -> None:
+    # No SQLite, INTEGER PRIMARY KEY sem AUTOINCREMENT reutiliza os maiores IDs
+    # depois que eles saem da tabela (arquivamento). No PostgreSQL as sequences
+    # já não reutilizam IDs.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for tabela, arquivo in TABELAS.items():
+        with op.batch_alter_table(tabela, recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+        # A sequência começa depois do maior ID já usado, inclusive os arquivados
+        op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{tabela}'")
+        op.execute(
+            f"INSERT INTO sqlite_sequence (name, seq) SELECT '{tabela}', MAX("
+            f"(SELECT COALESCE(MAX(id), 0) FROM {tabela}), "
+            f"(SELECT COALESCE(MAX(id), 0) FROM {arquivo}))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for tabela in TABELAS:
+        with op.batch_alter_table(tabela, recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+            pass
@@ -0,0 +1,27 @@
+"""appointments user index with appointment_date
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Listagem do usuário filtra por status e ordena por data: com (user_id, status)
+    # o planner do SQLite trocava o índice por ix_appointments_status_date
+    op.create_index('ix_appointments_user_id_status_date', 'appointments', ['user_id', 'status', 'appointment_date'], unique=False)
+    op.drop_index('ix_appointments_user_id_status', table_name='appointments')
+
+
+def downgrade() -> None:
+    op.create_index('ix_appointments_user_id_status', 'appointments', ['user_id', 'status'], unique=False)
+    op.drop_index('ix_appointments_user_id_status_date', table_name='appointments')
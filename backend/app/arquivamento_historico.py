@@ -0,0 +1,134 @@
+"""
+Arquivamento de histórico: move agendamentos encerrados antigos (e os
+pagamentos deles) para appointments_archive e payments_archive em lotes
+
+As listagens por usuário e por psicólogo leem só appointments/payments, que
+ficam com os dados recentes ou em andamento; o histórico arquivado só é lido
+quando pedido (include_history nos endpoints, incluir_historico nos models).
+No PostgreSQL as tabelas de arquivo são particionadas por mês e as partições
+são criadas automaticamente a cada lote (ver app/particionamento.py); no
+SQLite são tabelas comuns.
+
+Configuração:
+- APPOINTMENT_ARCHIVE_MONTHS: idade mínima, em meses, de um agendamento
+  encerrado (completed, cancelled, rejected) para ser arquivado (padrão 12;
+  0 desativa)
+- HISTORY_ARCHIVE_BATCH_SIZE: agendamentos movidos por transação (500)
+- HISTORY_ARCHIVE_INTERVAL_HOURS: intervalo da execução periódica iniciada
+  junto com a aplicação (0 desativa; use o script arquivar_historico.py em
+  um agendador externo)
+"""
+import calendar
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from dotenv import load_dotenv
+from app.models.arquivo_agendamento import AppointmentArchive
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+MESES_ARQUIVAMENTO = int(os.getenv("APPOINTMENT_ARCHIVE_MONTHS", "12"))
+TAMANHO_LOTE_HISTORICO = int(os.getenv("HISTORY_ARCHIVE_BATCH_SIZE", "500"))
+INTERVALO_ARQUIVAMENTO_HORAS = float(os.getenv("HISTORY_ARCHIVE_INTERVAL_HOURS", "0"))
+
+def limite_por_meses(meses: int, agora: Optional[datetime] = None) -> datetime:
+    """Mesmo dia, `meses` meses antes (limitado ao último dia do mês)"""
+    agora = agora or datetime.now(timezone.utc)
+    ano, mes = divmod(agora.year * 12 + agora.month - 1 - meses, 12)
+    mes += 1
+    return agora.replace(year=ano, month=mes, day=min(agora.day, calendar.monthrange(ano, mes)[1]))
+
+
+class ResultadoArquivamento:
+    """Métricas de uma execução do arquivamento"""
+    
+    def __init__(self):
+        self.agendamentos = 0
+        self.pagamentos = 0
+        self.lotes = 0
+        self.segundos = 0.0
+        self.limite_data: Optional[datetime] = None
+        self.iniciado_em = datetime.now(timezone.utc)
+    
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.iniciado_em.isoformat(),
+            "cutoff": self.limite_data.isoformat() if self.limite_data else None,
+            "appointments_moved": self.agendamentos,
+            "payments_moved": self.pagamentos,
+            "batches": self.lotes,
+            "duration_seconds": round(self.segundos, 3)
+        }
+
+
+ultimo_resultado: Optional[ResultadoArquivamento] = None
+
+def executar_arquivamento(
+    meses: Optional[int] = None,
+    tamanho_lote: Optional[int] = None,
+    agora: Optional[datetime] = None
+) -> ResultadoArquivamento:
+    """Arquivar agendamentos encerrados mais antigos que `meses`, lote a lote"""
+    global ultimo_resultado
+    
+    meses = MESES_ARQUIVAMENTO if meses is None else meses
+    tamanho_lote = tamanho_lote or TAMANHO_LOTE_HISTORICO
+    
+    resultado = ResultadoArquivamento()
+    inicio = time.perf_counter()
+    
+    if meses > 0:
+        resultado.limite_data = limite_por_meses(meses, agora)
+        while True:
+            agendamentos, pagamentos = AppointmentArchive.arquivar_lote(resultado.limite_data, tamanho_lote)
+            if not agendamentos:
+                break
+            resultado.lotes += 1
+            resultado.agendamentos += agendamentos
+            resultado.pagamentos += pagamentos
+            if agendamentos < tamanho_lote:
+                break
+    
+    resultado.segundos = time.perf_counter() - inicio
+    ultimo_resultado = resultado
+    logger.info(
+        "Arquivamento de histórico: %s agendamento(s) e %s pagamento(s) em %s lote(s), %.2fs",
+        resultado.agendamentos, resultado.pagamentos, resultado.lotes, resultado.segundos
+    )
+    return resultado
+
+
+class AgendadorArquivamento:
+    """Thread que executa o arquivamento periodicamente"""
+    
+    def __init__(self, intervalo_horas: float = INTERVALO_ARQUIVAMENTO_HORAS):
+        self.intervalo_horas = intervalo_horas
+        self._parar = threading.Event()
+        self._thread = None
+    
+    def iniciar(self) -> None:
+        if self.intervalo_horas <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="arquivamento-historico", daemon=True)
+        self._thread.start()
+    
+    def parar(self, timeout: float = 5.0) -> None:
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+    
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo_horas * 3600):
+            try:
+                executar_arquivamento()
+            except Exception:
+                logger.exception("Falha no arquivamento de histórico")
+
+
+agendador_arquivamento = AgendadorArquivamento()
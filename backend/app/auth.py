@@ -1,18 +1,29 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect
+from app.database import SessionLocal
 from app.models.usuario import User
+from app.cache_autenticacao import cache_principal
+from app.replicas import definir_usuario_atual
+from starlette.concurrency import run_in_threadpool
+from app.senhas import verificar_senha, gerar_hash_senha, precisa_rehash
+from app.pool_senhas import pool_senhas, PoolSenhasCheio
 import os
+import threading
+import time
+import uuid
 from dotenv import load_dotenv
-import bcrypt
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
+# O frontend ainda não usa /api/auth/refresh: reduzir só quando o cliente renovar o token
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
 # Usar bcrypt diretamente para evitar problemas com passlib
 # O passlib tem problemas de compatibilidade com algumas versões do bcrypt
@@ -22,55 +33,33 @@ USE_PASSLIB = False
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 def verify_password(plain_password, hashed_password):
-    """Verifica se a senha está correta usando bcrypt diretamente"""
-    try:
-        # Bcrypt tem limite de 72 bytes, truncar se necessário
-        if isinstance(plain_password, str):
-            password_bytes = plain_password.encode('utf-8')
-        else:
-            password_bytes = plain_password
-        
-        # Truncar se exceder 72 bytes
-        if len(password_bytes) > 72:
-            password_bytes = password_bytes[:72]
-        
-        # Converter hashed_password para bytes se necessário
-        if isinstance(hashed_password, str):
-            hashed_bytes = hashed_password.encode('utf-8')
-        else:
-            hashed_bytes = hashed_password
-        
-        # Usar bcrypt diretamente
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
-    except Exception:
-        return False
+    """Verifica se a senha está correta (síncrono, usado por scripts)"""
+    return verificar_senha(plain_password, hashed_password)
 
 def get_password_hash(password):
-    """Gera hash da senha usando bcrypt diretamente"""
+    """Gera hash da senha (síncrono, usado por scripts)"""
+    return gerar_hash_senha(password)
+
+def _servidor_ocupado() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Servidor ocupado, tente novamente em instantes",
+        headers={"Retry-After": "1"},
+    )
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    """Verifica a senha no pool de senhas (429 se o pool estiver cheio)"""
     try:
-        # Bcrypt tem limite de 72 bytes, garantir que não exceda
-        if isinstance(password, str):
-            password_bytes = password.encode('utf-8')
-        else:
-            password_bytes = password
-        
-        # Truncar se necessário (muito raro, mas por segurança)
-        if len(password_bytes) > 72:
-            password_bytes = password_bytes[:72]
-        
-        # Usar bcrypt diretamente
-        salt = bcrypt.gensalt(rounds=12)
-        hashed = bcrypt.hashpw(password_bytes, salt)
-        return hashed.decode('utf-8')
-    except Exception:
-        # Fallback em caso de erro
-        salt = bcrypt.gensalt(rounds=12)
-        if isinstance(password, str):
-            password = password.encode('utf-8')
-        if len(password) > 72:
-            password = password[:72]
-        hashed = bcrypt.hashpw(password, salt)
-        return hashed.decode('utf-8')
+        return await pool_senhas.verificar(plain_password, hashed_password)
+    except PoolSenhasCheio:
+        raise _servidor_ocupado()
+
+async def get_password_hash_async(password) -> str:
+    """Gera hash da senha no pool de senhas (429 se o pool estiver cheio)"""
+    try:
+        return await pool_senhas.gerar_hash(password)
+    except PoolSenhasCheio:
+        raise _servidor_ocupado()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -78,10 +67,122 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.setdefault("type", "access")
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    to_encode.update({"exp": expire, "iat": time.time()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
+    expires_delta = expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    return create_access_token({**data, "type": "refresh"}, expires_delta=expires_delta)
+
+def montar_claims(usuario) -> dict:
+    """Claims de identidade e papéis embutidas nos tokens"""
+    papeis = []
+    if usuario.eh_admin:
+        papeis.append("admin")
+    if usuario.eh_psicologo:
+        papeis.append("psychologist")
+    return {
+        "sub": usuario.email,
+        "uid": usuario.id,
+        "psid": getattr(usuario, "id_psicologo", None),
+        "roles": papeis,
+        "active": bool(usuario.esta_ativo)
+    }
+
+def criar_tokens(usuario) -> dict:
+    """Emitir par de tokens (acesso curto + refresh) para o usuário"""
+    claims = montar_claims(usuario)
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": create_refresh_token({"sub": claims["sub"], "uid": claims["uid"]}),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+
+class ListaRevogacao:
+    """Tokens revogados mantidos em memória
+
+    Guarda o jti de tokens revogados apenas até a expiração de cada um e, por
+    usuário, o instante a partir do qual tokens emitidos antes são inválidos
+    (usado quando flags do usuário mudam).
+    """
+    
+    def __init__(self):
+        self._jtis: Dict[str, float] = {}
+        self._usuarios: Dict[int, float] = {}
+        self._lock = threading.Lock()
+    
+    def revogar(self, payload: dict) -> None:
+        """Revogar um token decodificado até a sua expiração"""
+        jti = payload.get("jti")
+        if not jti:
+            return
+        with self._lock:
+            self._jtis[jti] = float(payload.get("exp", time.time()))
+            self._limpar()
+    
+    def revogar_usuario(self, id_usuario: int) -> None:
+        """Invalidar todos os tokens do usuário emitidos até agora"""
+        with self._lock:
+            self._usuarios[id_usuario] = time.time()
+            self._limpar()
+    
+    def esta_revogado(self, payload: dict) -> bool:
+        with self._lock:
+            if payload.get("jti") in self._jtis:
+                return True
+            revogado_em = self._usuarios.get(payload.get("uid"))
+        return revogado_em is not None and float(payload.get("iat", 0)) <= revogado_em
+    
+    def _limpar(self) -> None:
+        agora = time.time()
+        self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > agora}
+        vida_maxima = REFRESH_TOKEN_EXPIRE_DAYS * 86400
+        self._usuarios = {uid: t for uid, t in self._usuarios.items() if t + vida_maxima > agora}
+
+
+lista_revogacao = ListaRevogacao()
+
+_ATRIBUTOS_CLAIMS = ("email", "esta_ativo", "eh_admin", "eh_psicologo")
+
+@event.listens_for(SessionLocal, "before_flush")
+def _registrar_claims_alteradas(sessao, contexto, instancias) -> None:
+    alterados = sessao.info.setdefault("claims_alteradas", set())
+    for objeto in sessao.dirty:
+        if isinstance(objeto, User):
+            estado = inspect(objeto)
+            if any(estado.attrs[nome].history.has_changes() for nome in _ATRIBUTOS_CLAIMS):
+                alterados.add(objeto.id)
+    for objeto in sessao.deleted:
+        if isinstance(objeto, User):
+            alterados.add(objeto.id)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _revogar_claims_alteradas(sessao) -> None:
+    for id_usuario in sessao.info.pop("claims_alteradas", ()):
+        lista_revogacao.revogar_usuario(id_usuario)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_claims_alteradas(sessao) -> None:
+    sessao.info.pop("claims_alteradas", None)
+
+
+class PrincipalToken:
+    """Usuário autenticado montado apenas a partir das claims do token"""
+    
+    def __init__(self, payload: dict):
+        papeis = payload.get("roles") or []
+        self.id = payload["uid"]
+        self.email = payload["sub"]
+        self.id_psicologo = payload.get("psid")
+        self.eh_admin = "admin" in papeis
+        self.eh_psicologo = "psychologist" in papeis
+        self.esta_ativo = payload.get("active", True)
+
 def authenticate_user(email: str, password: str):
     user = User.obter_por_email(email)
     if not user:
@@ -90,26 +191,76 @@ def authenticate_user(email: str, password: str):
         return False
     return user
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme)
-):
-    credentials_exception = HTTPException(
+async def authenticate_user_async(email: str, password: str):
+    """Autenticar sem bloquear o event loop, refazendo o hash se o custo mudou"""
+    user = await run_in_threadpool(User.obter_por_email, email)
+    if not user:
+        return False
+    if not await verify_password_async(password, user.senha_hash):
+        return False
+    if precisa_rehash(user.senha_hash):
+        try:
+            novo_hash = await pool_senhas.gerar_hash(password)
+            user = await run_in_threadpool(user.atualizar, senha_hash=novo_hash)
+        except PoolSenhasCheio:
+            # Rehash é oportunista: tenta de novo no próximo login
+            pass
+    return user
+
+def _credenciais_invalidas() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decodificar_token(token: str, tipo: str = "access") -> dict:
+    """Validar assinatura, expiração, tipo e revogação do token"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    user = User.obter_por_email(email)
+        raise _credenciais_invalidas()
+    # Tokens antigos não têm "type" e são tratados como tokens de acesso
+    if payload.get("sub") is None or payload.get("type", "access") != tipo:
+        raise _credenciais_invalidas()
+    if lista_revogacao.esta_revogado(payload):
+        raise _credenciais_invalidas()
+    return payload
+
+async def obter_usuario_por_email(email: str):
+    """Usuário do cache ou, em caso de falha, do banco (fora do event loop)"""
+    user = cache_principal.obter_em_cache(email)
     if user is None:
-        raise credentials_exception
+        user = await run_in_threadpool(cache_principal.obter, email)
     return user
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme)
+):
+    payload = decodificar_token(token)
+    # Usuário, ID do perfil de psicólogo e flags vêm do cache quando disponíveis
+    user = await obter_usuario_por_email(payload["sub"])
+    if user is None:
+        raise _credenciais_invalidas()
+    definir_usuario_atual(user.id)
+    return user
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme)
+):
+    """Usuário autenticado a partir das claims do token, sem acessar o banco"""
+    payload = decodificar_token(token)
+    if "uid" not in payload:
+        # Token emitido antes das claims de papéis
+        user = await obter_usuario_por_email(payload["sub"])
+        if user is None:
+            raise _credenciais_invalidas()
+        definir_usuario_atual(user.id)
+        return user
+    principal = PrincipalToken(payload)
+    definir_usuario_atual(principal.id)
+    return principal
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ):
@@ -118,8 +269,11 @@ async def get_current_active_user(
     return current_user
 
 async def get_current_admin(
-    current_user: User = Depends(get_current_active_user)
+    current_user: PrincipalToken = Depends(get_current_principal)
 ):
+    """Exigir administrador (respondido pelas claims do token)"""
+    if not current_user.esta_ativo:
+        raise HTTPException(status_code=400, detail="Inactive user")
     if not current_user.eh_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,293 @@
+"""
+Cache read-through com TTL e invalidação por tags
+
+Os métodos de leitura dos models são decorados com @em_cache: na falha o
+método roda normalmente e o resultado é guardado; no acerto o banco não é
+consultado. Cada entrada carrega tags (ex.: "psychologist:42") e é descartada
+quando alguma delas é invalidada.
+
+Objetos ORM não são guardados diretamente (estariam ligados a uma sessão e
+seriam compartilhados entre requisições): o cache guarda um retrato das
+colunas e dos relacionamentos já carregados, e cada acerto monta instâncias
+destacadas (detached) novas, com os mesmos atributos carregados do original.
+
+Invalidação: todo commit pelo ORM que inclui, altera ou remove uma instância
+de um model com tags_cache() (o que inclui atualizar/deletar dos models)
+invalida essas tags no after_commit. A invalidação incrementa a versão da
+tag no backend; entradas gravadas com versão anterior deixam de valer.
+
+Backends (CACHE_BACKEND):
+- memory: LRU em memória do processo (padrão)
+- shared: backend compartilhado entre processos. A implementação local
+  (BackendCompartilhadoLocal) serializa os valores com pickle, como faria um
+  servidor externo, e serve de substituto em desenvolvimento e testes; um
+  cliente real precisa apenas implementar a mesma interface de BackendCache
+
+Configuração:
+- CACHE_ENABLED: ativa o cache (padrão true)
+- CACHE_BACKEND: memory ou shared (padrão memory)
+- CACHE_DEFAULT_TTL_SECONDS: TTL padrão das entradas (padrão 60)
+- CACHE_MAX_ENTRIES: máximo de entradas do backend em memória (padrão 10000)
+"""
+import functools
+import inspect as inspecao
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app.database import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_DEFAULT_TTL_SECONDS = float(os.getenv("CACHE_DEFAULT_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+# Entrada: (valor, versões das tags no momento da gravação)
+Entrada = Tuple[Any, Dict[str, int]]
+
+
+class BackendCache:
+    """Interface dos backends de armazenamento"""
+    
+    def obter(self, chave: str) -> Optional[Entrada]:
+        raise NotImplementedError
+    
+    def gravar(self, chave: str, entrada: Entrada, ttl: float) -> None:
+        raise NotImplementedError
+    
+    def remover(self, chave: str) -> None:
+        raise NotImplementedError
+    
+    def versoes(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Versão atual de cada tag (0 se nunca foi invalidada)"""
+        raise NotImplementedError
+    
+    def incrementar_versao(self, tag: str) -> None:
+        raise NotImplementedError
+    
+    def limpar(self) -> None:
+        raise NotImplementedError
+    
+    def tamanho(self) -> int:
+        raise NotImplementedError
+
+
+class BackendMemoria(BackendCache):
+    """LRU em memória com TTL por entrada"""
+    
+    def __init__(self, maximo: int = CACHE_MAX_ENTRIES):
+        self.maximo = maximo
+        self._entradas: "OrderedDict[str, Tuple[float, Entrada]]" = OrderedDict()
+        self._versoes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def obter(self, chave: str) -> Optional[Entrada]:
+        with self._lock:
+            item = self._entradas.get(chave)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._entradas[chave]
+                return None
+            self._entradas.move_to_end(chave)
+            return item[1]
+    
+    def gravar(self, chave: str, entrada: Entrada, ttl: float) -> None:
+        with self._lock:
+            self._entradas[chave] = (time.monotonic() + ttl, entrada)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+    
+    def remover(self, chave: str) -> None:
+        with self._lock:
+            self._entradas.pop(chave, None)
+    
+    def versoes(self, tags: Iterable[str]) -> Dict[str, int]:
+        return {tag: self._versoes.get(tag, 0) for tag in tags}
+    
+    def incrementar_versao(self, tag: str) -> None:
+        with self._lock:
+            self._versoes[tag] = self._versoes.get(tag, 0) + 1
+    
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+    
+    def tamanho(self) -> int:
+        return len(self._entradas)
+
+
+class BackendCompartilhadoLocal(BackendMemoria):
+    """Substituto local de um backend compartilhado: valores trafegam serializados"""
+    
+    def obter(self, chave: str) -> Optional[Entrada]:
+        dados = super().obter(chave)
+        return pickle.loads(dados) if dados is not None else None
+    
+    def gravar(self, chave: str, entrada: Entrada, ttl: float) -> None:
+        super().gravar(chave, pickle.dumps(entrada, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+
+
+def criar_backend(nome: str = CACHE_BACKEND) -> BackendCache:
+    if nome == "shared":
+        return BackendCompartilhadoLocal()
+    if nome != "memory":
+        logger.warning("CACHE_BACKEND desconhecido (%s), usando memory", nome)
+    return BackendMemoria()
+
+
+# Retratos de objetos ORM
+def _retratar(valor: Any, visitados: frozenset = frozenset()) -> Any:
+    """Converter instância(s) ORM em estruturas simples com os atributos carregados"""
+    if isinstance(valor, list):
+        return [_retratar(item, visitados) for item in valor]
+    estado = inspect(valor, raiseerr=False)
+    if estado is None or not hasattr(estado, "mapper"):
+        return valor
+    
+    visitados = visitados | {id(valor)}
+    colunas = {
+        atributo.key: estado.dict[atributo.key]
+        for atributo in estado.mapper.column_attrs if atributo.key in estado.dict
+    }
+    relacoes = {}
+    for relacao in estado.mapper.relationships:
+        if relacao.key not in estado.dict:
+            continue
+        relacionado = estado.dict[relacao.key]
+        if relacao.uselist:
+            relacoes[relacao.key] = [_retratar(item, visitados) for item in relacionado if id(item) not in visitados]
+        elif relacionado is None or id(relacionado) not in visitados:
+            relacoes[relacao.key] = _retratar(relacionado, visitados) if relacionado is not None else None
+    return ("__orm__", estado.mapper.class_, colunas, relacoes)
+
+def _montar(retrato: Any) -> Any:
+    """Instâncias destacadas novas a partir do retrato"""
+    if isinstance(retrato, list):
+        return [_montar(item) for item in retrato]
+    if not (isinstance(retrato, tuple) and len(retrato) == 4 and retrato[0] == "__orm__"):
+        return retrato
+    _, modelo, colunas, relacoes = retrato
+    objeto = modelo(**colunas)
+    make_transient_to_detached(objeto)
+    for chave, relacionado in relacoes.items():
+        set_committed_value(objeto, chave, _montar(relacionado))
+    return objeto
+
+
+class Cache:
+    """Cache read-through com tags e contagem de acertos/falhas por namespace"""
+    
+    def __init__(self, backend: Optional[BackendCache] = None, ttl_padrao: float = CACHE_DEFAULT_TTL_SECONDS):
+        self.backend = backend or criar_backend()
+        self.ttl_padrao = ttl_padrao
+        self.ativo = CACHE_ENABLED
+        self._contadores: Dict[str, List[int]] = {}
+        self._geracao = 0
+        self._lock = threading.Lock()
+    
+    def obter_ou_carregar(
+        self,
+        namespace: str,
+        chave: str,
+        carregar: Callable[[], Any],
+        tags: Optional[Callable[[Any], Iterable[str]]] = None,
+        ttl: Optional[float] = None
+    ) -> Any:
+        """Valor em cache ou resultado de carregar() (None não é guardado)"""
+        contadores = self._contadores.setdefault(namespace, [0, 0])
+        if not self.ativo:
+            return carregar()
+        
+        chave_completa = f"{namespace}:{chave}"
+        entrada = self.backend.obter(chave_completa)
+        if entrada is not None:
+            retrato, versoes = entrada
+            if self.backend.versoes(versoes) == versoes:
+                contadores[0] += 1
+                return _montar(retrato)
+            self.backend.remover(chave_completa)
+        contadores[1] += 1
+        
+        with self._lock:
+            geracao = self._geracao
+        valor = carregar()
+        if valor is None:
+            return valor
+        versoes = self.backend.versoes(tags(valor) if tags else [])
+        with self._lock:
+            # Houve invalidação durante a carga: não guardar dado possivelmente antigo
+            if geracao != self._geracao:
+                return valor
+        self.backend.gravar(chave_completa, (_retratar(valor), versoes), self.ttl_padrao if ttl is None else ttl)
+        return valor
+    
+    def invalidar_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            self._geracao += 1
+        for tag in set(tags):
+            self.backend.incrementar_versao(tag)
+    
+    def limpar(self) -> None:
+        self.backend.limpar()
+    
+    def estatisticas(self) -> Dict[str, Dict[str, int]]:
+        """Acertos e falhas por namespace"""
+        return {
+            namespace: {"hits": acertos, "misses": falhas}
+            for namespace, (acertos, falhas) in list(self._contadores.items())
+        }
+    
+    def namespaces(self) -> List[str]:
+        return list(self._contadores)
+
+
+cache = Cache()
+
+def em_cache(namespace: str, tags: Optional[Callable[[Any], Iterable[str]]] = None, ttl: Optional[float] = None):
+    """Decorator read-through para classmethods de models (aplicar abaixo do @classmethod)"""
+    def decorador(funcao):
+        assinatura = inspecao.signature(funcao)
+        cache._contadores.setdefault(namespace, [0, 0])
+        
+        @functools.wraps(funcao)
+        def envoltorio(cls, *args, **kwargs):
+            argumentos = assinatura.bind(cls, *args, **kwargs)
+            argumentos.apply_defaults()
+            chave = ":".join(repr(valor) for nome, valor in list(argumentos.arguments.items())[1:])
+            return cache.obter_ou_carregar(
+                namespace, chave, lambda: funcao(cls, *args, **kwargs), tags=tags, ttl=ttl
+            )
+        return envoltorio
+    return decorador
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _registrar_tags_alteradas(sessao, contexto) -> None:
+    tags = sessao.info.setdefault("tags_cache_alteradas", set())
+    for objeto in list(sessao.new) + list(sessao.dirty) + list(sessao.deleted):
+        tags_cache = getattr(objeto, "tags_cache", None)
+        if tags_cache is not None:
+            tags.update(tags_cache())
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidar_apos_commit(sessao) -> None:
+    tags = sessao.info.pop("tags_cache_alteradas", None)
+    if tags:
+        cache.invalidar_tags(tags)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_tags(sessao) -> None:
+    sessao.info.pop("tags_cache_alteradas", None)
@@ -0,0 +1,140 @@
+"""
+Cache do usuário autenticado (principal) usado por get_current_user
+
+Guarda, por subject do token (email), um retrato das colunas do usuário
+junto com o ID do perfil de psicólogo e a flag de verificação, evitando
+consultas ao banco a cada requisição autenticada. As entradas expiram após
+AUTH_CACHE_TTL_SECONDS e são invalidadas após o commit de qualquer alteração
+em User ou Psychologist feita pelo ORM neste processo.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import make_transient_to_detached
+from app.database import SessionLocal, get_db_session
+from app.models.usuario import User
+from app.models.psicologo import Psychologist
+
+load_dotenv()
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+_COLUNAS_USUARIO = [coluna.key for coluna in inspect(User).column_attrs]
+
+
+class CachePrincipal:
+    """Cache LRU com TTL dos principais autenticados"""
+    
+    def __init__(self, ttl: float = AUTH_CACHE_TTL_SECONDS, maximo: int = AUTH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.maximo = maximo
+        self.acertos = 0
+        self.falhas = 0
+        self._entradas: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._emails_por_id = {}
+        self._geracao = 0
+        self._lock = threading.Lock()
+    
+    def obter_em_cache(self, email: str) -> Optional[User]:
+        """Obter o usuário apenas se estiver em cache (nunca consulta o banco)"""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entrada = self._entradas.get(email)
+            if entrada and entrada[0] > time.monotonic():
+                self._entradas.move_to_end(email)
+                self.acertos += 1
+                return self._montar_usuario(entrada[1])
+        return None
+    
+    def obter(self, email: str) -> Optional[User]:
+        """Obter o usuário autenticado, consultando o banco apenas em caso de falha"""
+        usuario = self.obter_em_cache(email)
+        if usuario is not None:
+            return usuario
+        with self._lock:
+            self.falhas += 1
+            geracao = self._geracao
+        
+        dados = self._carregar(email)
+        if dados is None:
+            return None
+        if self.ttl > 0:
+            with self._lock:
+                if geracao != self._geracao:
+                    # Houve invalidação durante a consulta: não guardar dado possivelmente antigo
+                    return self._montar_usuario(dados)
+                self._entradas[email] = (time.monotonic() + self.ttl, dados)
+                self._entradas.move_to_end(email)
+                self._emails_por_id[dados["id"]] = email
+                while len(self._entradas) > self.maximo:
+                    _, (_, dados_antigos) = self._entradas.popitem(last=False)
+                    self._emails_por_id.pop(dados_antigos["id"], None)
+        return self._montar_usuario(dados)
+    
+    def invalidar_usuario(self, id_usuario: int) -> None:
+        """Descartar a entrada de um usuário"""
+        with self._lock:
+            self._geracao += 1
+            email = self._emails_por_id.pop(id_usuario, None)
+            if email is not None:
+                self._entradas.pop(email, None)
+    
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._emails_por_id.clear()
+    
+    def _carregar(self, email: str) -> Optional[dict]:
+        """Carregar usuário e perfil de psicólogo em uma única consulta"""
+        db = get_db_session()
+        try:
+            linha = db.execute(
+                select(User, Psychologist.id, Psychologist.esta_verificado)
+                .outerjoin(Psychologist, Psychologist.id_usuario == User.id)
+                .where(User.email == email)
+            ).first()
+            if linha is None:
+                return None
+            usuario, id_psicologo, psicologo_verificado = linha
+            dados = {coluna: getattr(usuario, coluna) for coluna in _COLUNAS_USUARIO}
+            dados["id_psicologo"] = id_psicologo
+            dados["psicologo_verificado"] = bool(psicologo_verificado)
+            return dados
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _montar_usuario(dados: dict) -> User:
+        """Criar uma instância destacada (detached) própria para a requisição"""
+        usuario = User(**{coluna: dados[coluna] for coluna in _COLUNAS_USUARIO})
+        make_transient_to_detached(usuario)
+        usuario.id_psicologo = dados["id_psicologo"]
+        usuario.psicologo_verificado = dados["psicologo_verificado"]
+        return usuario
+
+
+cache_principal = CachePrincipal()
+
+@event.listens_for(SessionLocal, "before_flush")
+def _registrar_usuarios_alterados(sessao, contexto, instancias) -> None:
+    alterados = sessao.info.setdefault("usuarios_alterados", set())
+    for objeto in list(sessao.new) + list(sessao.dirty) + list(sessao.deleted):
+        if isinstance(objeto, User) and objeto.id is not None:
+            alterados.add(objeto.id)
+        elif isinstance(objeto, Psychologist) and objeto.id_usuario is not None:
+            alterados.add(objeto.id_usuario)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidar_apos_commit(sessao) -> None:
+    for id_usuario in sessao.info.pop("usuarios_alterados", ()):
+        cache_principal.invalidar_usuario(id_usuario)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_alterados(sessao) -> None:
+    sessao.info.pop("usuarios_alterados", None)
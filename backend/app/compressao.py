@@ -0,0 +1,204 @@
+"""
+Compressão de respostas negociada por Accept-Encoding
+
+Middleware ASGI que comprime com brotli (se o pacote estiver instalado) ou
+gzip, conforme a preferência do cliente e a ordem de COMPRESSION_ALGORITHMS.
+
+- Respostas completas abaixo de COMPRESSION_MIN_SIZE bytes saem sem compressão
+- StreamingResponse (exportações) é comprimida pedaço a pedaço, sem acumular
+  o corpo em memória
+- text/event-stream (SSE), respostas já codificadas, 204/304 e tipos binários
+  passam direto
+- O ETag vira fraco (W/) quando o corpo é comprimido: a representação muda,
+  mas a comparação do If-None-Match (app/etag.py) continua batendo
+
+Configuração:
+- COMPRESSION_ENABLED: ativa o middleware (padrão true)
+- COMPRESSION_MIN_SIZE: tamanho mínimo do corpo para comprimir (padrão 1024)
+- COMPRESSION_GZIP_LEVEL: nível do gzip, 1-9 (padrão 6)
+- COMPRESSION_BROTLI_QUALITY: qualidade do brotli, 0-11 (padrão 4)
+- COMPRESSION_ALGORITHMS: algoritmos em ordem de preferência (padrão "br,gzip")
+
+Bytes trafegados e custo de CPU por endpoint: benchmarks/compressao.py
+"""
+import os
+import zlib
+from typing import Optional
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+load_dotenv()
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ALGORITHMS = [
+    algoritmo.strip() for algoritmo in os.getenv("COMPRESSION_ALGORITHMS", "br,gzip").split(",") if algoritmo.strip()
+]
+
+_TIPOS_COMPRESSIVEIS = (
+    "application/json", "application/x-ndjson", "application/xml",
+    "application/javascript", "image/svg+xml", "text/"
+)
+_TIPOS_IGNORADOS = ("text/event-stream",)
+
+
+def algoritmos_disponiveis() -> list:
+    return [a for a in COMPRESSION_ALGORITHMS if a == "gzip" or (a == "br" and brotli is not None)]
+
+def escolher_codificacao(accept_encoding: Optional[str], algoritmos: Optional[list] = None) -> Optional[str]:
+    """Melhor codificação aceita pelo cliente (maior q; empate pela ordem do servidor)"""
+    if not accept_encoding:
+        return None
+    pesos = {}
+    for item in accept_encoding.split(","):
+        nome, _, parametros = item.strip().partition(";")
+        peso = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                peso = float(parametros[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nome.strip().lower()] = peso
+    
+    melhor, melhor_peso = None, 0.0
+    for algoritmo in (algoritmos if algoritmos is not None else algoritmos_disponiveis()):
+        peso = pesos.get(algoritmo, pesos.get("*", 0.0))
+        if peso > melhor_peso:
+            melhor, melhor_peso = algoritmo, peso
+    return melhor
+
+def compressivel(content_type: str) -> bool:
+    tipo = content_type.split(";")[0].strip().lower()
+    return tipo.startswith(_TIPOS_COMPRESSIVEIS) and not tipo.startswith(_TIPOS_IGNORADOS)
+
+def _enfraquecer_etag(cabecalhos: MutableHeaders) -> None:
+    etag = cabecalhos.get("etag")
+    if etag and not etag.startswith("W/"):
+        cabecalhos["ETag"] = f"W/{etag}"
+
+
+class Compressor:
+    """Interface comum para gzip e brotli em modo incremental"""
+    
+    def __init__(
+        self,
+        codificacao: str,
+        nivel_gzip: int = COMPRESSION_GZIP_LEVEL,
+        qualidade_brotli: int = COMPRESSION_BROTLI_QUALITY
+    ):
+        self.codificacao = codificacao
+        if codificacao == "br":
+            self._brotli = brotli.Compressor(quality=qualidade_brotli)
+        else:
+            self._zlib = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    
+    def comprimir(self, dados: bytes) -> bytes:
+        if self.codificacao == "br":
+            return self._brotli.process(dados)
+        return self._zlib.compress(dados)
+    
+    def finalizar(self) -> bytes:
+        if self.codificacao == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+def comprimir(dados: bytes, codificacao: str, **opcoes) -> bytes:
+    """Comprimir um corpo completo"""
+    compressor = Compressor(codificacao, **opcoes)
+    return compressor.comprimir(dados) + compressor.finalizar()
+
+
+class MiddlewareCompressao:
+    """Middleware ASGI de compressão (gzip/brotli) com suporte a streaming"""
+    
+    def __init__(
+        self,
+        app,
+        tamanho_minimo: int = COMPRESSION_MIN_SIZE,
+        nivel_gzip: int = COMPRESSION_GZIP_LEVEL,
+        qualidade_brotli: int = COMPRESSION_BROTLI_QUALITY
+    ):
+        self.app = app
+        self.tamanho_minimo = tamanho_minimo
+        self.nivel_gzip = nivel_gzip
+        self.qualidade_brotli = qualidade_brotli
+        self.algoritmos = algoritmos_disponiveis()
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding"), self.algoritmos)
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+        
+        inicio = None
+        compressor: Optional[Compressor] = None
+        direto = False
+        
+        async def enviar(mensagem):
+            nonlocal inicio, compressor, direto
+            tipo = mensagem["type"]
+            if tipo == "http.response.start":
+                inicio = mensagem
+                cabecalhos = Headers(raw=mensagem.get("headers", []))
+                direto = (
+                    mensagem["status"] < 200 or mensagem["status"] in (204, 304)
+                    or "content-encoding" in cabecalhos
+                    or not compressivel(cabecalhos.get("content-type", ""))
+                )
+                if mensagem["status"] == 304:
+                    # Mesmo ETag fraco que a resposta 200 comprimida teria
+                    _enfraquecer_etag(MutableHeaders(scope=inicio))
+                if direto:
+                    await send(inicio)
+                return
+            if tipo != "http.response.body" or direto:
+                await send(mensagem)
+                return
+            
+            corpo = mensagem.get("body", b"")
+            continua = mensagem.get("more_body", False)
+            cabecalhos = MutableHeaders(scope=inicio)
+            
+            if compressor is None:
+                cabecalhos.add_vary_header("Accept-Encoding")
+                if not continua and len(corpo) < self.tamanho_minimo:
+                    direto = True
+                    await send(inicio)
+                    await send(mensagem)
+                    return
+                compressor = Compressor(codificacao, self.nivel_gzip, self.qualidade_brotli)
+                cabecalhos["Content-Encoding"] = codificacao
+                _enfraquecer_etag(cabecalhos)
+                if continua:
+                    # Streaming: tamanho final desconhecido
+                    del cabecalhos["Content-Length"]
+                else:
+                    comprimido = compressor.comprimir(corpo) + compressor.finalizar()
+                    cabecalhos["Content-Length"] = str(len(comprimido))
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": comprimido})
+                    return
+                await send(inicio)
+            
+            comprimido = compressor.comprimir(corpo)
+            if not continua:
+                comprimido += compressor.finalizar()
+            if comprimido or not continua:
+                await send({"type": "http.response.body", "body": comprimido, "more_body": continua})
+        
+        await self.app(scope, receive, enviar)
@@ -1,43 +1,55 @@
 """
 Controllers package - Camada de controle (endpoints da API)
+
+Os módulos dos controllers são importados sob demanda: ROTAS lista cada
+router com prefixo e tags, e registrar_rotas() os importa e inclui na
+aplicação no startup. `from app.controllers import auth_router` continua
+funcionando (importa só o controller pedido).
 """
-from app.controllers.autenticacao_controller import router as auth_router
-from app.controllers.usuario_controller import router as user_router
-from app.controllers.psicologo_controller import router as psychologist_router
-from app.controllers.busca_controller import router as search_router
-from app.controllers.avaliacao_controller import router as review_router
-from app.controllers.agendamento_controller import router as appointment_router
-from app.controllers.favorito_controller import router as favorite_router
-from app.controllers.forum_controller import router as forum_router
-from app.controllers.diario_emocao_controller import router as emotion_diary_router
-from app.controllers.pagamento_controller import router as payment_router
-from app.controllers.metodo_pagamento_controller import router as payment_method_router
-from app.controllers.admin_controller import router as admin_router
-from app.controllers.disponibilidade_controller import router as availability_router
-from app.controllers.notificacao_controller import router as notification_router
-from app.controllers.questionario_controller import router as questionnaire_router
-from app.controllers.pre_registro_controller import router as pre_registration_router
-from app.controllers.saque_controller import router as withdrawal_router
-from app.controllers.mapa_tratamento_controller import router as treatment_map_router
-
-__all__ = [
-    "auth_router",
-    "user_router",
-    "psychologist_router",
-    "search_router",
-    "review_router",
-    "appointment_router",
-    "favorite_router",
-    "forum_router",
-    "emotion_diary_router",
-    "payment_router",
-    "payment_method_router",
-    "admin_router",
-    "availability_router",
-    "notification_router",
-    "questionnaire_router",
-    "pre_registration_router",
-    "withdrawal_router",
-    "treatment_map_router",
+import importlib
+from typing import List, Tuple
+
+# (nome exportado, módulo, prefixo, tags)
+ROTAS: List[Tuple[str, str, str, List[str]]] = [
+    ("auth_router", "autenticacao_controller", "/api/auth", ["auth"]),
+    ("user_router", "usuario_controller", "/api/users", ["users"]),
+    ("psychologist_router", "psicologo_controller", "/api/psychologists", ["psychologists"]),
+    ("search_router", "busca_controller", "/api/search", ["search"]),
+    ("review_router", "avaliacao_controller", "/api/reviews", ["reviews"]),
+    ("appointment_router", "agendamento_controller", "/api/appointments", ["appointments"]),
+    ("favorite_router", "favorito_controller", "/api/favorites", ["favorites"]),
+    ("forum_router", "forum_controller", "/api/forum", ["forum"]),
+    ("emotion_diary_router", "diario_emocao_controller", "/api/emotion-diary", ["emotion-diary"]),
+    ("payment_router", "pagamento_controller", "/api/payments", ["payments"]),
+    ("payment_method_router", "metodo_pagamento_controller", "/api/payment-methods", ["payment-methods"]),
+    ("admin_router", "admin_controller", "/api/admin", ["admin"]),
+    ("availability_router", "disponibilidade_controller", "/api/availability", ["availability"]),
+    ("notification_router", "notificacao_controller", "/api/notifications", ["notifications"]),
+    ("questionnaire_router", "questionario_controller", "/api/questionnaires", ["questionnaires"]),
+    ("pre_registration_router", "pre_registro_controller", "/api/pre-registration", ["pre-registration"]),
+    ("withdrawal_router", "saque_controller", "/api/withdrawals", ["withdrawals"]),
+    ("treatment_map_router", "mapa_tratamento_controller", "/api/treatment-map", ["treatment-map"]),
+    ("debug_router", "depuracao_controller", "/api/debug", ["debug"]),
+    ("metrics_router", "metricas_controller", "/metrics", ["metrics"]),
 ]
 
+_MODULOS = {nome: modulo for nome, modulo, _, _ in ROTAS}
+
+
+def __getattr__(nome: str):
+    """Importar o router na primeira vez que ele é acessado"""
+    modulo = _MODULOS.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    router = importlib.import_module(f"{__name__}.{modulo}").router
+    globals()[nome] = router
+    return router
+
+def registrar_rotas(app, ignorar: Tuple[str, ...] = ()) -> None:
+    """Importar os controllers e incluir os routers na aplicação"""
+    for nome, _, prefixo, tags in ROTAS:
+        if nome not in ignorar:
+            app.include_router(__getattr__(nome), prefix=prefixo, tags=tags)
+
+
+__all__ = [nome for nome, _, _, _ in ROTAS]
@@ -1,8 +1,8 @@
 """
 Admin Controller - Endpoints administrativos
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
 from typing import List, Optional
 from app import auth
 from app.schemas import (
@@ -12,40 +12,25 @@ from app.models.usuario import User
 from app.models.psicologo import Psychologist
 from app.models.post_forum import ForumPost
 from app.models.pre_registro_psicologo import PsychologistPreRegistration
-from app.models.notificacao import Notification
 from app.models.comentario_forum import ForumComment
 from app.models.especialidade import Specialty
 from app.models.tratamento import Approach
 import json
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # ========== ROTAS PARA VALIDAÇÃO DE PSICÓLOGOS ==========
 
-@router.get("/psychologists/pending")
+@router.get("/psychologists/pending", response_model=List[PsychologistResponse])
 def listar_psicologos_pendentes(
     usuario_atual: User = Depends(auth.get_current_admin)
 ):
     """Lista todos os psicólogos pendentes de validação"""
-    psychologists = Psychologist.listar_pendentes()
-    
-    # Serializar manualmente para garantir que os campos sejam retornados com nomes em inglês
-    try:
-        # Pydantic v2
-        serialized = [
-            PsychologistResponse.model_validate(p).model_dump(by_alias=False, mode='json')
-            for p in psychologists
-        ]
-    except AttributeError:
-        # Pydantic v1 fallback
-        serialized = [
-            PsychologistResponse.from_orm(p).dict(by_alias=False)
-            for p in psychologists
-        ]
-    
-    return JSONResponse(content=serialized)
+    return Psychologist.listar_pendentes()
 
-@router.put("/psychologists/{id_psicologo}/verify")
+@router.put("/psychologists/{id_psicologo}/verify", response_model=PsychologistResponse)
 def verificar_psicologo(
     id_psicologo: int,
     usuario_atual: User = Depends(auth.get_current_admin)
@@ -63,48 +48,30 @@ def verificar_psicologo(
         # Guardar user_id antes de atualizar (caso a sessão seja fechada)
         user_id = psychologist.id_usuario
         
-        psychologist.atualizar(esta_verificado=True)
-        
-        # Criar notificação para o psicólogo
-        try:
-            Notification.criar(
-                user_id=user_id,
-                title="Cadastro Verificado",
-                message="Seu cadastro foi verificado e aprovado pela administração.",
-                type="system",
-                related_id=id_psicologo,
-                related_type="psychologist",
-                is_read=False
-            )
-        except Exception as e:
-            # Log do erro mas não falhar a operação
-            print(f"Erro ao criar notificação: {e}")
+        # Notificação para o psicólogo é gravada no outbox junto com a atualização
+        psychologist.atualizar(
+            esta_verificado=True,
+            notificacoes=[{
+                "id_usuario": user_id,
+                "titulo": "Cadastro Verificado",
+                "mensagem": "Seu cadastro foi verificado e aprovado pela administração.",
+                "tipo": "system",
+                "tipo_relacionado": "psychologist"
+            }]
+        )
         
         # Recarregar com relacionamentos
-        psychologist = Psychologist.obter_por_id(id_psicologo, carregar_relacionamentos=True)
-        
-        # Serializar manualmente para garantir que os campos sejam retornados com nomes em inglês
-        try:
-            # Pydantic v2
-            response_obj = PsychologistResponse.model_validate(psychologist)
-            serialized = response_obj.model_dump(by_alias=False, mode='json')
-        except AttributeError:
-            # Pydantic v1 fallback
-            response_obj = PsychologistResponse.from_orm(psychologist)
-            serialized = response_obj.dict(by_alias=False)
-        
-        return JSONResponse(content=serialized)
+        return Psychologist.obter_por_id(id_psicologo, carregar_relacionamentos=True)
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao verificar psicólogo %s", id_psicologo)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao verificar psicólogo: {str(e)}"
         )
 
-@router.put("/psychologists/{id_psicologo}/unverify")
+@router.put("/psychologists/{id_psicologo}/unverify", response_model=PsychologistResponse)
 def desverificar_psicologo(
     id_psicologo: int,
     motivo: str = Query(..., min_length=5, description="Motivo da desvalidação"),
@@ -132,42 +99,24 @@ def desverificar_psicologo(
             # Se o campo rejeitado existir, marcar como rejeitado
             update_data['rejeitado'] = True
         
-        psychologist.atualizar(**update_data)
-        
-        # Criar notificação para o psicólogo
-        try:
-            Notification.criar(
-                user_id=user_id,
-                title="Cadastro Desverificado",
-                message=f"Seu cadastro foi desverificado pela administração. Motivo: {motivo}",
-                type="system",
-                related_id=id_psicologo,
-                related_type="psychologist",
-                is_read=False
-            )
-        except Exception as e:
-            # Log do erro mas não falhar a operação
-            print(f"Erro ao criar notificação: {e}")
+        # Notificação para o psicólogo é gravada no outbox junto com a atualização
+        psychologist.atualizar(
+            notificacoes=[{
+                "id_usuario": user_id,
+                "titulo": "Cadastro Desverificado",
+                "mensagem": f"Seu cadastro foi desverificado pela administração. Motivo: {motivo}",
+                "tipo": "system",
+                "tipo_relacionado": "psychologist"
+            }],
+            **update_data
+        )
         
         # Recarregar com relacionamentos
-        psychologist = Psychologist.obter_por_id(id_psicologo, carregar_relacionamentos=True)
-        
-        # Serializar manualmente para garantir que os campos sejam retornados com nomes em inglês
-        try:
-            # Pydantic v2
-            response_obj = PsychologistResponse.model_validate(psychologist)
-            serialized = response_obj.model_dump(by_alias=False, mode='json')
-        except AttributeError:
-            # Pydantic v1 fallback
-            response_obj = PsychologistResponse.from_orm(psychologist)
-            serialized = response_obj.dict(by_alias=False)
-        
-        return JSONResponse(content=serialized)
+        return Psychologist.obter_por_id(id_psicologo, carregar_relacionamentos=True)
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao desverificar psicólogo %s", id_psicologo)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao desverificar psicólogo: {str(e)}"
@@ -189,19 +138,14 @@ def deletar_post_como_admin(
             detail="Post não encontrado"
         )
     
-    user_id_post = post.user_id
-    post.deletar()
-    
-    # Criar notificação para o autor
-    Notification.criar(
-        user_id=user_id_post,
-        title="Post Removido",
-        message="Seu post foi removido pela administração.",
-        type="system",
-        related_id=id_post,
-        related_type="forum_post",
-        is_read=False
-    )
+    # Notificação para o autor é gravada no outbox junto com a remoção
+    post.deletar(notificacoes=[{
+        "id_usuario": post.id_usuario,
+        "titulo": "Post Removido",
+        "mensagem": "Seu post foi removido pela administração.",
+        "tipo": "system",
+        "tipo_relacionado": "forum_post"
+    }])
     
     return None
 
@@ -261,18 +205,17 @@ def aprovar_pre_cadastro(
         approach_ids=approach_ids
     )
     
-    # Atualizar status do pré-cadastro
-    pre_reg.atualizar(status='approved')
-    
-    # Criar notificação para o usuário
-    Notification.criar(
-        user_id=psychologist.user_id,
-        title="Pré-cadastro Aprovado",
-        message="Seu pré-cadastro foi aprovado e seu perfil de psicólogo foi criado.",
-        type="system",
-        related_id=psychologist.id,
-        related_type="psychologist",
-        is_read=False
+    # Atualizar status do pré-cadastro e notificar o usuário
+    pre_reg.atualizar(
+        status='approved',
+        notificacoes=[{
+            "id_usuario": pre_reg.id_usuario,
+            "titulo": "Pré-cadastro Aprovado",
+            "mensagem": "Seu pré-cadastro foi aprovado e seu perfil de psicólogo foi criado.",
+            "tipo": "system",
+            "id_relacionado": psychologist.id,
+            "tipo_relacionado": "psychologist"
+        }]
     )
     
     # Recarregar com relacionamentos
@@ -295,17 +238,17 @@ def rejeitar_pre_cadastro(
             detail="Pré-cadastro não encontrado"
         )
     
-    pre_registration.atualizar(status='rejected', rejection_reason=motivo_rejeicao)
-    
-    # Criar notificação para o usuário
-    Notification.criar(
-        user_id=pre_registration.user_id,
-        title="Pré-cadastro Rejeitado",
-        message=f"Seu pré-cadastro foi rejeitado. Motivo: {motivo_rejeicao}",
-        type="system",
-        related_id=id_pre_cadastro,
-        related_type="pre_registration",
-        is_read=False
+    # Atualizar status e notificar o usuário na mesma transação
+    pre_registration = pre_registration.atualizar(
+        status='rejected',
+        motivo_recusa=motivo_rejeicao,
+        notificacoes=[{
+            "id_usuario": pre_registration.id_usuario,
+            "titulo": "Pré-cadastro Rejeitado",
+            "mensagem": f"Seu pré-cadastro foi rejeitado. Motivo: {motivo_rejeicao}",
+            "tipo": "system",
+            "tipo_relacionado": "pre_registration"
+        }]
     )
     
     return {"message": "Pré-cadastro rejeitado", "pre_registration": pre_registration}
@@ -1,6 +1,7 @@
 """
 Appointment Controller - Endpoints de agendamentos
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 from datetime import datetime, timezone, timedelta
@@ -9,9 +10,12 @@ from app.schemas import AppointmentCreate, AppointmentUpdate, AppointmentRespons
 from app.models.usuario import User
 from app.models.psicologo import Psychologist
 from app.models.agendamento import Appointment
-from app.models.notificacao import Notification
+from app.models.arquivo_agendamento import AppointmentArchive
 from app.models.disponibilidade_psicologo import PsychologistAvailability
 from app.models.pagamento import Payment
+from app.projecao import obter_projecao
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -21,13 +25,11 @@ def criar_agendamento(
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Criar agendamento"""
-    import sys
-    import traceback
-    print(f"=== DEBUG: Criar agendamento CHAMADO ===", file=sys.stderr, flush=True)
-    print(f"Psychologist ID: {agendamento.psychologist_id}", file=sys.stderr, flush=True)
-    print(f"Appointment date: {agendamento.appointment_date}", file=sys.stderr, flush=True)
-    print(f"Appointment type: {agendamento.appointment_type}", file=sys.stderr, flush=True)
-    print(f"User ID: {usuario_atual.id}", file=sys.stderr, flush=True)
+    logger.debug(
+        "Criar agendamento: psicólogo=%s data=%s tipo=%s usuário=%s",
+        agendamento.psychologist_id, agendamento.appointment_date,
+        agendamento.appointment_type, usuario_atual.id
+    )
     
     try:
         # Verificar se psicólogo existe
@@ -92,9 +94,9 @@ def criar_agendamento(
         horario_agendamento = data_agendamento_local.time()
         dia_da_semana = data_agendamento_date.weekday()  # 0=Segunda, 6=Domingo
         
-        print(f"DEBUG: Data agendamento (UTC): {data_agendamento_utc}")
-        print(f"DEBUG: Data agendamento (Local): {data_agendamento_local}")
-        print(f"DEBUG: Data: {data_agendamento_date}, Horário: {horario_agendamento}, Dia da semana: {dia_da_semana}")
+        logger.debug("Data agendamento (UTC): %s", data_agendamento_utc)
+        logger.debug("Data agendamento (Local): %s", data_agendamento_local)
+        logger.debug("Data: %s, Horário: %s, Dia da semana: %s", data_agendamento_date, horario_agendamento, dia_da_semana)
         
         # Verificar disponibilidade para este dia da semana
         disponibilidades = PsychologistAvailability.listar_por_psicologo(agendamento.psychologist_id, apenas_disponiveis=True)
@@ -103,9 +105,10 @@ def criar_agendamento(
             if disp.dia_da_semana == dia_da_semana
         ]
         
-        print(f"DEBUG: Disponibilidades encontradas para dia {dia_da_semana}: {len(disponibilidade_dia)}")
-        for disp in disponibilidade_dia:
-            print(f"DEBUG:   - {disp.horario_inicio} até {disp.horario_fim}")
+        logger.debug("Disponibilidades encontradas para dia %s: %s", dia_da_semana, len(disponibilidade_dia))
+        if logger.isEnabledFor(logging.DEBUG):
+            for disp in disponibilidade_dia:
+                logger.debug("- %s até %s", disp.horario_inicio, disp.horario_fim)
         
         if not disponibilidade_dia:
             raise HTTPException(
@@ -121,7 +124,7 @@ def criar_agendamento(
             horario_inicio = datetime.strptime(disp.horario_inicio, "%H:%M").time()
             horario_fim = datetime.strptime(disp.horario_fim, "%H:%M").time()
             
-            print(f"DEBUG: Comparando horário {horario_agendamento} com disponibilidade {horario_inicio}-{horario_fim}")
+            logger.debug("Comparando horário %s com disponibilidade %s-%s", horario_agendamento, horario_inicio, horario_fim)
             
             # Usar a mesma lógica do disponibilidade_controller.py (linha 308-316):
             # - O horário deve ser >= horario_inicio
@@ -133,21 +136,21 @@ def criar_agendamento(
                 proxima_data_hora = data_hora_atual + timedelta(hours=1)
                 proximo_horario = proxima_data_hora.time()
                 
-                print(f"DEBUG: Próximo horário: {proximo_horario}, Horário fim: {horario_fim}")
+                logger.debug("Próximo horário: %s, Horário fim: %s", proximo_horario, horario_fim)
                 
                 # Verificar se o próximo horário não ultrapassa o fim (mesma lógica do disponibilidade_controller linha 315)
                 # Na geração: if proximo_horario > horario_fim: break (não inclui o slot)
                 # Na validação: se proximo_horario > horario_fim, o slot não é válido
                 if proximo_horario <= horario_fim:
                     horario_valido = True
-                    print(f"DEBUG: Horário válido! (horario_agendamento={horario_agendamento}, proximo_horario={proximo_horario}, horario_fim={horario_fim})")
+                    logger.debug("Horário válido! (horario_agendamento=%s, proximo_horario=%s, horario_fim=%s)", horario_agendamento, proximo_horario, horario_fim)
                     break
                 else:
-                    print(f"DEBUG: Próximo horário ultrapassa o fim - {proximo_horario} > {horario_fim}")
+                    logger.debug("Próximo horário ultrapassa o fim - %s > %s", proximo_horario, horario_fim)
         
         if not horario_valido:
-            print(f"DEBUG: Horário INVÁLIDO - não está dentro de nenhuma disponibilidade")
-            print(f"DEBUG: Horário tentado: {horario_agendamento}, Data: {data_agendamento_date}, Dia da semana: {dia_da_semana}")
+            logger.debug("Horário INVÁLIDO - não está dentro de nenhuma disponibilidade")
+            logger.debug("Horário tentado: %s, Data: %s, Dia da semana: %s", horario_agendamento, data_agendamento_date, dia_da_semana)
             raise HTTPException(
                 status_code=400,
                 detail="O horário selecionado não está dentro da disponibilidade do psicólogo para este dia."
@@ -171,53 +174,44 @@ def criar_agendamento(
                 
                 # Verificar se há sobreposição (mesma data e mesmo horário)
                 if apt_date == data_agendamento_date and apt_time == horario_agendamento:
-                    print(f"DEBUG: Slot já ocupado - Agendamento ID: {apt.id}, Data: {apt_date}, Horário: {apt_time}")
+                    logger.debug("Slot já ocupado - Agendamento ID: %s, Data: %s, Horário: %s", apt.id, apt_date, apt_time)
                     raise HTTPException(
                         status_code=400,
                         detail="Este horário já está ocupado. Por favor, selecione outro horário."
                     )
         
         # Criar agendamento como 'pending' - será confirmado após pagamento
-        print(f"DEBUG: Criando agendamento...", file=sys.stderr, flush=True)
+        logger.debug("Criando agendamento...")
+        # A notificação para o psicólogo é gravada no outbox na mesma transação
+        # (será atualizada após pagamento)
         agendamento_created = Appointment.criar(
             id_psicologo=agendamento.psychologist_id,
             id_usuario=usuario_atual.id,
             data_agendamento=agendamento.appointment_date,
             tipo_agendamento=agendamento.appointment_type,
             observacoes=agendamento.notes,
-            status='pending'
+            status='pending',
+            notificacoes=[{
+                "id_usuario": psicologo.id_usuario,
+                "titulo": "Novo Agendamento Solicitado",
+                "mensagem": f"Você recebeu uma nova solicitação de agendamento de {usuario_atual.nome_completo}. O agendamento será confirmado após o pagamento.",
+                "tipo": "appointment",
+                "tipo_relacionado": "appointment"
+            }]
         )
-        print(f"DEBUG: Agendamento criado com ID: {agendamento_created.id}", file=sys.stderr, flush=True)
-        
-        # Criar notificação para o psicólogo (será atualizada após pagamento)
-        try:
-            print(f"DEBUG: Criando notificação para psicólogo (user_id: {psicologo.id_usuario})", file=sys.stderr, flush=True)
-            Notification.criar(
-                id_usuario=psicologo.id_usuario,
-                titulo="Novo Agendamento Solicitado",
-                mensagem=f"Você recebeu uma nova solicitação de agendamento de {usuario_atual.nome_completo}. O agendamento será confirmado após o pagamento.",
-                tipo="appointment",
-                id_relacionado=agendamento_created.id,
-                tipo_relacionado="appointment",
-                foi_lida=False
-            )
-            print(f"DEBUG: Notificação criada com sucesso", file=sys.stderr, flush=True)
-        except Exception as notif_error:
-            print(f"DEBUG: Erro ao criar notificação (não crítico): {notif_error}", file=sys.stderr, flush=True)
-            traceback.print_exc(file=sys.stderr)
+        logger.debug("Agendamento criado com ID: %s", agendamento_created.id)
         
         # Recarregar com relacionamentos
-        print(f"DEBUG: Recarregando agendamento com relacionamentos...", file=sys.stderr, flush=True)
+        logger.debug("Recarregando agendamento com relacionamentos...")
         agendamento_created = Appointment.obter_por_id(agendamento_created.id, carregar_relacionamentos=True)
-        print(f"DEBUG: Agendamento recarregado com sucesso", file=sys.stderr, flush=True)
+        logger.debug("Agendamento recarregado com sucesso")
         
         return agendamento_created
     except HTTPException:
         # Re-raise HTTP exceptions (400, 403, 404, etc.)
         raise
     except Exception as e:
-        print(f"ERROR: Erro ao criar agendamento: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
+        logger.exception("Erro ao criar agendamento: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro interno ao criar agendamento: {str(e)}"
@@ -237,8 +231,8 @@ def verificar_primeira_consulta(
             detail="Psicólogo não encontrado"
         )
     
-    # Verificar se o usuário já teve consultas com este psicólogo
-    agendamentos = Appointment.listar_por_usuario(usuario_atual.id)
+    # Verificar se o usuário já teve consultas com este psicólogo (inclusive arquivadas)
+    agendamentos = Appointment.listar_por_usuario(usuario_atual.id, carregar_relacionamentos=False, incluir_historico=True)
     consultas_com_psicologo = [
         apt for apt in agendamentos 
         if apt.id_psicologo == id_psicologo
@@ -256,55 +250,42 @@ def verificar_primeira_consulta(
         "discounted_price": preco_com_desconto
     }
 
-@router.get("/meus-agendamentos")
+@router.get("/meus-agendamentos", response_model=List[AppointmentResponse])
 def obter_meus_agendamentos(
     filtro_status: Optional[str] = None,
+    campos: Optional[str] = Query(None, alias="fields", description="Campos a retornar, separados por vírgula (ex.: id,psychologist.user.nome_completo)"),
+    incluir_historico: bool = Query(False, alias="include_history", description="Incluir agendamentos antigos já arquivados"),
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Obter meus agendamentos"""
-    import sys
-    print(f"=== DEBUG: obter_meus_agendamentos CHAMADO ===", file=sys.stderr, flush=True)
-    print(f"User ID: {usuario_atual.id}", file=sys.stderr, flush=True)
-    print(f"Filtro status: {filtro_status}", file=sys.stderr, flush=True)
-    
-    agendamentos = Appointment.listar_por_usuario(usuario_atual.id, status=filtro_status, carregar_relacionamentos=True)
-    print(f"DEBUG: Total de agendamentos encontrados: {len(agendamentos)}", file=sys.stderr, flush=True)
-    for i, apt in enumerate(agendamentos):
-        print(f"DEBUG: Agendamento {i+1}: ID={apt.id}, Data={apt.data_agendamento}, Status={apt.status}, Status Pagamento={apt.status_pagamento}", file=sys.stderr, flush=True)
-        print(f"DEBUG:   Psychologist ID: {apt.id_psicologo}, User ID: {apt.id_usuario}", file=sys.stderr, flush=True)
-    
-    # Serializar manualmente para garantir que os aliases sejam usados
-    try:
-        serialized = []
-        for apt in agendamentos:
-            # Validar e serializar cada agendamento
-            apt_response = AppointmentResponse.model_validate(apt)
-            apt_dict = apt_response.model_dump(by_alias=True, mode='json')
-            # Garantir que payment_status está presente
-            if 'payment_status' not in apt_dict or apt_dict['payment_status'] is None:
-                apt_dict['payment_status'] = apt.status_pagamento if hasattr(apt, 'status_pagamento') else None
-            serialized.append(apt_dict)
-            print(f"DEBUG: Agendamento {apt.id} serializado - status: {apt_dict.get('status')}, payment_status: {apt_dict.get('payment_status')}", file=sys.stderr, flush=True)
-        
-        print(f"DEBUG: Serialização concluída, {len(serialized)} agendamentos serializados", file=sys.stderr, flush=True)
-        if serialized:
-            print(f"DEBUG: Primeiro agendamento serializado: appointment_date={serialized[0].get('appointment_date')}, status={serialized[0].get('status')}, payment_status={serialized[0].get('payment_status')}", file=sys.stderr, flush=True)
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=serialized)
-    except Exception as e:
-        print(f"ERROR: Erro ao serializar agendamentos: {e}", file=sys.stderr, flush=True)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
-        # Fallback: retornar sem serialização manual
-        return agendamentos
+    logger.debug("Obter meus agendamentos: usuário=%s filtro_status=%s campos=%s", usuario_atual.id, filtro_status, campos)
+    
+    projecao = obter_projecao(campos, AppointmentResponse)
+    agendamentos = Appointment.listar_por_usuario(
+        usuario_atual.id,
+        status=filtro_status,
+        carregar_relacionamentos=True,
+        opcoes_carregamento=projecao.opcoes(Appointment) if projecao else None,
+        incluir_historico=incluir_historico,
+        opcoes_historico=projecao.opcoes(AppointmentArchive) if projecao else None
+    )
+    logger.debug("Total de agendamentos encontrados: %s", len(agendamentos))
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, apt in enumerate(agendamentos):
+            logger.debug("Agendamento %s: ID=%s, Data=%s, Status=%s, Status Pagamento=%s", i + 1, apt.id, apt.data_agendamento, apt.status, apt.status_pagamento)
+            logger.debug("Psychologist ID: %s, User ID: %s", apt.id_psicologo, apt.id_usuario)
+    
+    if projecao:
+        return projecao.resposta(agendamentos, lista=True)
+    return agendamentos
 
 @router.get("/agendamentos-psicologo", response_model=List[AppointmentResponse])
 def obter_agendamentos_psicologo(
     filtro_status: Optional[str] = None,
+    incluir_historico: bool = Query(False, alias="include_history", description="Incluir agendamentos antigos já arquivados"),
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Obter agendamentos do psicólogo"""
-    import sys
     
     if not usuario_atual.eh_psicologo:
         raise HTTPException(
@@ -312,50 +293,36 @@ def obter_agendamentos_psicologo(
             detail="Apenas psicólogos podem visualizar seus agendamentos"
         )
     
-    psicologo = Psychologist.obter_por_user_id(usuario_atual.id)
+    id_psicologo = usuario_atual.id_psicologo
     
-    if not psicologo:
+    if not id_psicologo:
         raise HTTPException(
             status_code=404,
             detail="Perfil de psicólogo não encontrado"
         )
     
-    print(f"DEBUG: Buscando agendamentos para psicólogo ID: {psicologo.id}, filtro_status: {filtro_status}", file=sys.stderr, flush=True)
-    agendamentos = Appointment.listar_por_psicologo(psicologo.id, status=filtro_status, carregar_relacionamentos=True)
-    print(f"DEBUG: Total de agendamentos encontrados: {len(agendamentos)}", file=sys.stderr, flush=True)
+    logger.debug("Buscando agendamentos para psicólogo ID: %s, filtro_status: %s", id_psicologo, filtro_status)
+    agendamentos = Appointment.listar_por_psicologo(
+        id_psicologo, status=filtro_status, carregar_relacionamentos=True, incluir_historico=incluir_historico
+    )
+    logger.debug("Total de agendamentos encontrados: %s", len(agendamentos))
     
-    for i, apt in enumerate(agendamentos):
-        print(f"DEBUG: Agendamento {i+1}: ID={apt.id}, Data={apt.data_agendamento}, Status={apt.status}, Status Pagamento={apt.status_pagamento}", file=sys.stderr, flush=True)
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, apt in enumerate(agendamentos):
+            logger.debug("Agendamento %s: ID=%s, Data=%s, Status=%s, Status Pagamento=%s", i + 1, apt.id, apt.data_agendamento, apt.status, apt.status_pagamento)
     
-    # Serializar manualmente para garantir que os aliases sejam usados
-    try:
-        serialized = []
-        for apt in agendamentos:
-            # Validar e serializar cada agendamento
-            apt_response = AppointmentResponse.model_validate(apt)
-            apt_dict = apt_response.model_dump(by_alias=True, mode='json')
-            # Garantir que payment_status está presente
-            if 'payment_status' not in apt_dict or apt_dict['payment_status'] is None:
-                apt_dict['payment_status'] = apt.status_pagamento if hasattr(apt, 'status_pagamento') else None
-            serialized.append(apt_dict)
-        
-        print(f"DEBUG: Serialização concluída, {len(serialized)} agendamentos serializados", file=sys.stderr, flush=True)
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=serialized)
-    except Exception as e:
-        import traceback
-        print(f"ERROR: Erro ao serializar agendamentos: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-        # Fallback: retornar sem serialização manual
-        return agendamentos
+    return agendamentos
 
 @router.get("/{id_agendamento}", response_model=AppointmentResponse)
 def obter_agendamento(
     id_agendamento: int,
+    incluir_historico: bool = Query(False, alias="include_history", description="Procurar também entre os agendamentos arquivados"),
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Obter agendamento por ID"""
-    agendamento = Appointment.obter_por_id(id_agendamento, carregar_relacionamentos=True)
+    agendamento = Appointment.obter_por_id(
+        id_agendamento, carregar_relacionamentos=True, incluir_historico=incluir_historico
+    )
     
     if not agendamento:
         raise HTTPException(
@@ -363,10 +330,8 @@ def obter_agendamento(
             detail="Agendamento não encontrado"
         )
     
-    # Verificar permissão
-    psicologo = Psychologist.obter_por_user_id(usuario_atual.id)
-    
-    if agendamento.id_usuario != usuario_atual.id and (not psicologo or agendamento.id_psicologo != psicologo.id):
+    # Verificar permissão (ID do perfil de psicólogo vem do usuário autenticado)
+    if agendamento.id_usuario != usuario_atual.id and (not usuario_atual.id_psicologo or agendamento.id_psicologo != usuario_atual.id_psicologo):
         raise HTTPException(
             status_code=403,
             detail="Você não tem permissão para visualizar este agendamento"
@@ -381,8 +346,6 @@ def atualizar_agendamento(
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Atualizar agendamento"""
-    import sys
-    import traceback
     
     try:
         agendamento = Appointment.obter_por_id(id_agendamento)
@@ -409,10 +372,11 @@ def atualizar_agendamento(
         
         # Verificar se está mudando para 'completed' e se o pagamento foi feito
         status_anterior = agendamento.status
-        dados_atualizacao = atualizacao_agendamento.dict(exclude_unset=True)
+        dados_atualizacao = atualizacao_agendamento.model_dump(exclude_unset=True)
         novo_status = dados_atualizacao.get('status', status_anterior)
+        credito_psicologo = None
         
-        print(f"DEBUG: Atualizando agendamento {id_agendamento} - Status anterior: {status_anterior}, Novo status: {novo_status}", file=sys.stderr, flush=True)
+        logger.debug("Atualizando agendamento %s - Status anterior: %s, Novo status: %s", id_agendamento, status_anterior, novo_status)
         
         # Se está mudando para 'completed', apenas o psicólogo pode fazer isso
         if novo_status == 'completed' and status_anterior != 'completed':
@@ -422,41 +386,27 @@ def atualizar_agendamento(
                     detail="Apenas o psicólogo pode marcar a consulta como concluída"
                 )
             
-            print(f"DEBUG: Marcando como concluído - Status pagamento: {agendamento.status_pagamento}", file=sys.stderr, flush=True)
-            print(f"DEBUG: Psicólogo encontrado: {psicologo is not None}, ID: {psicologo.id if psicologo else 'N/A'}, Saldo atual: {psicologo.saldo if psicologo else 'N/A'}", file=sys.stderr, flush=True)
+            logger.debug("Marcando como concluído - Status pagamento: %s", agendamento.status_pagamento)
             
             # Verificar se o pagamento foi feito antes de creditar o saldo
             if agendamento.status_pagamento == 'paid':
                 # Obter o pagamento para pegar o valor
                 pagamento = Payment.obter_por_agendamento(id_agendamento)
-                print(f"DEBUG: Pagamento encontrado: {pagamento is not None}", file=sys.stderr, flush=True)
+                logger.debug("Pagamento encontrado: %s", pagamento is not None)
                 if pagamento:
-                    print(f"DEBUG: Pagamento - ID: {pagamento.id}, Status: {pagamento.status}, Valor: {pagamento.valor}", file=sys.stderr, flush=True)
+                    logger.debug("Pagamento - ID: %s, Status: %s, Valor: %s", pagamento.id, pagamento.status, pagamento.valor)
                 
                 if pagamento and pagamento.status == 'paid':
                     # Calcular parte do psicólogo (80% do valor, 20% para a plataforma)
-                    parte_psicologo = pagamento.valor * 0.80
-                    saldo_atual = psicologo.saldo or 0.0
-                    print(f"DEBUG: Antes de atualizar - Saldo atual: {saldo_atual}, Parte psicólogo: {parte_psicologo}, Novo saldo será: {saldo_atual + parte_psicologo}", file=sys.stderr, flush=True)
-                    
-                    # Recarregar psicólogo do banco para garantir que temos a versão mais recente
-                    psicologo_atualizado = Psychologist.obter_por_id(psicologo.id)
-                    if psicologo_atualizado:
-                        saldo_atual = psicologo_atualizado.saldo or 0.0
-                        psicologo_atualizado.atualizar(saldo=saldo_atual + parte_psicologo)
-                        
-                        # Verificar se foi atualizado
-                        psicologo_verificacao = Psychologist.obter_por_id(psicologo.id)
-                        print(f"DEBUG: Saldo creditado após consulta concluída - Psicólogo ID: {psicologo.id}, Valor: R$ {pagamento.valor:.2f}, Parte psicólogo: R$ {parte_psicologo:.2f}, Saldo anterior: R$ {saldo_atual:.2f}, Saldo novo: R$ {psicologo_verificacao.saldo:.2f}", file=sys.stderr, flush=True)
-                    else:
-                        print(f"ERROR: Não foi possível recarregar psicólogo do banco", file=sys.stderr, flush=True)
+                    credito_psicologo = pagamento.valor * 0.80
+                    logger.debug("Saldo a creditar após consulta concluída - Psicólogo ID: %s, Valor: R$ %.2f, Parte psicólogo: R$ %.2f", psicologo.id, pagamento.valor, credito_psicologo)
                 else:
-                    print(f"DEBUG: Pagamento não encontrado ou não está como 'paid' - pagamento: {pagamento}, status: {pagamento.status if pagamento else 'N/A'}", file=sys.stderr, flush=True)
+                    logger.debug("Pagamento não encontrado ou não está como 'paid' - pagamento: %s, status: %s", pagamento, pagamento.status if pagamento else 'N/A')
             else:
-                print(f"DEBUG: Status do pagamento não é 'paid' - status_pagamento: {agendamento.status_pagamento}", file=sys.stderr, flush=True)
+                logger.debug("Status do pagamento não é 'paid' - status_pagamento: %s", agendamento.status_pagamento)
         
-        # Atualizar campos
-        agendamento.atualizar(**dados_atualizacao)
+        # Atualizar campos (o crédito é somado ao saldo no banco, na mesma transação)
+        agendamento.atualizar(credito_psicologo=credito_psicologo, **dados_atualizacao)
         
         # Recarregar com relacionamentos
         agendamento_db = Appointment.obter_por_id(id_agendamento, carregar_relacionamentos=True)
@@ -465,8 +415,7 @@ def atualizar_agendamento(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"ERROR: Erro ao atualizar agendamento: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
+        logger.exception("Erro ao atualizar agendamento: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao atualizar agendamento: {str(e)}"
@@ -478,24 +427,21 @@ def deletar_agendamento(
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Deletar agendamento"""
-    import sys
-    print(f"=== DEBUG: deletar_agendamento CHAMADO ===", file=sys.stderr, flush=True)
-    print(f"ID Agendamento: {id_agendamento}", file=sys.stderr, flush=True)
-    print(f"User ID: {usuario_atual.id}", file=sys.stderr, flush=True)
+    logger.debug("Deletar agendamento %s: usuário=%s", id_agendamento, usuario_atual.id)
     
     agendamento = Appointment.obter_por_id(id_agendamento)
     
     if not agendamento:
-        print(f"DEBUG: Agendamento não encontrado", file=sys.stderr, flush=True)
+        logger.debug("Agendamento não encontrado")
         raise HTTPException(
             status_code=404,
             detail="Agendamento não encontrado"
         )
     
-    print(f"DEBUG: Agendamento encontrado - ID Usuário: {agendamento.id_usuario}, Status: {agendamento.status}", file=sys.stderr, flush=True)
+    logger.debug("Agendamento encontrado - ID Usuário: %s, Status: %s", agendamento.id_usuario, agendamento.status)
     
     if agendamento.id_usuario != usuario_atual.id:
-        print(f"DEBUG: Usuário não tem permissão - agendamento.id_usuario={agendamento.id_usuario}, usuario_atual.id={usuario_atual.id}", file=sys.stderr, flush=True)
+        logger.debug("Usuário não tem permissão - agendamento.id_usuario=%s, usuario_atual.id=%s", agendamento.id_usuario, usuario_atual.id)
         raise HTTPException(
             status_code=403,
             detail="Você não tem permissão para cancelar este agendamento"
@@ -503,20 +449,17 @@ def deletar_agendamento(
     
     # Em vez de deletar, marcar como cancelado
     agendamento.atualizar(status='cancelled')
-    print(f"DEBUG: Agendamento marcado como cancelado", file=sys.stderr, flush=True)
+    logger.debug("Agendamento marcado como cancelado")
     
     return None
 
-@router.post("/{id_agendamento}/confirmar")
+@router.post("/{id_agendamento}/confirmar", response_model=AppointmentResponse)
 def confirmar_agendamento(
     id_agendamento: int,
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Confirmar agendamento (apenas psicólogo)"""
-    import sys
-    print(f"=== DEBUG: confirmar_agendamento CHAMADO ===", file=sys.stderr, flush=True)
-    print(f"ID Agendamento: {id_agendamento}", file=sys.stderr, flush=True)
-    print(f"User ID: {usuario_atual.id}, É psicólogo: {usuario_atual.eh_psicologo}", file=sys.stderr, flush=True)
+    logger.debug("Confirmar agendamento %s: usuário=%s psicólogo=%s", id_agendamento, usuario_atual.id, usuario_atual.eh_psicologo)
     
     if not usuario_atual.eh_psicologo:
         raise HTTPException(
@@ -524,69 +467,49 @@ def confirmar_agendamento(
             detail="Apenas psicólogos podem confirmar agendamentos"
         )
     
-    psicologo = Psychologist.obter_por_user_id(usuario_atual.id)
+    id_psicologo = usuario_atual.id_psicologo
     
-    if not psicologo:
+    if not id_psicologo:
         raise HTTPException(
             status_code=404,
             detail="Perfil de psicólogo não encontrado"
         )
     
-    print(f"DEBUG: Psicólogo encontrado - ID: {psicologo.id}", file=sys.stderr, flush=True)
+    logger.debug("Psicólogo encontrado - ID: %s", id_psicologo)
     
     agendamento = Appointment.obter_por_id(id_agendamento)
     
     if not agendamento:
-        print(f"DEBUG: Agendamento não encontrado", file=sys.stderr, flush=True)
+        logger.debug("Agendamento não encontrado")
         raise HTTPException(
             status_code=404,
             detail="Agendamento não encontrado"
         )
     
-    print(f"DEBUG: Agendamento encontrado - ID Psicólogo: {agendamento.id_psicologo}, Status: {agendamento.status}", file=sys.stderr, flush=True)
+    logger.debug("Agendamento encontrado - ID Psicólogo: %s, Status: %s", agendamento.id_psicologo, agendamento.status)
     
-    if agendamento.id_psicologo != psicologo.id:
-        print(f"DEBUG: Psicólogo não tem permissão - agendamento.id_psicologo={agendamento.id_psicologo}, psicologo.id={psicologo.id}", file=sys.stderr, flush=True)
+    if agendamento.id_psicologo != id_psicologo:
+        logger.debug("Psicólogo não tem permissão - agendamento.id_psicologo=%s, id_psicologo=%s", agendamento.id_psicologo, id_psicologo)
         raise HTTPException(
             status_code=403,
             detail="Você não tem permissão para confirmar este agendamento"
         )
     
-    agendamento.atualizar(status='confirmed')
-    print(f"DEBUG: Agendamento atualizado para 'confirmed'", file=sys.stderr, flush=True)
-    
-    # Criar notificação para o cliente
-    try:
-        Notification.criar(
-            id_usuario=agendamento.id_usuario,
-            titulo="Agendamento Confirmado",
-            mensagem=f"Seu agendamento foi confirmado pelo psicólogo.",
-            tipo="appointment",
-            id_relacionado=agendamento.id,
-            tipo_relacionado="appointment",
-            foi_lida=False
-        )
-        print(f"DEBUG: Notificação criada com sucesso", file=sys.stderr, flush=True)
-    except Exception as notif_error:
-        print(f"DEBUG: Erro ao criar notificação (não crítico): {notif_error}", file=sys.stderr, flush=True)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
+    # Atualizar status e enfileirar notificação para o cliente na mesma transação
+    agendamento.atualizar(
+        status='confirmed',
+        notificacoes=[{
+            "id_usuario": agendamento.id_usuario,
+            "titulo": "Agendamento Confirmado",
+            "mensagem": "Seu agendamento foi confirmado pelo psicólogo.",
+            "tipo": "appointment",
+            "tipo_relacionado": "appointment"
+        }]
+    )
+    logger.debug("Agendamento atualizado para 'confirmed'")
     
     # Recarregar com relacionamentos
-    agendamento = Appointment.obter_por_id(id_agendamento, carregar_relacionamentos=True)
-    
-    # Serializar manualmente para garantir que os aliases sejam usados
-    try:
-        serialized = AppointmentResponse.model_validate(agendamento).model_dump(by_alias=True, mode='json')
-        print(f"DEBUG: Serialização concluída", file=sys.stderr, flush=True)
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=serialized)
-    except Exception as e:
-        print(f"ERROR: Erro ao serializar agendamento: {e}", file=sys.stderr, flush=True)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
-        # Fallback: retornar sem serialização manual
-        return agendamento
+    return Appointment.obter_por_id(id_agendamento, carregar_relacionamentos=True)
 
 @router.post("/{id_agendamento}/recusar", response_model=AppointmentResponse)
 def recusar_agendamento(
@@ -601,9 +524,9 @@ def recusar_agendamento(
             detail="Apenas psicólogos podem recusar agendamentos"
         )
     
-    psicologo = Psychologist.obter_por_user_id(usuario_atual.id)
+    id_psicologo = usuario_atual.id_psicologo
     
-    if not psicologo:
+    if not id_psicologo:
         raise HTTPException(
             status_code=404,
             detail="Perfil de psicólogo não encontrado"
@@ -611,23 +534,23 @@ def recusar_agendamento(
     
     agendamento = Appointment.obter_por_id(id_agendamento)
     
-    if not agendamento or agendamento.id_psicologo != psicologo.id:
+    if not agendamento or agendamento.id_psicologo != id_psicologo:
         raise HTTPException(
             status_code=404,
             detail="Agendamento não encontrado"
         )
     
-    agendamento.atualizar(status='rejected', rejection_reason=motivo_recusa)
-    
-    # Criar notificação para o cliente
-    Notification.criar(
-        id_usuario=agendamento.id_usuario,
-        titulo="Agendamento Recusado",
-        mensagem=f"Seu agendamento foi recusado. Motivo: {motivo_recusa}",
-        tipo="appointment",
-        id_relacionado=agendamento.id,
-        tipo_relacionado="appointment",
-        foi_lida=False
+    # Atualizar status e enfileirar notificação para o cliente na mesma transação
+    agendamento.atualizar(
+        status='rejected',
+        motivo_recusa=motivo_recusa,
+        notificacoes=[{
+            "id_usuario": agendamento.id_usuario,
+            "titulo": "Agendamento Recusado",
+            "mensagem": f"Seu agendamento foi recusado. Motivo: {motivo_recusa}",
+            "tipo": "appointment",
+            "tipo_relacionado": "appointment"
+        }]
     )
     
     # Recarregar com relacionamentos
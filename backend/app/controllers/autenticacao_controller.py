@@ -1,31 +1,38 @@
 """
 Auth Controller - Endpoints de autenticação
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from datetime import timedelta
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
 from app import auth
-from app.schemas import UserCreate, UserResponse, Token
+from app.schemas import UserCreate, UserResponse, Token, RefreshTokenRequest
 from app.models.usuario import User
-from app.auth import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.cache_autenticacao import cache_principal
+from app.limite_taxa import limitador_autenticacao
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# O limite de taxa roda antes de qualquer consulta ao banco ou bcrypt
+router = APIRouter(dependencies=[Depends(limitador_autenticacao)])
 
 @router.post("/register", response_model=UserResponse)
-def registrar(usuario: UserCreate):
+async def registrar(usuario: UserCreate):
     """Registrar novo usuário"""
     try:
         # Verificar se email já existe
-        usuario_existente = User.obter_por_email(usuario.email)
+        usuario_existente = await run_in_threadpool(User.obter_por_email, usuario.email)
         if usuario_existente:
             raise HTTPException(
                 status_code=400,
                 detail="Email já registrado"
             )
         
-        # Criar novo usuário
-        senha_hash = auth.get_password_hash(usuario.password)
-        usuario_created = User.criar(
+        # Criar novo usuário (bcrypt roda no pool de senhas, fora do event loop)
+        senha_hash = await auth.get_password_hash_async(usuario.password)
+        usuario_created = await run_in_threadpool(
+            User.criar,
             email=usuario.email,
             senha_hash=senha_hash,
             nome_completo=usuario.full_name,
@@ -44,36 +51,53 @@ def registrar(usuario: UserCreate):
         )
 
 @router.post("/login", response_model=Token)
-def fazer_login(
+async def fazer_login(
     dados_formulario: OAuth2PasswordRequestForm = Depends()
 ):
     """Fazer login"""
-    usuario = auth.authenticate_user(dados_formulario.username, dados_formulario.password)
+    usuario = await auth.authenticate_user_async(dados_formulario.username, dados_formulario.password)
     if not usuario:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    expiracao_token = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    token_acesso = auth.create_access_token(
-        data={"sub": usuario.email}, expires_delta=expiracao_token
-    )
-    return {"access_token": token_acesso, "token_type": "bearer"}
+    # Claims incluem o ID do perfil de psicólogo, resolvido pelo cache de principal
+    principal = await run_in_threadpool(cache_principal.obter, usuario.email)
+    return auth.criar_tokens(principal)
+
+@router.post("/refresh", response_model=Token)
+async def renovar_token(dados: RefreshTokenRequest):
+    """Trocar um refresh token válido por um novo par de tokens"""
+    payload = auth.decodificar_token(dados.refresh_token, tipo="refresh")
+    usuario = await run_in_threadpool(cache_principal.obter, payload["sub"])
+    if usuario is None or not usuario.esta_ativo:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Rotação: o refresh token usado não pode ser reutilizado
+    auth.lista_revogacao.revogar(payload)
+    return auth.criar_tokens(usuario)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def fazer_logout(
+    dados: Optional[RefreshTokenRequest] = None,
+    token: str = Depends(auth.oauth2_scheme)
+):
+    """Revogar o token de acesso atual e, se informado, o refresh token"""
+    auth.lista_revogacao.revogar(auth.decodificar_token(token))
+    if dados is not None:
+        try:
+            auth.lista_revogacao.revogar(auth.decodificar_token(dados.refresh_token, tipo="refresh"))
+        except HTTPException:
+            # Refresh token inválido ou já revogado: nada a fazer
+            pass
+    return None
 
 @router.get("/me", response_model=UserResponse)
 def obter_usuario_atual(usuario_atual: User = Depends(auth.get_current_active_user)):
     """Obter usuário atual"""
-    try:
-        # Serializar manualmente para garantir que funciona
-        user_dict = UserResponse.model_validate(usuario_atual).model_dump(by_alias=False, mode='json')
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=user_dict)
-    except Exception as e:
-        import sys
-        import traceback
-        print(f"ERROR: Erro ao serializar usuário: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-        # Fallback: retornar diretamente
-        return usuario_atual
+    return usuario_atual
 
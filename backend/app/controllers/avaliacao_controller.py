@@ -1,6 +1,7 @@
 """
 Review Controller - Endpoints de avaliações
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from app import auth
@@ -10,6 +11,8 @@ from app.models.psicologo import Psychologist
 from app.models.avaliacao import Review
 from sqlalchemy.orm import joinedload
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
@@ -34,19 +37,20 @@ def criar_avaliacao(
             detail="Você já avaliou este psicólogo"
         )
     
-    # Verificar se o usuário teve pelo menos uma consulta concluída com este psicólogo
+    # Verificar se o usuário teve pelo menos uma consulta concluída com este psicólogo (inclusive arquivada)
     from app.models.agendamento import Appointment
-    import sys
     
-    consultas_completadas = Appointment.listar_por_usuario(usuario_atual.id, status='completed')
-    print(f"DEBUG: Consultas completadas encontradas: {len(consultas_completadas)}", file=sys.stderr, flush=True)
+    consultas_completadas = Appointment.listar_por_usuario(
+        usuario_atual.id, status='completed', carregar_relacionamentos=False, incluir_historico=True
+    )
+    logger.debug("Consultas completadas encontradas: %s", len(consultas_completadas))
     
     consulta_com_psicologo = any(
         apt.id_psicologo == avaliacao.psychologist_id 
         for apt in consultas_completadas
     )
     
-    print(f"DEBUG: Consulta com psicólogo {avaliacao.psychologist_id}: {consulta_com_psicologo}", file=sys.stderr, flush=True)
+    logger.debug("Consulta com psicólogo %s: %s", avaliacao.psychologist_id, consulta_com_psicologo)
     
     if not consulta_com_psicologo:
         raise HTTPException(
@@ -77,20 +81,9 @@ def criar_avaliacao(
         psicologo.atualizar(avaliacao=media_rating, total_avaliacoes=total_avaliacoes)
         
         # Recarregar com relacionamentos
-        avaliacao_object = Review.obter_por_id_com_relacionamentos(avaliacao_created.id)
-        
-        # Serializar manualmente para garantir que os aliases sejam usados
-        from app.schemas.avaliacao import ReviewResponse
-        
-        avaliacao_dict = ReviewResponse.model_validate(avaliacao_object).model_dump(by_alias=True, mode='json')
-        
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=avaliacao_dict, status_code=status.HTTP_201_CREATED)
+        return Review.obter_por_id_com_relacionamentos(avaliacao_created.id)
     except Exception as e:
-        import sys
-        import traceback
-        print(f"ERROR: Erro ao criar avaliação: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
+        logger.exception("Erro ao criar avaliação: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao criar avaliação: {str(e)}"
@@ -1,13 +1,14 @@
 """
 Search Controller - Endpoints de busca
 """
-from fastapi import APIRouter, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Query, Request, Response
 from typing import List, Optional
-from app.schemas import SearchResponse, SpecialtyResponse, ApproachResponse
-from app.models.especialidade import Specialty
-from app.models.tratamento import Approach
+from app.schemas import SearchResponse, SpecialtyResponse, ApproachResponse, PsychologistListItem
 from app.models.psicologo import Psychologist
+from app import dados_referencia
+from app.etag import POLITICA_REFERENCIA, etag_corresponde
+from app.projecao import obter_projecao
+from app.serializacao import RespostaJson
 
 router = APIRouter()
 
@@ -24,9 +25,11 @@ def buscar_psicologos(
     preco_maximo: Optional[float] = Query(None),
     experiencia_minima: Optional[int] = Query(None),
     pagina: int = Query(1, ge=1),
-    tamanho_pagina: int = Query(20, ge=1, le=100)
+    tamanho_pagina: int = Query(20, ge=1, le=100),
+    campos: Optional[str] = Query(None, alias="fields", description="Campos a retornar, separados por vírgula (ex.: id,user.nome_completo) (aplicado a cada psicólogo)")
 ):
     """Buscar psicólogos com filtros"""
+    projecao = obter_projecao(campos, PsychologistListItem)
     result = Psychologist.buscar_com_filtros(
         consulta=consulta,
         cidade=cidade,
@@ -39,33 +42,26 @@ def buscar_psicologos(
         preco_maximo=preco_maximo,
         experiencia_minima=experiencia_minima,
         pagina=pagina,
-        tamanho_pagina=tamanho_pagina
+        tamanho_pagina=tamanho_pagina,
+        opcoes_carregamento=projecao.opcoes(Psychologist) if projecao else None
     )
+    if projecao:
+        return RespostaJson(content={**result, "psychologists": projecao.para_dict(result["psychologists"], lista=True)})
     return result
 
-@router.get("/specialties")
-def obter_especialidades():
-    """Listar especialidades"""
-    specialties = Specialty.listar_todos()
-    # Serializar manualmente para garantir que use os nomes dos campos (não os aliases)
-    try:
-        response_objs = [SpecialtyResponse.model_validate(s) for s in specialties]
-        serialized = [obj.model_dump(by_alias=False) for obj in response_objs]
-        return JSONResponse(content=serialized)
-    except Exception as e:
-        # Se houver erro, tentar serialização normal
-        return specialties
+@router.get("/specialties", response_model=List[SpecialtyResponse])
+def obter_especialidades(request: Request):
+    """Listar especialidades (servidas do cache de dados de referência)"""
+    return _resposta_referencia(request, dados_referencia.especialidades.obter())
 
-@router.get("/approaches")
-def obter_abordagens():
-    """Listar abordagens"""
-    approaches = Approach.listar_todos()
-    # Serializar manualmente para garantir que use os nomes dos campos (não os aliases)
-    try:
-        response_objs = [ApproachResponse.model_validate(a) for a in approaches]
-        serialized = [obj.model_dump(by_alias=False) for obj in response_objs]
-        return JSONResponse(content=serialized)
-    except Exception as e:
-        # Se houver erro, tentar serialização normal
-        return approaches
+@router.get("/approaches", response_model=List[ApproachResponse])
+def obter_abordagens(request: Request):
+    """Listar abordagens (servidas do cache de dados de referência)"""
+    return _resposta_referencia(request, dados_referencia.abordagens.obter())
 
+def _resposta_referencia(request: Request, conjunto) -> Response:
+    """304 ou os bytes já serializados do conjunto"""
+    cabecalhos = {"ETag": conjunto.etag, "Cache-Control": POLITICA_REFERENCIA}
+    if etag_corresponde(request.headers.get("if-none-match"), conjunto.etag):
+        return Response(status_code=304, headers=cabecalhos)
+    return Response(content=conjunto.corpo, media_type="application/json", headers=cabecalhos)
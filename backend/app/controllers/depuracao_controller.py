@@ -0,0 +1,64 @@
+"""
+Debug Controller - Endpoints de diagnóstico de desempenho (apenas admin)
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from app import auth
+from app.instrumentacao import historico_requisicoes
+from app.serializacao import RespostaJson
+from app.perfilador import (
+    PROFILER_INTERVAL_MS, PROFILER_MAX_SECONDS, PerfiladorOcupado,
+    coletar_perfil, historico_perfis
+)
+
+router = APIRouter()
+
+def _resposta_perfil(perfil, formato: str):
+    if formato == "speedscope":
+        return RespostaJson(content=perfil)
+    return PlainTextResponse(perfil)
+
+@router.get("/queries")
+def listar_consultas_recentes(
+    limite: int = Query(20, ge=1, le=100),
+    apenas_repetidas: bool = Query(False, description="Somente requisições com possível N+1"),
+    usuario_atual = Depends(auth.get_current_admin)
+):
+    """Listar consultas SQL das últimas requisições (contagem, tempo e mais lentas)"""
+    requisicoes = list(historico_requisicoes)
+    if apenas_repetidas:
+        requisicoes = [requisicao for requisicao in requisicoes if requisicao["repeated"]]
+    return list(reversed(requisicoes))[:limite]
+
+@router.get("/profile")
+async def coletar_perfil_processo(
+    segundos: float = Query(5, gt=0, le=PROFILER_MAX_SECONDS, alias="seconds"),
+    formato: str = Query("collapsed", pattern="^(collapsed|speedscope)$", alias="format"),
+    intervalo_ms: float = Query(PROFILER_INTERVAL_MS, ge=1, le=1000, alias="interval_ms"),
+    usuario_atual = Depends(auth.get_current_admin)
+):
+    """Amostrar as pilhas de todas as threads deste worker por N segundos"""
+    try:
+        amostrador = await run_in_threadpool(coletar_perfil, segundos, intervalo_ms)
+    except PerfiladorOcupado:
+        raise HTTPException(status_code=409, detail="Já existe uma coleta de perfil em andamento")
+    return _resposta_perfil(amostrador.exportar(formato, f"worker ({segundos:g}s)"), formato)
+
+@router.get("/profiles")
+def listar_perfis_requisicoes(
+    usuario_atual = Depends(auth.get_current_admin)
+):
+    """Listar perfis coletados por requisição (header X-Profile)"""
+    return historico_perfis.listar()
+
+@router.get("/profiles/{id_perfil}")
+def obter_perfil_requisicao(
+    id_perfil: str,
+    usuario_atual = Depends(auth.get_current_admin)
+):
+    """Obter o perfil de uma requisição pelo X-Profile-Id"""
+    perfil = historico_perfis.obter(id_perfil)
+    if perfil is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return _resposta_perfil(perfil["profile"], perfil["format"])
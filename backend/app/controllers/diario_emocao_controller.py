@@ -1,18 +1,106 @@
 """
 Emotion Diary Controller - Endpoints de diário de emoções
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from typing import List, Optional, Iterator, Tuple
 from datetime import datetime
+import csv
+import io
+import json
 from app import auth
 from app.schemas import (
-    EmotionDiaryCreate, EmotionDiaryUpdate, EmotionDiaryResponse
+    EmotionDiaryCreate, EmotionDiaryUpdate, EmotionDiaryResponse, EmotionDiaryImportResult
 )
 from app.models.usuario import User
 from app.models.diario_emocional import EmotionDiary
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+TAMANHO_LOTE_IMPORTACAO = 500
+MAXIMO_ERROS_REPORTADOS = 100
+CAMPOS_EXPORTACAO = ["date", "emotion", "intensity", "notes", "tags", "created_at"]
+
+_adaptador_entradas = TypeAdapter(List[EmotionDiaryCreate])
+
+def _detectar_formato(arquivo: UploadFile, formato: Optional[str]) -> str:
+    """Detectar formato do arquivo de importação (csv ou jsonl)"""
+    if formato:
+        formato = formato.lower()
+    else:
+        nome = (arquivo.filename or "").lower()
+        if nome.endswith(".csv"):
+            formato = "csv"
+        elif nome.endswith(".jsonl") or nome.endswith(".ndjson"):
+            formato = "jsonl"
+    
+    if formato not in ("csv", "jsonl"):
+        raise HTTPException(
+            status_code=400,
+            detail="Formato não suportado. Use 'csv' ou 'jsonl'"
+        )
+    return formato
+
+def _ler_linhas(arquivo: UploadFile, formato: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Ler linhas do arquivo, retornando (número da linha, dados, erro de leitura)"""
+    texto = io.TextIOWrapper(arquivo.file, encoding="utf-8-sig", newline="")
+    
+    if formato == "csv":
+        leitor = csv.DictReader(texto)
+        for numero, linha in enumerate(leitor, start=2):
+            # Campos vazios no CSV são tratados como ausentes
+            yield numero, {k: v for k, v in linha.items() if k and v not in (None, "")}, None
+        return
+    
+    for numero, linha in enumerate(texto, start=1):
+        if not linha.strip():
+            continue
+        try:
+            dados = json.loads(linha)
+        except json.JSONDecodeError as e:
+            yield numero, None, f"JSON inválido: {e.msg}"
+            continue
+        if not isinstance(dados, dict):
+            yield numero, None, "Cada linha deve ser um objeto JSON"
+            continue
+        yield numero, dados, None
+
+def _validar_lote(lote: List[Tuple[int, dict]]) -> Tuple[List[dict], List[dict]]:
+    """Validar um lote de linhas com Pydantic, separando entradas válidas e erros por linha"""
+    try:
+        entradas = _adaptador_entradas.validate_python([dados for _, dados in lote])
+        erros_por_indice = {}
+    except ValidationError as e:
+        erros_por_indice = {}
+        for erro in e.errors(include_url=False):
+            indice, campo = erro["loc"][0], ".".join(str(parte) for parte in erro["loc"][1:])
+            erros_por_indice.setdefault(indice, []).append(f"{campo}: {erro['msg']}" if campo else erro["msg"])
+        # Revalidar individualmente apenas as linhas sem erro
+        entradas = [
+            None if indice in erros_por_indice else EmotionDiaryCreate.model_validate(dados)
+            for indice, (_, dados) in enumerate(lote)
+        ]
+    
+    validas, erros = [], []
+    for indice, ((numero, _), entrada) in enumerate(zip(lote, entradas)):
+        if indice in erros_por_indice:
+            erros.append({"row": numero, "errors": erros_por_indice[indice]})
+        elif entrada.intensity < 1 or entrada.intensity > 10:
+            erros.append({"row": numero, "errors": ["intensity: Intensidade deve estar entre 1 e 10"]})
+        else:
+            validas.append({
+                "data": entrada.date,
+                "emocao": entrada.emotion,
+                "intensidade": entrada.intensity,
+                "notas": entrada.notes,
+                "tags": entrada.tags
+            })
+    return validas, erros
+
 @router.post("/", response_model=EmotionDiaryResponse, status_code=status.HTTP_201_CREATED)
 def criar_entrada(
     entrada: EmotionDiaryCreate,
@@ -26,8 +114,6 @@ def criar_entrada(
             detail="Intensidade deve estar entre 1 e 10"
         )
     
-    import sys
-    import traceback
     
     try:
         entrada_created = EmotionDiary.criar(
@@ -39,17 +125,10 @@ def criar_entrada(
             tags=entrada.tags
         )
         
-        print(f"DEBUG: Entrada criada com sucesso - ID: {entrada_created.id}", file=sys.stderr, flush=True)
-        
-        # Serializar manualmente para garantir que os aliases sejam usados
-        from app.schemas.diario_emocional import EmotionDiaryResponse
-        entrada_dict = EmotionDiaryResponse.model_validate(entrada_created).model_dump(by_alias=True, mode='json')
-        
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=entrada_dict, status_code=status.HTTP_201_CREATED)
+        logger.debug("Entrada criada com sucesso - ID: %s", entrada_created.id)
+        return entrada_created
     except Exception as e:
-        print(f"ERROR: Erro ao criar entrada: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
+        logger.exception("Erro ao criar entrada: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao salvar entrada: {str(e)}"
@@ -63,30 +142,12 @@ def obter_entradas(
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Obter entradas do diário"""
-    entradas = EmotionDiary.listar_por_usuario(
+    return EmotionDiary.listar_por_usuario(
         usuario_atual.id, 
         data_inicio=data_inicio, 
         data_fim=data_fim, 
         emocao=emocao
     )
-    
-    # Serializar manualmente para garantir que os aliases sejam usados
-    try:
-        from app.schemas.diario_emocional import EmotionDiaryResponse
-        serialized = []
-        for entrada in entradas:
-            entrada_dict = EmotionDiaryResponse.model_validate(entrada).model_dump(by_alias=True, mode='json')
-            serialized.append(entrada_dict)
-        
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=serialized)
-    except Exception as e:
-        import sys
-        import traceback
-        print(f"ERROR: Erro ao serializar entradas: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-        # Fallback: retornar sem serialização manual
-        return entradas
 
 @router.get("/stats")
 def obter_estatisticas(
@@ -102,6 +163,95 @@ def obter_estatisticas(
     )
     return estatisticas
 
+@router.post("/import", response_model=EmotionDiaryImportResult)
+def importar_entradas(
+    arquivo: UploadFile = File(...),
+    formato: Optional[str] = Query(None, description="csv ou jsonl (detectado pela extensão se omitido)"),
+    usuario_atual: User = Depends(auth.get_current_active_user)
+):
+    """Importar entradas do diário em lote a partir de CSV ou JSONL"""
+    formato = _detectar_formato(arquivo, formato)
+    
+    importadas = 0
+    falhas = 0
+    erros = []
+    
+    def processar(lote: List[Tuple[int, dict]]) -> None:
+        nonlocal importadas, falhas
+        validas, erros_lote = _validar_lote(lote)
+        if validas:
+            importadas += EmotionDiary.criar_em_lote(usuario_atual.id, validas, TAMANHO_LOTE_IMPORTACAO)
+        falhas += len(erros_lote)
+        erros.extend(erros_lote[:MAXIMO_ERROS_REPORTADOS - len(erros)])
+    
+    lote = []
+    try:
+        for numero, dados, erro in _ler_linhas(arquivo, formato):
+            if erro:
+                falhas += 1
+                if len(erros) < MAXIMO_ERROS_REPORTADOS:
+                    erros.append({"row": numero, "errors": [erro]})
+                continue
+            lote.append((numero, dados))
+            if len(lote) >= TAMANHO_LOTE_IMPORTACAO:
+                processar(lote)
+                lote = []
+        if lote:
+            processar(lote)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=400,
+            detail="Arquivo deve estar codificado em UTF-8"
+        )
+    
+    return {"imported": importadas, "failed": falhas, "errors": erros}
+
+@router.get("/export")
+def exportar_entradas(
+    formato: str = Query("jsonl", pattern="^(csv|jsonl)$"),
+    data_inicio: Optional[datetime] = Query(None, alias="data_inicio"),
+    data_fim: Optional[datetime] = Query(None, alias="data_fim"),
+    usuario_atual: User = Depends(auth.get_current_active_user)
+):
+    """Exportar entradas do diário em streaming (CSV ou JSONL)"""
+    linhas = EmotionDiary.iterar_por_usuario(
+        usuario_atual.id,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        tamanho_lote=TAMANHO_LOTE_IMPORTACAO
+    )
+    
+    def gerar_csv() -> Iterator[str]:
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        escritor.writerow(CAMPOS_EXPORTACAO)
+        for indice, linha in enumerate(linhas, start=1):
+            escritor.writerow([
+                valor.isoformat() if isinstance(valor, datetime) else valor
+                for valor in linha
+            ])
+            if indice % TAMANHO_LOTE_IMPORTACAO == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue()
+    
+    def gerar_jsonl() -> Iterator[str]:
+        for linha in linhas:
+            registro = dict(zip(CAMPOS_EXPORTACAO, linha))
+            yield json.dumps(registro, default=lambda valor: valor.isoformat(), ensure_ascii=False) + "\n"
+    
+    if formato == "csv":
+        conteudo, tipo_midia = gerar_csv(), "text/csv; charset=utf-8"
+    else:
+        conteudo, tipo_midia = gerar_jsonl(), "application/x-ndjson"
+    
+    return StreamingResponse(
+        conteudo,
+        media_type=tipo_midia,
+        headers={"Content-Disposition": f'attachment; filename="diario-emocoes.{formato}"'}
+    )
+
 @router.get("/{id_entrada}", response_model=EmotionDiaryResponse)
 def obter_entrada(
     id_entrada: int,
@@ -157,20 +307,7 @@ def atualizar_entrada(
     entrada.atualizar(**dados_atualizacao)
     
     # Recarregar entrada
-    entrada = EmotionDiary.obter_por_id(id_entrada, usuario_atual.id)
-    
-    # Serializar manualmente
-    try:
-        from app.schemas.diario_emocional import EmotionDiaryResponse
-        entrada_dict = EmotionDiaryResponse.model_validate(entrada).model_dump(by_alias=True, mode='json')
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=entrada_dict)
-    except Exception as e:
-        import sys
-        import traceback
-        print(f"ERROR: Erro ao serializar entrada atualizada: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-        return entrada
+    return EmotionDiary.obter_por_id(id_entrada, usuario_atual.id)
 
 @router.delete("/{id_entrada}", status_code=status.HTTP_204_NO_CONTENT)
 def deletar_entrada(
@@ -1,8 +1,8 @@
 """
 Availability Controller - Endpoints de disponibilidade
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from typing import List
 from app import auth
 from app.schemas import (
@@ -13,8 +13,12 @@ from app.models.usuario import User
 from app.models.psicologo import Psychologist
 from app.models.disponibilidade_psicologo import PsychologistAvailability
 from app.models.agendamento import Appointment
+from app.models.versao_recurso import ResourceVersion, chave_agenda
+from app.etag import POLITICA_AGENDA, gerar_etag, verificar_condicional
 from datetime import datetime, date, timedelta, time as dt_time, timezone
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/", response_model=PsychologistAvailabilityResponse, status_code=status.HTTP_201_CREATED)
@@ -68,21 +72,9 @@ def criar_disponibilidade(
         )
     
     # Recarregar para garantir dados atualizados
-    disponibilidade_created = PsychologistAvailability.obter_por_id(disponibilidade_created.id, id_psicologo=psicologo.id)
-    
-    # Serializar manualmente para garantir que os campos sejam retornados com nomes em inglês
-    try:
-        # Pydantic v2
-        response_obj = PsychologistAvailabilityResponse.model_validate(disponibilidade_created)
-        serialized = response_obj.model_dump(by_alias=False, mode='json')
-    except AttributeError:
-        # Pydantic v1 fallback
-        response_obj = PsychologistAvailabilityResponse.from_orm(disponibilidade_created)
-        serialized = response_obj.dict(by_alias=False)
-    
-    return JSONResponse(content=serialized, status_code=status.HTTP_201_CREATED)
+    return PsychologistAvailability.obter_por_id(disponibilidade_created.id, id_psicologo=psicologo.id)
 
-@router.get("/")
+@router.get("/", response_model=List[PsychologistAvailabilityResponse])
 def obter_minha_disponibilidade(
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
@@ -101,42 +93,31 @@ def obter_minha_disponibilidade(
             detail="Perfil de psicólogo não encontrado"
         )
     
-    disponibilidades = PsychologistAvailability.listar_por_psicologo(psicologo.id)
-    
-    # Serializar manualmente para garantir que os campos sejam retornados com nomes em inglês
-    try:
-        # Pydantic v2
-        serialized = [
-            PsychologistAvailabilityResponse.model_validate(a).model_dump(by_alias=False, mode='json')
-            for a in disponibilidades
-        ]
-    except AttributeError:
-        # Pydantic v1 fallback
-        serialized = [
-            PsychologistAvailabilityResponse.from_orm(a).dict(by_alias=False)
-            for a in disponibilidades
-        ]
-    
-    return JSONResponse(content=serialized)
+    return PsychologistAvailability.listar_por_psicologo(psicologo.id)
 
 @router.get("/psychologist/{id_psicologo}", response_model=List[PsychologistAvailabilityResponse])
 def obter_disponibilidade_psicologo(
-    id_psicologo: int
+    id_psicologo: int,
+    request: Request,
+    response: Response
 ):
     """Obter horários de disponibilidade de um psicólogo"""
-    psicologo = Psychologist.obter_por_id(id_psicologo)
-    
-    if not psicologo:
+    if Psychologist.obter_versao(id_psicologo) is None:
         raise HTTPException(
             status_code=404,
             detail="Psicólogo não encontrado"
         )
     
+    etag = gerar_etag("availability", id_psicologo, ResourceVersion.obter(chave_agenda(id_psicologo)))
+    nao_modificado = verificar_condicional(request, response, etag, POLITICA_AGENDA)
+    if nao_modificado:
+        return nao_modificado
+    
     disponibilidades = PsychologistAvailability.listar_por_psicologo(id_psicologo, apenas_disponiveis=True)
     
     return disponibilidades
 
-@router.put("/{id_disponibilidade}")
+@router.put("/{id_disponibilidade}", response_model=PsychologistAvailabilityResponse)
 def atualizar_disponibilidade(
     id_disponibilidade: int,
     atualizacao_disponibilidade: PsychologistAvailabilityUpdate,
@@ -177,19 +158,7 @@ def atualizar_disponibilidade(
     disponibilidade.atualizar(**dados_atualizacao)
     
     # Recarregar disponibilidade atualizada
-    disponibilidade = PsychologistAvailability.obter_por_id(id_disponibilidade, id_psicologo=psicologo.id)
-    
-    # Serializar manualmente para garantir que os campos sejam retornados com nomes em inglês
-    try:
-        # Pydantic v2
-        response_obj = PsychologistAvailabilityResponse.model_validate(disponibilidade)
-        serialized = response_obj.model_dump(by_alias=False, mode='json')
-    except AttributeError:
-        # Pydantic v1 fallback
-        response_obj = PsychologistAvailabilityResponse.from_orm(disponibilidade)
-        serialized = response_obj.dict(by_alias=False)
-    
-    return JSONResponse(content=serialized)
+    return PsychologistAvailability.obter_por_id(id_disponibilidade, id_psicologo=psicologo.id)
 
 @router.delete("/{id_disponibilidade}", status_code=status.HTTP_204_NO_CONTENT)
 def deletar_disponibilidade(
@@ -225,6 +194,8 @@ def deletar_disponibilidade(
 @router.get("/psychologist/{id_psicologo}/available-slots")
 def obter_horarios_disponiveis(
     id_psicologo: int,
+    request: Request,
+    response: Response,
     start_date: str = Query(..., description="Data início (YYYY-MM-DD)"),
     end_date: str = Query(..., description="Data fim (YYYY-MM-DD)"),
     appointment_type: str = Query("online", description="Tipo de agendamento")
@@ -242,9 +213,7 @@ def obter_horarios_disponiveis(
         )
     
     # Verificar se psicólogo existe
-    psicologo = Psychologist.obter_por_id(id_psicologo)
-    
-    if not psicologo:
+    if Psychologist.obter_versao(id_psicologo) is None:
         raise HTTPException(
             status_code=404,
             detail="Psicólogo não encontrado"
@@ -257,12 +226,23 @@ def obter_horarios_disponiveis(
             detail="Período não pode exceder 90 dias"
         )
     
+    # Horários passados saem da resposta: a hora atual também faz parte da versão
+    etag = gerar_etag(
+        "available-slots", id_psicologo, start_date, end_date, appointment_type,
+        datetime.now(timezone.utc).strftime("%Y-%m-%dT%H"),
+        ResourceVersion.obter(chave_agenda(id_psicologo))
+    )
+    nao_modificado = verificar_condicional(request, response, etag, POLITICA_AGENDA)
+    if nao_modificado:
+        return nao_modificado
+    
     # Obter disponibilidade semanal do psicólogo
     disponibilidade_semanal = PsychologistAvailability.listar_por_psicologo(id_psicologo, apenas_disponiveis=True)
     
-    print(f"DEBUG available-slots: Psicólogo {id_psicologo}, Disponibilidades encontradas: {len(disponibilidade_semanal)}")
-    for disp in disponibilidade_semanal:
-        print(f"  - ID: {disp.id}, Dia: {disp.dia_da_semana}, Horário: {disp.horario_inicio}-{disp.horario_fim}, Disponível: {disp.esta_disponivel}")
+    logger.debug("Available-slots: Psicólogo %s, Disponibilidades encontradas: %s", id_psicologo, len(disponibilidade_semanal))
+    if logger.isEnabledFor(logging.DEBUG):
+        for disp in disponibilidade_semanal:
+            logger.debug("- ID: %s, Dia: %s, Horário: %s-%s, Disponível: %s", disp.id, disp.dia_da_semana, disp.horario_inicio, disp.horario_fim, disp.esta_disponivel)
     
     if not disponibilidade_semanal:
         horarios = []
@@ -338,7 +318,7 @@ def obter_horarios_disponiveis(
                                 "available": True
                             })
                         else:
-                            print(f"DEBUG available-dates: Slot {data_atual.isoformat()} {horario_atual} filtrado - data_atual={data_atual}, agora_date={agora_date}, is_future={is_future_date}, is_today_future={is_today_future_time}")
+                            logger.debug("Available-slots: Slot %s %s filtrado - agora_date=%s, is_future=%s, is_today_future=%s", data_atual, horario_atual, agora_date, is_future_date, is_today_future_time)
                     
                     horario_atual = proximo_horario
             
@@ -356,17 +336,17 @@ def obter_horarios_disponiveis(
 @router.get("/psychologist/{id_psicologo}/available-dates")
 def obter_datas_disponiveis(
     id_psicologo: int,
+    request: Request,
+    response: Response,
     start_date: str = Query(..., description="Data início (YYYY-MM-DD)"),
     end_date: str = Query(..., description="Data fim (YYYY-MM-DD)"),
     appointment_type: str = Query("online", description="Tipo de agendamento")
 ):
     """Obter datas com horários disponíveis (para calendário)"""
-    import sys
-    print(f"=== DEBUG: Endpoint available-dates CHAMADO ===", file=sys.stderr, flush=True)
-    print(f"ID Psicólogo: {id_psicologo}", file=sys.stderr, flush=True)
-    print(f"Data início: {start_date}", file=sys.stderr, flush=True)
-    print(f"Data fim: {end_date}", file=sys.stderr, flush=True)
-    print(f"Tipo agendamento: {appointment_type}", file=sys.stderr, flush=True)
+    logger.debug(
+        "Available-dates: psicólogo=%s início=%s fim=%s tipo=%s",
+        id_psicologo, start_date, end_date, appointment_type
+    )
     
     from datetime import date as date_type
     
@@ -380,9 +360,7 @@ def obter_datas_disponiveis(
         )
     
     # Verificar se psicólogo existe
-    psicologo = Psychologist.obter_por_id(id_psicologo)
-    
-    if not psicologo:
+    if Psychologist.obter_versao(id_psicologo) is None:
         raise HTTPException(
             status_code=404,
             detail="Psicólogo não encontrado"
@@ -395,12 +373,23 @@ def obter_datas_disponiveis(
             detail="Período não pode exceder 90 dias"
         )
     
+    # Horários passados saem da resposta: a hora atual também faz parte da versão
+    etag = gerar_etag(
+        "available-dates", id_psicologo, start_date, end_date, appointment_type,
+        datetime.now(timezone.utc).strftime("%Y-%m-%dT%H"),
+        ResourceVersion.obter(chave_agenda(id_psicologo))
+    )
+    nao_modificado = verificar_condicional(request, response, etag, POLITICA_AGENDA)
+    if nao_modificado:
+        return nao_modificado
+    
     # Obter slots disponíveis
     disponibilidade_semanal = PsychologistAvailability.listar_por_psicologo(id_psicologo, apenas_disponiveis=True)
     
-    print(f"DEBUG available-dates: Psicólogo {id_psicologo}, Disponibilidades encontradas: {len(disponibilidade_semanal)}")
-    for disp in disponibilidade_semanal:
-        print(f"  - ID: {disp.id}, Dia: {disp.dia_da_semana}, Horário: {disp.horario_inicio}-{disp.horario_fim}, Disponível: {disp.esta_disponivel}")
+    logger.debug("Available-dates: Psicólogo %s, Disponibilidades encontradas: %s", id_psicologo, len(disponibilidade_semanal))
+    if logger.isEnabledFor(logging.DEBUG):
+        for disp in disponibilidade_semanal:
+            logger.debug("- ID: %s, Dia: %s, Horário: %s-%s, Disponível: %s", disp.id, disp.dia_da_semana, disp.horario_inicio, disp.horario_fim, disp.esta_disponivel)
     
     if not disponibilidade_semanal:
         datas = []
@@ -476,7 +465,7 @@ def obter_datas_disponiveis(
                                 "available": True
                             })
                         else:
-                            print(f"DEBUG available-dates: Slot {data_atual.isoformat()} {horario_atual} filtrado - data_atual={data_atual}, agora_date={agora_date}, is_future={is_future_date}, is_today_future={is_today_future_time}")
+                            logger.debug("Available-dates: Slot %s %s filtrado - agora_date=%s, is_future=%s, is_today_future=%s", data_atual, horario_atual, agora_date, is_future_date, is_today_future_time)
                     
                     horario_atual = proximo_horario
             
@@ -497,9 +486,10 @@ def obter_datas_disponiveis(
         
         datas = list(dicionario_datas.values())
     
-    print(f"DEBUG available-dates: Retornando {len(datas)} datas disponíveis")
-    for data_info in datas:
-        print(f"  - Data: {data_info['date']}, Slots: {data_info['count']}")
+    logger.debug("Available-dates: Retornando %s datas disponíveis", len(datas))
+    if logger.isEnabledFor(logging.DEBUG):
+        for data_info in datas:
+            logger.debug("- Data: %s, Slots: %s", data_info['date'], data_info['count'])
     
     return {
         "psychologist_id": id_psicologo,
@@ -1,12 +1,13 @@
 """
 Favorite Controller - Endpoints de favoritos
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
 from app import auth
 from app.schemas import PsychologistListItem
 from app.models.usuario import User
 from app.models.psicologo import Psychologist
+from app.projecao import obter_projecao
 
 router = APIRouter()
 
@@ -76,17 +77,24 @@ def remover_favorito(
 
 @router.get("/", response_model=List[PsychologistListItem])
 def obter_favoritos(
+    campos: Optional[str] = Query(None, alias="fields", description="Campos a retornar, separados por vírgula (ex.: id,user.nome_completo)"),
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Obter favoritos"""
+    projecao = obter_projecao(campos, PsychologistListItem)
     usuario = User.obter_por_id(usuario_atual.id)
     if not usuario:
         return []
     
     # Recarregar com relacionamentos
-    usuario = usuario.obter_com_favoritos_completo()
+    usuario = usuario.obter_com_favoritos_completo(
+        opcoes_carregamento=projecao.opcoes(Psychologist) if projecao else None
+    )
+    favoritos = usuario.favorite_psychologists if usuario else []
     
-    return usuario.favorite_psychologists if usuario else []
+    if projecao:
+        return projecao.resposta(favoritos, lista=True)
+    return favoritos
 
 @router.get("/verificar/{id_psicologo}")
 def verificar_favorito(
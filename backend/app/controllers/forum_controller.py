@@ -1,6 +1,7 @@
 """
 Forum Controller - Endpoints de fórum
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 from app import auth
@@ -13,6 +14,8 @@ from app.models.post_forum import ForumPost
 from app.models.comentario_forum import ForumComment
 from sqlalchemy.orm import joinedload
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/posts", response_model=ForumPostResponse, status_code=status.HTTP_201_CREATED)
@@ -21,11 +24,9 @@ def criar_post(
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Criar post no fórum"""
-    import sys
-    import traceback
     
     try:
-        print(f"DEBUG: Criando post - Título: {post.title}, Categoria: {post.category}, Anônimo: {post.is_anonymous}", file=sys.stderr, flush=True)
+        logger.debug("Criando post - Título: %s, Categoria: %s, Anônimo: %s", post.title, post.category, post.is_anonymous)
         
         post_objeto = ForumPost.criar(
             id_usuario=usuario_atual.id,
@@ -35,22 +36,14 @@ def criar_post(
             eh_anonimo=post.is_anonymous
         )
         
-        print(f"DEBUG: Post criado com sucesso - ID: {post_objeto.id}", file=sys.stderr, flush=True)
+        logger.debug("Post criado com sucesso - ID: %s", post_objeto.id)
         
         # Recarregar com relacionamentos e contagem de comentários
-        post_objeto = ForumPost.obter_por_id(post_objeto.id)
-        
-        # Serializar manualmente para garantir que funciona
-        from app.schemas.forum import ForumPostResponse
-        post_dict = ForumPostResponse.model_validate(post_objeto).model_dump(by_alias=True, mode='json')
-        
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=post_dict, status_code=status.HTTP_201_CREATED)
+        return ForumPost.obter_por_id(post_objeto.id)
     except HTTPException:
         raise
     except Exception as e:
-        print(f"ERROR: Erro ao criar post: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
+        logger.exception("Erro ao criar post: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao criar post: {str(e)}"
@@ -64,25 +57,7 @@ def listar_posts(
     tamanho_pagina: int = Query(20, ge=1, le=100)
 ):
     """Listar posts do fórum"""
-    posts = ForumPost.listar(categoria=categoria, busca=busca, pagina=pagina, tamanho_pagina=tamanho_pagina)
-    
-    # Serializar manualmente para garantir que os aliases sejam usados
-    try:
-        from app.schemas.forum import ForumPostResponse
-        serialized = []
-        for post in posts:
-            post_dict = ForumPostResponse.model_validate(post).model_dump(by_alias=True, mode='json')
-            serialized.append(post_dict)
-        
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=serialized)
-    except Exception as e:
-        import sys
-        import traceback
-        print(f"ERROR: Erro ao serializar posts: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-        # Fallback: retornar sem serialização manual
-        return posts
+    return ForumPost.listar(categoria=categoria, busca=busca, pagina=pagina, tamanho_pagina=tamanho_pagina)
 
 @router.get("/posts/{id_post}", response_model=ForumPostResponse)
 def obter_post(
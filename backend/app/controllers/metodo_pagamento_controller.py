@@ -1,6 +1,7 @@
 """
 Payment Method Controller - Endpoints para gerenciar métodos de pagamento salvos
 """
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from app import auth
@@ -10,7 +11,8 @@ from app.schemas.metodo_pagamento import (
 from app.models.usuario import User
 from app.models.metodo_pagamento import PaymentMethod
 import re
-import sys
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -41,20 +43,14 @@ def parse_expiry(expiry: str) -> tuple:
     full_year = f"20{year}" if len(year) == 2 else year
     return month, full_year
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=PaymentMethodResponse, status_code=status.HTTP_201_CREATED)
 def criar_metodo_pagamento(
     metodo: PaymentMethodCreate,
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Criar novo método de pagamento"""
     try:
-        print(f"=== DEBUG: criar_metodo_pagamento CHAMADO ===", file=sys.stderr, flush=True)
-        print(f"Card Type: {metodo.card_type}", file=sys.stderr, flush=True)
-        print(f"Card Number: {metodo.card_number[:4]}...{metodo.card_number[-4:]}", file=sys.stderr, flush=True)
-        print(f"Card Holder: {metodo.card_holder}", file=sys.stderr, flush=True)
-        print(f"Card Expiry: {metodo.card_expiry}", file=sys.stderr, flush=True)
-        print(f"Card CVV: {'*' * len(metodo.card_cvv)}", file=sys.stderr, flush=True)
-        print(f"Is Default: {metodo.is_default}", file=sys.stderr, flush=True)
+        logger.debug("Criar método de pagamento: tipo=%s padrão=%s", metodo.card_type, metodo.is_default)
         
         # Detectar bandeira do cartão
         card_brand = detect_card_brand(metodo.card_number)
@@ -78,22 +74,10 @@ def criar_metodo_pagamento(
             eh_padrao=metodo.is_default
         )
         
-        # Serializar manualmente para garantir campos corretos
-        try:
-            from app.schemas.metodo_pagamento import PaymentMethodResponse
-            metodo_dict = PaymentMethodResponse.model_validate(metodo_created).model_dump(by_alias=True, mode='json')
-            from fastapi.responses import JSONResponse
-            print(f"DEBUG: Método criado com sucesso - ID: {metodo_created.id}", file=sys.stderr, flush=True)
-            return JSONResponse(content=metodo_dict, status_code=status.HTTP_201_CREATED)
-        except Exception as e:
-            import traceback
-            print(f"ERROR: Erro ao serializar método de pagamento: {e}", file=sys.stderr, flush=True)
-            traceback.print_exc(file=sys.stderr)
-            return metodo_created
+        logger.debug("Método criado com sucesso - ID: %s", metodo_created.id)
+        return metodo_created
     except Exception as e:
-        import traceback
-        print(f"ERROR: Erro ao criar método de pagamento: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
+        logger.exception("Erro ao criar método de pagamento: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao criar método de pagamento: {str(e)}"
@@ -104,19 +88,7 @@ def listar_metodos_pagamento(
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Listar métodos de pagamento do usuário"""
-    metodos = PaymentMethod.listar_por_usuario(usuario_atual.id)
-    # Serializar manualmente
-    try:
-        from app.schemas.metodo_pagamento import PaymentMethodResponse
-        metodos_dict = [PaymentMethodResponse.model_validate(m).model_dump(by_alias=True, mode='json') for m in metodos]
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=metodos_dict)
-    except Exception as e:
-        import sys
-        import traceback
-        print(f"ERROR: Erro ao serializar métodos de pagamento: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-        return metodos
+    return PaymentMethod.listar_por_usuario(usuario_atual.id)
 
 @router.get("/{id_metodo}", response_model=PaymentMethodResponse)
 def obter_metodo_pagamento(
@@ -138,18 +110,7 @@ def obter_metodo_pagamento(
             detail="Você não tem permissão para acessar este método de pagamento"
         )
     
-    # Serializar manualmente
-    try:
-        from app.schemas.metodo_pagamento import PaymentMethodResponse
-        metodo_dict = PaymentMethodResponse.model_validate(metodo).model_dump(by_alias=True, mode='json')
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=metodo_dict)
-    except Exception as e:
-        import sys
-        import traceback
-        print(f"ERROR: Erro ao serializar método de pagamento: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-        return metodo
+    return metodo
 
 @router.put("/{id_metodo}", response_model=PaymentMethodResponse)
 def atualizar_metodo_pagamento(
@@ -186,23 +147,10 @@ def atualizar_metodo_pagamento(
     if metodo_update.is_default is not None:
         update_data['eh_padrao'] = metodo_update.is_default
     
-    metodo_atualizado = metodo.atualizar(**update_data)
+    metodo.atualizar(**update_data)
     
     # Recarregar método
-    metodo_atualizado = PaymentMethod.obter_por_id(id_metodo)
-    
-    # Serializar manualmente
-    try:
-        from app.schemas.metodo_pagamento import PaymentMethodResponse
-        metodo_dict = PaymentMethodResponse.model_validate(metodo_atualizado).model_dump(by_alias=True, mode='json')
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=metodo_dict)
-    except Exception as e:
-        import sys
-        import traceback
-        print(f"ERROR: Erro ao serializar método de pagamento atualizado: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-        return metodo_atualizado
+    return PaymentMethod.obter_por_id(id_metodo)
 
 @router.post("/{id_metodo}/definir-padrao", response_model=PaymentMethodResponse)
 def definir_metodo_padrao(
@@ -224,23 +172,10 @@ def definir_metodo_padrao(
             detail="Você não tem permissão para definir este método como padrão"
         )
     
-    metodo_atualizado = metodo.atualizar(eh_padrao=True)
+    metodo.atualizar(eh_padrao=True)
     
     # Recarregar método
-    metodo_atualizado = PaymentMethod.obter_por_id(id_metodo)
-    
-    # Serializar manualmente
-    try:
-        from app.schemas.metodo_pagamento import PaymentMethodResponse
-        metodo_dict = PaymentMethodResponse.model_validate(metodo_atualizado).model_dump(by_alias=True, mode='json')
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=metodo_dict)
-    except Exception as e:
-        import sys
-        import traceback
-        print(f"ERROR: Erro ao serializar método de pagamento: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-        return metodo_atualizado
+    return PaymentMethod.obter_por_id(id_metodo)
 
 @router.delete("/{id_metodo}", status_code=status.HTTP_204_NO_CONTENT)
 def deletar_metodo_pagamento(
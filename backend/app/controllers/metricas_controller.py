@@ -0,0 +1,27 @@
+"""
+Metrics Controller - Endpoint de métricas no formato do Prometheus
+"""
+import hmac
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from app.metricas import METRICS_TOKEN, renderizar
+from app.models.outbox_notificacao import NotificationOutbox
+
+router = APIRouter()
+
+def _medidores_globais() -> dict:
+    """Medidores compartilhados por todos os workers (não são somados)"""
+    return {"notification_outbox_pending": NotificationOutbox.contar_pendentes()}
+
+@router.get("", response_class=PlainTextResponse, include_in_schema=False)
+async def obter_metricas(request: Request):
+    """Métricas de requisições, pool do banco e filas (text/plain; version=0.0.4)"""
+    if METRICS_TOKEN:
+        esperado = f"Bearer {METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get("authorization", ""), esperado):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido")
+    
+    medidores = await run_in_threadpool(_medidores_globais)
+    conteudo = await run_in_threadpool(renderizar, medidores)
+    return PlainTextResponse(conteudo, media_type="text/plain; version=0.0.4; charset=utf-8")
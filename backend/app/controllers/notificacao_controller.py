@@ -1,15 +1,25 @@
 """
 Notification Controller - Endpoints de notificações
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+import json
 from app import auth
-from app.schemas import NotificationResponse
+from app.eventos import obter_broker, canal_usuario
+from app.schemas import NotificationResponse, NotificationBatchRead
 from app.models.usuario import User
 from app.models.notificacao import Notification
 
 router = APIRouter()
 
+INTERVALO_KEEPALIVE_SEGUNDOS = 15
+
+def _formatar_evento_sse(evento: str, dados: dict) -> str:
+    """Formatar mensagem no padrão Server-Sent Events"""
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
 @router.get("/", response_model=List[NotificationResponse])
 def obter_notificacoes(
     lida: Optional[bool] = Query(None),
@@ -28,14 +38,43 @@ def obter_contagem_nao_lidas(
     contagem = Notification.contar_nao_lidas(usuario_atual.id)
     return {"unread_count": contagem}
 
+@router.get("/stream")
+async def stream_notificacoes(
+    request: Request,
+    usuario_atual: User = Depends(auth.get_current_active_user)
+):
+    """Stream de notificações em tempo real (Server-Sent Events)"""
+    broker = obter_broker()
+    assinatura = broker.assinar(canal_usuario(usuario_atual.id))
+    
+    async def gerar_eventos():
+        try:
+            # Estado inicial para o cliente não precisar de uma consulta extra
+            contagem = await run_in_threadpool(Notification.contar_nao_lidas, usuario_atual.id)
+            yield _formatar_evento_sse("unread_count", {"unread_count": contagem})
+            
+            while not await request.is_disconnected():
+                mensagem = await assinatura.proxima(timeout=INTERVALO_KEEPALIVE_SEGUNDOS)
+                if mensagem is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _formatar_evento_sse(mensagem["event"], mensagem["data"])
+        finally:
+            assinatura.cancelar()
+    
+    return StreamingResponse(
+        gerar_eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.put("/{id_notificacao}/ler", response_model=NotificationResponse)
 def marcar_notificacao_como_lida(
     id_notificacao: int,
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Marcar notificação como lida"""
-    notificacoes = Notification.listar_por_usuario(usuario_atual.id, limite=1000)
-    notificacao = next((n for n in notificacoes if n.id == id_notificacao), None)
+    notificacao = Notification.marcar_como_lida(id_notificacao, usuario_atual.id)
     
     if not notificacao:
         raise HTTPException(
@@ -43,9 +82,17 @@ def marcar_notificacao_como_lida(
             detail="Notificação não encontrada"
         )
     
-    notificacao.marcar_como_lida()
     return notificacao
 
+@router.put("/marcar-lidas")
+def marcar_notificacoes_como_lidas(
+    dados: NotificationBatchRead,
+    usuario_atual: User = Depends(auth.get_current_active_user)
+):
+    """Marcar uma lista de notificações como lidas"""
+    notificacoes = Notification.marcar_como_lidas(usuario_atual.id, dados.ids)
+    return {"marked_count": len(notificacoes), "ids": [n.id for n in notificacoes]}
+
 @router.put("/marcar-todas-lidas")
 def marcar_todas_como_lidas(
     usuario_atual: User = Depends(auth.get_current_active_user)
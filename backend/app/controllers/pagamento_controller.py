@@ -1,48 +1,50 @@
 """
 Payment Controller - Endpoints de pagamentos
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 from app import auth
-from app.schemas import PaymentCreate, PaymentResponse
+from app.schemas import PaymentCreate, PaymentResponse, PaymentDetailResponse
 from app.models.usuario import User
 from app.models.psicologo import Psychologist
 from app.models.agendamento import Appointment
 from app.models.pagamento import Payment
-from app.models.notificacao import Notification
+from app.models.arquivo_pagamento import PaymentArchive
 import uuid
 import random
 import time
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=PaymentResponse, status_code=status.HTTP_201_CREATED)
 def criar_pagamento(
     pagamento: PaymentCreate,
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Criar pagamento"""
-    import sys
-    print(f"=== DEBUG: criar_pagamento CHAMADO ===", file=sys.stderr, flush=True)
-    print(f"Appointment ID: {pagamento.appointment_id}", file=sys.stderr, flush=True)
-    print(f"Payment Method: {pagamento.payment_method}", file=sys.stderr, flush=True)
-    print(f"User ID: {usuario_atual.id}", file=sys.stderr, flush=True)
+    logger.debug(
+        "Criar pagamento: agendamento=%s método=%s usuário=%s",
+        pagamento.appointment_id, pagamento.payment_method, usuario_atual.id
+    )
     
     # Verificar se agendamento existe
     agendamento = Appointment.obter_por_id(pagamento.appointment_id)
     
     if not agendamento:
-        print(f"DEBUG: Agendamento não encontrado", file=sys.stderr, flush=True)
+        logger.debug("Agendamento não encontrado")
         raise HTTPException(
             status_code=404,
             detail="Agendamento não encontrado"
         )
     
-    print(f"DEBUG: Agendamento encontrado - Status: {agendamento.status}, ID Usuário: {agendamento.id_usuario}", file=sys.stderr, flush=True)
+    logger.debug("Agendamento encontrado - Status: %s, ID Usuário: %s", agendamento.status, agendamento.id_usuario)
     
     # Verificar se agendamento pertence ao usuário
     if agendamento.id_usuario != usuario_atual.id:
-        print(f"DEBUG: Usuário não tem permissão - agendamento.id_usuario={agendamento.id_usuario}, usuario_atual.id={usuario_atual.id}", file=sys.stderr, flush=True)
+        logger.debug("Usuário não tem permissão - agendamento.id_usuario=%s, usuario_atual.id=%s", agendamento.id_usuario, usuario_atual.id)
         raise HTTPException(
             status_code=403,
             detail="Você só pode pagar seus próprios agendamentos"
@@ -50,7 +52,7 @@ def criar_pagamento(
     
     # Verificar se agendamento está pendente (será confirmado após pagamento)
     if agendamento.status not in ['pending', 'confirmed']:
-        print(f"DEBUG: Agendamento não pode ser pago - status={agendamento.status}", file=sys.stderr, flush=True)
+        logger.debug("Agendamento não pode ser pago - status=%s", agendamento.status)
         raise HTTPException(
             status_code=400,
             detail="Apenas agendamentos pendentes ou confirmados podem ser pagos"
@@ -60,7 +62,7 @@ def criar_pagamento(
     pagamento_existente = Payment.obter_por_agendamento(pagamento.appointment_id)
     
     if pagamento_existente and pagamento_existente.status == 'paid':
-        print(f"DEBUG: Agendamento já foi pago", file=sys.stderr, flush=True)
+        logger.debug("Agendamento já foi pago")
         raise HTTPException(
             status_code=400,
             detail="Agendamento já foi pago"
@@ -70,23 +72,23 @@ def criar_pagamento(
     psicologo = Psychologist.obter_por_id(agendamento.id_psicologo)
     
     if not psicologo:
-        print(f"DEBUG: Psicólogo não encontrado", file=sys.stderr, flush=True)
+        logger.debug("Psicólogo não encontrado")
         raise HTTPException(
             status_code=404,
             detail="Psicólogo não encontrado"
         )
     
-    print(f"DEBUG: Psicólogo encontrado - Preço: {psicologo.preco_consulta}", file=sys.stderr, flush=True)
+    logger.debug("Psicólogo encontrado - Preço: %s", psicologo.preco_consulta)
     
     if not psicologo.preco_consulta or psicologo.preco_consulta <= 0:
-        print(f"DEBUG: Preço da consulta inválido - preco_consulta={psicologo.preco_consulta}", file=sys.stderr, flush=True)
+        logger.debug("Preço da consulta inválido - preco_consulta=%s", psicologo.preco_consulta)
         raise HTTPException(
             status_code=400,
             detail="Preço da consulta do psicólogo não definido"
         )
     
-    # Verificar se é primeira consulta para aplicar desconto de 30%
-    agendamentos_anteriores = Appointment.listar_por_usuario(usuario_atual.id)
+    # Verificar se é primeira consulta para aplicar desconto de 30% (inclusive consultas arquivadas)
+    agendamentos_anteriores = Appointment.listar_por_usuario(usuario_atual.id, carregar_relacionamentos=False, incluir_historico=True)
     consultas_com_psicologo = [
         agendamento_anterior for agendamento_anterior in agendamentos_anteriores 
         if agendamento_anterior.id_psicologo == agendamento.id_psicologo and agendamento_anterior.id != agendamento.id
@@ -113,6 +115,29 @@ def criar_pagamento(
         id_pagamento = f"PAY-{uuid.uuid4().hex[:16].upper()}"
         id_transacao = None
     
+    # Notificações do pagamento são gravadas no outbox na mesma transação
+    notificacoes_pagamento = []
+    if status_pagamento == "paid":
+        # O saldo do psicólogo será creditado apenas quando a consulta for marcada como concluída
+        # (não creditar no momento do pagamento)
+        parte_psicologo = valor * 0.80
+        notificacoes_pagamento = [
+            {
+                "id_usuario": psicologo.id_usuario,
+                "titulo": "Novo Pagamento Recebido",
+                "mensagem": f"Você recebeu R$ {parte_psicologo:.2f} de uma consulta.",
+                "tipo": "payment",
+                "tipo_relacionado": "payment"
+            },
+            {
+                "id_usuario": agendamento.id_usuario,
+                "titulo": "Pagamento Confirmado",
+                "mensagem": "Seu pagamento foi processado com sucesso.",
+                "tipo": "payment",
+                "tipo_relacionado": "payment"
+            }
+        ]
+    
     # Criar registro de pagamento
     pagamento_created = Payment.criar(
         id_agendamento=pagamento.appointment_id,
@@ -121,83 +146,33 @@ def criar_pagamento(
         metodo_pagamento=pagamento.payment_method,
         status=status_pagamento,
         id_pagamento=id_pagamento,
-        id_transacao=id_transacao
+        id_transacao=id_transacao,
+        notificacoes=notificacoes_pagamento
     )
     
     # Atualizar status do agendamento (usar nome do campo do modelo)
-    print(f"DEBUG: Atualizando agendamento {agendamento.id} - status_pagamento: {status_pagamento}, id_pagamento: {id_pagamento}", file=sys.stderr, flush=True)
+    logger.debug("Atualizando agendamento %s - status_pagamento: %s, id_pagamento: %s", agendamento.id, status_pagamento, id_pagamento)
     agendamento.atualizar(status_pagamento=status_pagamento, id_pagamento=id_pagamento)
     
     # Recarregar agendamento do banco para garantir que temos a versão mais recente
     agendamento = Appointment.obter_por_id(agendamento.id)
-    print(f"DEBUG: Agendamento recarregado - status: {agendamento.status}, status_pagamento: {agendamento.status_pagamento}", file=sys.stderr, flush=True)
-    
-    if status_pagamento == "paid":
-        # Confirmar agendamento após pagamento bem-sucedido
-        if agendamento.status == 'pending':
-            agendamento.atualizar(status='confirmed')
-            # Recarregar novamente após confirmar
-            agendamento = Appointment.obter_por_id(agendamento.id)
-            print(f"DEBUG: Agendamento confirmado após pagamento - ID: {agendamento.id}, status: {agendamento.status}, status_pagamento: {agendamento.status_pagamento}", file=sys.stderr, flush=True)
-            
-            # Atualizar notificação do psicólogo sobre confirmação
-            try:
-                Notification.criar(
-                    id_usuario=psicologo.id_usuario,
-                    titulo="Agendamento Confirmado",
-                    mensagem=f"O agendamento com {usuario_atual.nome_completo} foi confirmado após o pagamento.",
-                    tipo="appointment",
-                    id_relacionado=agendamento.id,
-                    tipo_relacionado="appointment",
-                    foi_lida=False
-                )
-            except Exception as e:
-                print(f"DEBUG: Erro ao criar notificação de confirmação (não crítico): {e}", file=sys.stderr, flush=True)
-        
-        # O saldo do psicólogo será creditado apenas quando a consulta for marcada como concluída
-        # (não creditar no momento do pagamento)
-        
-        # Criar notificação para o psicólogo sobre pagamento
-        try:
-            Notification.criar(
-                id_usuario=psicologo.id_usuario,
-                titulo="Novo Pagamento Recebido",
-                mensagem=f"Você recebeu R$ {parte_psicologo:.2f} de uma consulta.",
-                tipo="payment",
-                id_relacionado=pagamento_created.id,
-                tipo_relacionado="payment",
-                foi_lida=False
-            )
-        except Exception as e:
-            print(f"DEBUG: Erro ao criar notificação para psicólogo (não crítico): {e}", file=sys.stderr, flush=True)
-        
-        # Criar notificação para o cliente
-        try:
-            Notification.criar(
-                id_usuario=agendamento.id_usuario,
-                titulo="Pagamento Confirmado",
-                mensagem="Seu pagamento foi processado com sucesso.",
-                tipo="payment",
-                id_relacionado=pagamento_created.id,
-                tipo_relacionado="payment",
-                foi_lida=False
-            )
-        except Exception as e:
-            print(f"DEBUG: Erro ao criar notificação para cliente (não crítico): {e}", file=sys.stderr, flush=True)
-    
-    # Serializar manualmente para garantir que os aliases sejam usados
-    try:
-        from app.schemas import PaymentResponse
-        serialized = PaymentResponse.model_validate(pagamento_created).model_dump(by_alias=True, mode='json')
-        print(f"DEBUG: Pagamento serializado com sucesso", file=sys.stderr, flush=True)
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=serialized, status_code=201)
-    except Exception as e:
-        print(f"ERROR: Erro ao serializar pagamento: {e}", file=sys.stderr, flush=True)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
-        # Fallback: retornar sem serialização manual
-        return pagamento_created
+    logger.debug("Agendamento recarregado - status: %s, status_pagamento: %s", agendamento.status, agendamento.status_pagamento)
+    
+    # Confirmar agendamento após pagamento bem-sucedido, avisando o psicólogo
+    if status_pagamento == "paid" and agendamento.status == 'pending':
+        agendamento.atualizar(
+            status='confirmed',
+            notificacoes=[{
+                "id_usuario": psicologo.id_usuario,
+                "titulo": "Agendamento Confirmado",
+                "mensagem": f"O agendamento com {usuario_atual.nome_completo} foi confirmado após o pagamento.",
+                "tipo": "appointment",
+                "tipo_relacionado": "appointment"
+            }]
+        )
+        # Recarregar novamente após confirmar
+        agendamento = Appointment.obter_por_id(agendamento.id)
+        logger.debug("Agendamento confirmado após pagamento - ID: %s, status: %s, status_pagamento: %s", agendamento.id, agendamento.status, agendamento.status_pagamento)
     
     return pagamento_created
 
@@ -236,62 +211,13 @@ def obter_pagamento_por_agendamento(
     
     return pagamento
 
-@router.get("/meus-pagamentos", response_model=List[PaymentResponse])
+@router.get("/meus-pagamentos", response_model=List[PaymentDetailResponse])
 def obter_meus_pagamentos(
+    incluir_historico: bool = Query(False, alias="include_history", description="Incluir pagamentos antigos já arquivados"),
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Obter meus pagamentos"""
-    pagamentos = Payment.listar_por_usuario(usuario_atual.id)
-    
-    # Serializar manualmente para garantir campos corretos
-    try:
-        from app.schemas.pagamento import PaymentResponse
-        from app.schemas.agendamento import AppointmentResponse
-        
-        pagamentos_dict = []
-        for pagamento in pagamentos:
-            try:
-                # Serializar appointment se existir
-                appointment_dict = None
-                if pagamento.appointment:
-                    try:
-                        appointment_dict = AppointmentResponse.model_validate(pagamento.appointment).model_dump(by_alias=True, mode='json')
-                    except Exception as e:
-                        import sys
-                        print(f"ERROR: Erro ao serializar appointment do pagamento {pagamento.id}: {e}", file=sys.stderr, flush=True)
-                
-                # Serializar pagamento
-                pagamento_dict = PaymentResponse.model_validate(pagamento).model_dump(by_alias=True, mode='json')
-                if appointment_dict:
-                    pagamento_dict['appointment'] = appointment_dict
-                
-                pagamentos_dict.append(pagamento_dict)
-            except Exception as e:
-                import sys
-                print(f"ERROR: Erro ao serializar pagamento {pagamento.id}: {e}", file=sys.stderr, flush=True)
-                # Fallback: serialização manual básica
-                pagamento_dict = {
-                    "id": pagamento.id,
-                    "appointment_id": pagamento.id_agendamento,
-                    "user_id": pagamento.id_usuario,
-                    "amount": pagamento.valor,
-                    "payment_method": pagamento.metodo_pagamento,
-                    "status": pagamento.status,
-                    "payment_id": pagamento.id_pagamento,
-                    "transaction_id": pagamento.id_transacao,
-                    "created_at": pagamento.criado_em.isoformat() if pagamento.criado_em else None,
-                    "updated_at": pagamento.atualizado_em.isoformat() if pagamento.atualizado_em else None
-                }
-                pagamentos_dict.append(pagamento_dict)
-        
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=pagamentos_dict)
-    except Exception as e:
-        import sys
-        import traceback
-        print(f"ERROR: Erro ao serializar pagamentos: {e}", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-        return pagamentos
+    return Payment.listar_por_usuario(usuario_atual.id, incluir_historico=incluir_historico)
 
 @router.post("/{id_pagamento}/reembolsar", response_model=PaymentResponse)
 def reembolsar_pagamento(
@@ -318,9 +244,10 @@ def reembolsar_pagamento(
     
     return pagamento
 
-@router.get("/historico-financeiro", response_model=List[PaymentResponse])
-@router.get("/financial-history", response_model=List[PaymentResponse])  # Alias em inglês para compatibilidade com frontend
+@router.get("/historico-financeiro", response_model=List[PaymentDetailResponse])
+@router.get("/financial-history", response_model=List[PaymentDetailResponse])  # Alias em inglês para compatibilidade com frontend
 def obter_historico_financeiro(
+    incluir_historico: bool = Query(False, alias="include_history", description="Incluir pagamentos antigos já arquivados"),
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
     """Obter histórico financeiro (para psicólogos)"""
@@ -343,59 +270,34 @@ def obter_historico_financeiro(
     
     ids_agendamentos = [ag.id for ag in agendamentos]
     
+    # Pagamentos de agendamentos arquivados ficam em payments_archive
+    arquivados = PaymentArchive.listar_pagos_por_psicologo(psicologo.id) if incluir_historico else []
+    
     if not ids_agendamentos:
-        return []
+        return arquivados
     
     # Buscar pagamentos dos agendamentos do psicólogo diretamente do banco
-    # IMPORTANTE: Carregar relacionamentos (appointment e user) para exibir informações no frontend
+    # IMPORTANTE: Carregar relacionamentos (agendamento, cliente e psicólogo) para exibir informações no frontend
     from app.database import get_db_session
     from sqlalchemy.orm import joinedload
     db = get_db_session()
     try:
+        agendamento = joinedload(Payment.appointment)
         pagamentos = db.query(Payment).options(
-            joinedload(Payment.appointment).joinedload(Appointment.user),
-            joinedload(Payment.user)
+            agendamento.joinedload(Appointment.psychologist).joinedload(Psychologist.user),
+            agendamento.joinedload(Appointment.psychologist).joinedload(Psychologist.specialties),
+            agendamento.joinedload(Appointment.psychologist).joinedload(Psychologist.approaches),
+            agendamento.joinedload(Appointment.user)
         ).filter(
             Payment.id_agendamento.in_(ids_agendamentos),
             Payment.status == 'paid'
         ).order_by(Payment.criado_em.desc()).all()
-        
-        # Serializar manualmente para incluir relacionamentos
-        from app.schemas.pagamento import PaymentResponse
-        from app.schemas.agendamento import AppointmentResponse
-        from app.schemas.autenticacao import UserResponse
-        
-        import sys
-        serialized = []
-        for pagamento in pagamentos:
-            # Serializar pagamento
-            pagamento_dict = PaymentResponse.model_validate(pagamento).model_dump(by_alias=True, mode='json')
-            
-            print(f"DEBUG: Pagamento {pagamento.id} - Appointment: {pagamento.appointment is not None}", file=sys.stderr, flush=True)
-            
-            # Adicionar informações do agendamento e usuário
-            if pagamento.appointment:
-                appointment_dict = AppointmentResponse.model_validate(pagamento.appointment).model_dump(by_alias=True, mode='json')
-                pagamento_dict['appointment'] = appointment_dict
-                
-                print(f"DEBUG: Appointment {pagamento.appointment.id} - User: {pagamento.appointment.user is not None}", file=sys.stderr, flush=True)
-                
-                # Adicionar informações do usuário do agendamento
-                if pagamento.appointment.user:
-                    user_dict = UserResponse.model_validate(pagamento.appointment.user).model_dump(by_alias=True, mode='json')
-                    pagamento_dict['appointment']['user'] = user_dict
-                    print(f"DEBUG: User {pagamento.appointment.user.id} - Nome: {pagamento.appointment.user.nome_completo}", file=sys.stderr, flush=True)
-                else:
-                    print(f"DEBUG: Appointment {pagamento.appointment.id} não tem user associado", file=sys.stderr, flush=True)
-            else:
-                print(f"DEBUG: Pagamento {pagamento.id} não tem appointment associado", file=sys.stderr, flush=True)
-            
-            serialized.append(pagamento_dict)
-        
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=serialized)
     finally:
         db.close()
+    
+    if arquivados:
+        pagamentos = sorted(pagamentos + arquivados, key=lambda pagamento: pagamento.criado_em, reverse=True)
+    return pagamentos
 
 @router.get("/saldo")
 @router.get("/balance")  # Alias em inglês para compatibilidade com frontend
@@ -417,8 +319,9 @@ def obter_saldo(
             detail="Perfil de psicólogo não encontrado"
         )
     
+    # Saldo direto do banco: o psicólogo em cache pode estar defasado
     return {
-        "balance": psicologo.saldo or 0.0,
+        "balance": Psychologist.obter_saldo(psicologo.id) or 0.0,
         "psychologist_id": psicologo.id
     }
 
@@ -1,15 +1,19 @@
 """
 Psychologist Controller - Endpoints de psicólogos
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
-from typing import List
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
 from app import auth
 from app.schemas import (
     PsychologistCreate, PsychologistUpdate, PsychologistResponse, PsychologistListItem
 )
 from app.models.usuario import User
 from app.models.psicologo import Psychologist
+from app.projecao import obter_projecao
+from app.etag import POLITICA_PSICOLOGO, gerar_etag, verificar_condicional
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -78,7 +82,7 @@ def criar_perfil_psicologo(
             detail=f"Erro ao criar perfil de psicólogo: {str(e)}"
         )
 
-@router.get("/me")
+@router.get("/me", response_model=PsychologistResponse)
 def obter_meu_perfil(
     usuario_atual: User = Depends(auth.get_current_active_user)
 ):
@@ -90,32 +94,9 @@ def obter_meu_perfil(
             detail="Perfil de psicólogo não encontrado"
         )
     # Recarregar com relacionamentos
-    psicologo = Psychologist.obter_por_id(psicologo.id, carregar_relacionamentos=True)
-    
-    # Criar o objeto de resposta e serializar manualmente para garantir que use os nomes dos campos
-    # (não os aliases em português)
-    try:
-        response_obj = PsychologistResponse.model_validate(psicologo)
-        # Serializar sem aliases para garantir que o frontend receba os campos corretos
-        # IMPORTANTE: serializar objetos aninhados também sem aliases
-        try:
-            # Tentar usar mode='json' (Pydantic v2)
-            serialized = response_obj.model_dump(by_alias=False, mode='json')
-        except TypeError:
-            # Se mode='json' não existir (Pydantic v1), usar apenas by_alias=False
-            serialized = response_obj.model_dump(by_alias=False)
-        
-        
-        return JSONResponse(content=serialized)
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erro ao serializar resposta: {str(e)}"
-        )
+    return Psychologist.obter_por_id(psicologo.id, carregar_relacionamentos=True)
 
-@router.put("/me")
+@router.put("/me", response_model=PsychologistResponse)
 def atualizar_meu_perfil(
     atualizacao_psicologo: PsychologistUpdate,
     usuario_atual: User = Depends(auth.get_current_active_user)
@@ -153,10 +134,7 @@ def atualizar_meu_perfil(
         dados_modelo["consulta_presencial"] = False
     
     # Processar outros campos opcionais
-    try:
-        dados_atualizacao = atualizacao_psicologo.model_dump(exclude_unset=True, exclude={"specialty_ids", "approach_ids", "experience_years", "online_consultation", "in_person_consultation"})
-    except AttributeError:
-        dados_atualizacao = atualizacao_psicologo.dict(exclude_unset=True, exclude={"specialty_ids", "approach_ids", "experience_years", "online_consultation", "in_person_consultation"})
+    dados_atualizacao = atualizacao_psicologo.model_dump(exclude_unset=True, exclude={"specialty_ids", "approach_ids", "experience_years", "online_consultation", "in_person_consultation"})
     
     if "bio" in dados_atualizacao:
         dados_modelo["biografia"] = dados_atualizacao["bio"]
@@ -180,62 +158,48 @@ def atualizar_meu_perfil(
     )
     
     # Recarregar com relacionamentos
-    psicologo_object = Psychologist.obter_por_id(psicologo_updated.id, carregar_relacionamentos=True)
-    
-    # Criar o objeto de resposta e serializar manualmente para garantir que use os nomes dos campos
-    # (não os aliases em português)
-    try:
-        response_obj = PsychologistResponse.model_validate(psicologo_object)
-        # Serializar sem aliases para garantir que o frontend receba os campos corretos
-        # IMPORTANTE: serializar objetos aninhados também sem aliases
-        try:
-            # Tentar usar mode='json' (Pydantic v2)
-            serialized = response_obj.model_dump(by_alias=False, mode='json')
-        except TypeError:
-            # Se mode='json' não existir (Pydantic v1), usar apenas by_alias=False
-            serialized = response_obj.model_dump(by_alias=False)
-        
-        
-        return JSONResponse(content=serialized)
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erro ao serializar resposta: {str(e)}"
-        )
+    return Psychologist.obter_por_id(psicologo_updated.id, carregar_relacionamentos=True)
 
-@router.get("/{id_psicologo}")
+@router.get("/{id_psicologo}", response_model=PsychologistResponse)
 def obter_psicologo(
-    id_psicologo: int
+    id_psicologo: int,
+    request: Request,
+    response: Response
 ):
     """Obter psicólogo por ID"""
-    psicologo = Psychologist.obter_por_id(id_psicologo, carregar_relacionamentos=True)
+    # Versão primeiro: com If-None-Match válido responde 304 sem carregar o perfil
+    versao = Psychologist.obter_versao(id_psicologo)
+    if versao is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Psicólogo não encontrado"
+        )
+    
+    etag = gerar_etag("psychologist", id_psicologo, versao)
+    nao_modificado = verificar_condicional(request, response, etag, POLITICA_PSICOLOGO)
+    if nao_modificado:
+        return nao_modificado
     
+    psicologo = Psychologist.obter_por_id(id_psicologo, carregar_relacionamentos=True)
     if not psicologo:
         raise HTTPException(
             status_code=404,
             detail="Psicólogo não encontrado"
         )
     
-    # Serializar manualmente para garantir que os campos sejam retornados com nomes em inglês
-    try:
-        # Pydantic v2
-        response_obj = PsychologistResponse.model_validate(psicologo)
-        serialized = response_obj.model_dump(by_alias=False, mode='json')
-    except AttributeError:
-        # Pydantic v1 fallback
-        response_obj = PsychologistResponse.from_orm(psicologo)
-        serialized = response_obj.dict(by_alias=False)
-    
-    return JSONResponse(content=serialized)
+    return psicologo
 
 @router.get("/", response_model=List[PsychologistListItem])
 def listar_psicologos(
     pular: int = 0,
-    limite: int = 20
+    limite: int = 20,
+    campos: Optional[str] = Query(None, alias="fields", description="Campos a retornar, separados por vírgula (ex.: id,user.nome_completo)")
 ):
     """Listar psicólogos"""
+    projecao = obter_projecao(campos, PsychologistListItem)
+    if projecao:
+        psicologos = Psychologist.listar_verificados(pular=pular, limite=limite, opcoes_carregamento=projecao.opcoes(Psychologist))
+        return projecao.resposta(psicologos, lista=True)
     psicologos = Psychologist.listar_verificados(pular=pular, limite=limite)
     return psicologos
 
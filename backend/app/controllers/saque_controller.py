@@ -8,7 +8,6 @@ from app.schemas import WithdrawalCreate, WithdrawalResponse
 from app.models.usuario import User
 from app.models.psicologo import Psychologist
 from app.models.saque import Withdrawal
-from app.models.notificacao import Notification
 
 router = APIRouter()
 
@@ -32,44 +31,36 @@ def criar_saque(
             detail="Perfil de psicólogo não encontrado"
         )
     
-    # Verificar saldo disponível
-    saldo = psicologo.saldo or 0.0
-    if saque.amount > saldo:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Saldo insuficiente. Disponível: R$ {saldo:.2f}"
-        )
-    
     if saque.amount <= 0:
         raise HTTPException(
             status_code=400,
             detail="Valor do saque deve ser maior que 0"
         )
     
-    # Criar solicitação de saque
-    saque_created = Withdrawal.criar(
-        psychologist_id=psicologo.id,
-        amount=saque.amount,
-        bank_name=saque.bank_name,
-        bank_account=saque.bank_account,
-        bank_agency=saque.bank_agency,
-        account_type=saque.account_type,
-        status='pending'
+    # Criar solicitação de saque reservando o valor (subtraído do saldo no mesmo UPDATE que confere o saldo)
+    saque_created = Withdrawal.criar_com_reserva(
+        id_psicologo=psicologo.id,
+        valor=saque.amount,
+        nome_banco=saque.bank_name,
+        conta_bancaria=saque.bank_account,
+        agencia=saque.bank_agency,
+        tipo_conta=saque.account_type,
+        status='pending',
+        notificacoes=[{
+            "id_usuario": usuario_atual.id,
+            "titulo": "Solicitação de Saque Criada",
+            "mensagem": f"Sua solicitação de saque de R$ {saque.amount:.2f} foi criada e está em análise.",
+            "tipo": "withdrawal",
+            "tipo_relacionado": "withdrawal"
+        }]
     )
     
-    # Reservar valor (subtrair do saldo)
-    psicologo.atualizar(saldo=saldo - saque.amount)
-    
-    # Criar notificação
-    Notification.criar(
-        user_id=usuario_atual.id,
-        title="Solicitação de Saque Criada",
-        message=f"Sua solicitação de saque de R$ {saque.amount:.2f} foi criada e está em análise.",
-        type="withdrawal",
-        related_id=saque_created.id,
-        related_type="withdrawal",
-        is_read=False
-    )
+    if not saque_created:
+        saldo = Psychologist.obter_saldo(psicologo.id) or 0.0
+        raise HTTPException(
+            status_code=400,
+            detail=f"Saldo insuficiente. Disponível: R$ {saldo:.2f}"
+        )
     
     return saque_created
 
@@ -0,0 +1,127 @@
+"""
+Cache de dados de referência (especialidades e abordagens)
+
+As listas quase nunca mudam, então ficam em memória no processo junto com
+os bytes JSON da resposta e o ETag já calculados: /api/search/specialties e
+/api/search/approaches não consultam o banco nem serializam nada.
+
+Invalidação versionada:
+- Alterações feitas neste processo pelo ORM descartam o conjunto no
+  after_commit (a versão em resource_versions é incrementada no mesmo flush,
+  ver models/versao_recurso.py)
+- Alterações feitas por outros processos são detectadas comparando a versão
+  em resource_versions no máximo a cada REFERENCE_CACHE_CHECK_SECONDS
+
+O conjunto é carregado no startup e recarregado sob demanda após invalidação.
+
+Configuração:
+- REFERENCE_CACHE_CHECK_SECONDS: intervalo de verificação da versão no banco
+  (padrão 30; 0 verifica a cada acesso)
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, get_db_session
+from app.etag import gerar_etag
+from app.models.especialidade import Specialty
+from app.models.tratamento import Approach
+from app.models.versao_recurso import ResourceVersion, CHAVE_ESPECIALIDADES, CHAVE_ABORDAGENS
+from app.schemas import SpecialtyResponse, ApproachResponse
+from app.serializacao import serializar
+
+load_dotenv()
+
+REFERENCE_CACHE_CHECK_SECONDS = float(os.getenv("REFERENCE_CACHE_CHECK_SECONDS", "30"))
+
+
+class ConjuntoReferencia:
+    """Retrato imutável de uma tabela de referência em uma versão"""
+    
+    def __init__(self, versao: int, itens: List, schema: type, chave: str):
+        self.versao = versao
+        self.itens: Tuple = tuple(itens)
+        self.por_id: Dict[int, object] = {item.id: item for item in itens}
+        self.corpo: bytes = serializar(schema, self.itens, lista=True)
+        self.etag = gerar_etag(chave, versao)
+
+
+class CacheReferencia:
+    """Cache de uma tabela de referência com invalidação por versão"""
+    
+    def __init__(self, modelo: type, schema: type, chave: str, intervalo: float = REFERENCE_CACHE_CHECK_SECONDS):
+        self.modelo = modelo
+        self.schema = schema
+        self.chave = chave
+        self.intervalo = intervalo
+        self._conjunto: Optional[ConjuntoReferencia] = None
+        self._verificado_em = 0.0
+        self._lock = threading.Lock()
+    
+    def obter(self) -> ConjuntoReferencia:
+        """Conjunto atual (carrega se foi invalidado ou se a versão no banco mudou)"""
+        conjunto = self._conjunto
+        if conjunto is not None and time.monotonic() - self._verificado_em < self.intervalo:
+            return conjunto
+        with self._lock:
+            conjunto = self._conjunto
+            if conjunto is None:
+                return self._carregar()
+            if time.monotonic() - self._verificado_em >= self.intervalo:
+                if ResourceVersion.obter(self.chave) != conjunto.versao:
+                    return self._carregar()
+                self._verificado_em = time.monotonic()
+            return conjunto
+    
+    def invalidar(self) -> None:
+        with self._lock:
+            self._conjunto = None
+    
+    def _carregar(self) -> ConjuntoReferencia:
+        """Ler versão e linhas na mesma sessão (chamado com o lock)"""
+        db = get_db_session()
+        try:
+            versao = db.query(ResourceVersion.versao).filter(ResourceVersion.chave == self.chave).scalar() or 0
+            itens = db.query(self.modelo).order_by(self.modelo.id).all()
+        finally:
+            db.close()
+        self._conjunto = ConjuntoReferencia(versao, itens, self.schema, self.chave)
+        self._verificado_em = time.monotonic()
+        return self._conjunto
+    
+    def anexar(self, db: Session, ids: List[int]) -> List:
+        """Instâncias dos IDs informados ligadas à sessão, sem consultar o banco (IDs inexistentes são ignorados)"""
+        por_id = self.obter().por_id
+        return [db.merge(por_id[id_item], load=False) for id_item in dict.fromkeys(ids) if id_item in por_id]
+
+
+especialidades = CacheReferencia(Specialty, SpecialtyResponse, CHAVE_ESPECIALIDADES)
+abordagens = CacheReferencia(Approach, ApproachResponse, CHAVE_ABORDAGENS)
+
+def carregar() -> None:
+    """Carregar os dados de referência (startup)"""
+    especialidades.obter()
+    abordagens.obter()
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _registrar_referencias_alteradas(sessao, contexto, instancias) -> None:
+    alteradas = sessao.info.setdefault("referencias_alteradas", set())
+    for objeto in list(sessao.new) + list(sessao.dirty) + list(sessao.deleted):
+        if not isinstance(objeto, (Specialty, Approach)):
+            continue
+        if objeto in sessao.dirty and not sessao.is_modified(objeto, include_collections=False):
+            continue
+        alteradas.add(CHAVE_ESPECIALIDADES if isinstance(objeto, Specialty) else CHAVE_ABORDAGENS)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidar_apos_commit(sessao) -> None:
+    for chave in sessao.info.pop("referencias_alteradas", ()):
+        (especialidades if chave == CHAVE_ESPECIALIDADES else abordagens).invalidar()
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_alteradas(sessao) -> None:
+    sessao.info.pop("referencias_alteradas", None)
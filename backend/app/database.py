@@ -1,20 +1,66 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./lumine.db")
+# Réplicas de leitura (ver app/replicas.py)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+APP_ENV = os.getenv("APP_ENV", "development").lower()
+# create: create_all no startup; check: só confere tabelas/colunas; skip: nada (Alembic cuida do schema)
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "skip" if APP_ENV == "production" else "create").lower()
 
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL, connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(DATABASE_URL)
+# Pool de conexões (ignorado no SQLite em memória, que usa uma conexão por thread)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # segundos; -1 desativa
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# PRAGMAs aplicados em cada nova conexão SQLite
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# Readiness: latência máxima aceita no SELECT 1
+DB_READY_MAX_LATENCY_MS = float(os.getenv("DB_READY_MAX_LATENCY_MS", "500"))
+
+def _sqlite_em_memoria(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite:/"))
+
+def criar_engine(url: str):
+    """Engine com o pool configurado por ambiente (e PRAGMAs no SQLite)"""
+    opcoes = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if url.startswith("sqlite"):
+        opcoes["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    if not _sqlite_em_memoria(url):
+        opcoes.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    novo_engine = create_engine(url, **opcoes)
+    if url.startswith("sqlite"):
+        event.listen(novo_engine, "connect", _aplicar_pragmas_sqlite)
+    return novo_engine
+
+def _aplicar_pragmas_sqlite(conexao_dbapi, registro_conexao) -> None:
+    """WAL permite leituras simultâneas a uma escrita; busy_timeout espera o lock em vez de falhar"""
+    cursor = conexao_dbapi.cursor()
+    try:
+        if SQLITE_JOURNAL_MODE:
+            cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        if SQLITE_SYNCHRONOUS:
+            cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    finally:
+        cursor.close()
+
+engine = criar_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -41,7 +87,51 @@ def get_session():
     finally:
         db.close()
 
-def get_db_session() -> Session:
-    """Obter sessão do banco (para uso dentro dos models)"""
+def get_db_session(somente_leitura: bool = False) -> Session:
+    """Obter sessão do banco (para uso dentro dos models); somente_leitura pode ser atendida por uma réplica"""
+    if somente_leitura and DATABASE_REPLICA_URLS:
+        from app.replicas import roteador_replicas
+        return roteador_replicas.sessao_leitura()
     return SessionLocal()
 
+def preparar_esquema(modo: str = SCHEMA_CHECK) -> None:
+    """Criar ou conferir o schema no startup conforme SCHEMA_CHECK"""
+    if modo == "skip":
+        return
+    import app.models  # registra todas as tabelas no metadata
+    
+    if modo == "create":
+        Base.metadata.create_all(bind=engine)
+        return
+    if modo != "check":
+        raise ValueError(f"SCHEMA_CHECK inválido: {modo} (use create, check ou skip)")
+    
+    inspetor = inspect(engine)
+    existentes = set(inspetor.get_table_names())
+    problemas = []
+    for tabela in Base.metadata.sorted_tables:
+        if tabela.name not in existentes:
+            problemas.append(f"tabela {tabela.name}")
+            continue
+        colunas = {coluna["name"] for coluna in inspetor.get_columns(tabela.name)}
+        problemas += [f"coluna {tabela.name}.{coluna.name}" for coluna in tabela.columns if coluna.name not in colunas]
+    if problemas:
+        raise RuntimeError(
+            "Schema do banco desatualizado (execute alembic upgrade head): faltando " + ", ".join(problemas)
+        )
+
+def estatisticas_pool(engine_alvo=None) -> dict:
+    """Estado do pool (conexões em uso, livres e em overflow)"""
+    pool = (engine_alvo or engine).pool
+    estatisticas = {"class": type(pool).__name__}
+    for chave, metodo in (("size", "size"), ("checked_in", "checkedin"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+        if hasattr(pool, metodo):
+            estatisticas[chave] = getattr(pool, metodo)()
+    return estatisticas
+
+def medir_latencia(engine_alvo=None) -> float:
+    """Tempo em ms de um SELECT 1 (checkout da conexão incluído)"""
+    inicio = time.perf_counter()
+    with (engine_alvo or engine).connect() as conexao:
+        conexao.execute(text("SELECT 1"))
+    return (time.perf_counter() - inicio) * 1000
@@ -0,0 +1,97 @@
+"""
+Entrega de notificações em segundo plano (drena o outbox)
+
+Os endpoints apenas gravam em notification_outbox na mesma transação da
+alteração de negócio. Este processador move as notificações em lote para a
+tabela notifications e as repassa aos pushers registrados (por padrão, o
+broker de eventos usado pelo stream SSE).
+"""
+import logging
+import os
+import threading
+from typing import Callable, List
+from dotenv import load_dotenv
+from sqlalchemy import event
+from app.database import SessionLocal
+from app.eventos import publicar_notificacao
+from app.models.outbox_notificacao import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+INTERVALO_OUTBOX_SEGUNDOS = float(os.getenv("NOTIFICATION_OUTBOX_INTERVAL_SECONDS", "1.0"))
+TAMANHO_LOTE_OUTBOX = int(os.getenv("NOTIFICATION_OUTBOX_BATCH_SIZE", "200"))
+
+_pushers: List[Callable] = [publicar_notificacao]
+
+def registrar_pusher(pusher: Callable) -> None:
+    """Registrar função chamada para cada notificação entregue"""
+    _pushers.append(pusher)
+
+
+class ProcessadorOutbox:
+    """Thread que drena o outbox de notificações em lote"""
+    
+    def __init__(self, intervalo: float = INTERVALO_OUTBOX_SEGUNDOS, tamanho_lote: int = TAMANHO_LOTE_OUTBOX):
+        self.intervalo = intervalo
+        self.tamanho_lote = tamanho_lote
+        self.entregues = 0
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+    
+    def iniciar(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="outbox-notificacoes", daemon=True)
+        self._thread.start()
+    
+    def parar(self, timeout: float = 5.0) -> None:
+        self._parar.set()
+        self._acordar.set()
+        if self._thread:
+            self._thread.join(timeout)
+        # Entregar o que ficou pendente antes de encerrar
+        self.drenar()
+    
+    def acordar(self) -> None:
+        """Antecipar a próxima drenagem (chamado após commits com notificações)"""
+        self._acordar.set()
+    
+    def drenar(self) -> int:
+        """Drenar o outbox até esvaziá-lo, retornando quantas notificações foram entregues"""
+        total = 0
+        while True:
+            notificacoes = NotificationOutbox.consumir_lote(self.tamanho_lote)
+            if not notificacoes:
+                break
+            total += len(notificacoes)
+            for notificacao in notificacoes:
+                for pusher in _pushers:
+                    try:
+                        pusher(notificacao)
+                    except Exception:
+                        logger.exception("Falha ao enviar notificação %s em tempo real", notificacao.id)
+            if len(notificacoes) < self.tamanho_lote:
+                break
+        self.entregues += total
+        return total
+    
+    def _executar(self) -> None:
+        while not self._parar.is_set():
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            try:
+                self.drenar()
+            except Exception:
+                logger.exception("Falha ao drenar o outbox de notificações")
+
+
+processador_outbox = ProcessadorOutbox()
+
+@event.listens_for(SessionLocal, "after_commit")
+def _acordar_apos_commit(sessao) -> None:
+    if sessao.info.pop("notificacoes_pendentes", False):
+        processador_outbox.acordar()
@@ -0,0 +1,59 @@
+"""
+ETags e GET condicional
+
+Os ETags são fortes e derivados só de contadores de versão (coluna
+psychologists.version ou resource_versions), então podem ser calculados com
+uma consulta de uma coluna. Quando o If-None-Match do cliente bate, o
+endpoint responde 304 antes de carregar relacionamentos e serializar.
+
+Uso no controller:
+
+    etag = gerar_etag("psychologist", id_psicologo, versao)
+    nao_modificado = verificar_condicional(request, response, etag, POLITICA_PSICOLOGO)
+    if nao_modificado:
+        return nao_modificado
+
+Configuração (Cache-Control por tipo de rota):
+- CACHE_CONTROL_PSYCHOLOGIST: perfil público do psicólogo (padrão "public, no-cache")
+- CACHE_CONTROL_REFERENCE: especialidades e abordagens (padrão "public, max-age=300")
+- CACHE_CONTROL_SCHEDULE: disponibilidade e horários livres (padrão "public, no-cache")
+"""
+import hashlib
+import os
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import Request, Response
+
+load_dotenv()
+
+POLITICA_PSICOLOGO = os.getenv("CACHE_CONTROL_PSYCHOLOGIST", "public, no-cache")
+POLITICA_REFERENCIA = os.getenv("CACHE_CONTROL_REFERENCE", "public, max-age=300")
+POLITICA_AGENDA = os.getenv("CACHE_CONTROL_SCHEDULE", "public, no-cache")
+
+
+def gerar_etag(*partes) -> str:
+    """ETag forte a partir das partes que identificam a versão da resposta"""
+    resumo = hashlib.sha1("|".join(str(parte) for parte in partes).encode()).hexdigest()[:20]
+    return f'"{resumo}"'
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca do If-None-Match (RFC 9110): ignora o prefixo W/"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidatos = (candidato.strip() for candidato in if_none_match.split(","))
+    return any(candidato.removeprefix("W/") == etag for candidato in candidatos)
+
+def verificar_condicional(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str
+) -> Optional[Response]:
+    """Resposta 304 se o cliente já tem esta versão; senão grava ETag e Cache-Control na resposta"""
+    cabecalhos = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabecalhos)
+    response.headers.update(cabecalhos)
+    return None
@@ -0,0 +1,157 @@
+"""
+Pub/sub de eventos em tempo real (usado pelo stream SSE de notificações)
+
+O broker é plugável: por padrão é usado o BrokerMemoria (um único processo).
+Em implantações com vários workers, defina EVENT_BROKER com o caminho de uma
+classe que implemente BrokerEventos (ex.: um broker baseado em Redis).
+"""
+import asyncio
+import importlib
+import os
+import threading
+from typing import Dict, Optional, Set
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EVENT_BROKER = os.getenv("EVENT_BROKER", "app.eventos.BrokerMemoria")
+TAMANHO_FILA_ASSINANTE = int(os.getenv("EVENT_SUBSCRIBER_QUEUE_SIZE", "100"))
+
+
+class Assinatura:
+    """Assinatura de um canal, consumida dentro do event loop que a criou"""
+    
+    def __init__(self, broker: "BrokerEventos", canal: str):
+        self.broker = broker
+        self.canal = canal
+        self.loop = asyncio.get_running_loop()
+        self.fila: asyncio.Queue = asyncio.Queue(maxsize=TAMANHO_FILA_ASSINANTE)
+    
+    def entregar(self, mensagem: dict) -> None:
+        """Entregar mensagem a partir de qualquer thread"""
+        self.loop.call_soon_threadsafe(self._colocar_na_fila, mensagem)
+    
+    def _colocar_na_fila(self, mensagem: dict) -> None:
+        try:
+            self.fila.put_nowait(mensagem)
+        except asyncio.QueueFull:
+            # Cliente lento: descartar a mensagem em vez de bloquear quem publica
+            pass
+    
+    async def proxima(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Aguardar a próxima mensagem (None se o timeout expirar)"""
+        try:
+            return await asyncio.wait_for(self.fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    def cancelar(self) -> None:
+        self.broker.cancelar(self)
+
+
+class BrokerEventos:
+    """Interface de broker de eventos"""
+    
+    def publicar(self, canal: str, mensagem: dict) -> None:
+        raise NotImplementedError
+    
+    def assinar(self, canal: str) -> Assinatura:
+        raise NotImplementedError
+    
+    def cancelar(self, assinatura: Assinatura) -> None:
+        raise NotImplementedError
+    
+    def tem_assinantes(self, canal: str) -> bool:
+        """Indica se vale a pena montar a mensagem para o canal"""
+        return True
+
+
+class BrokerMemoria(BrokerEventos):
+    """Broker em memória, entrega apenas para assinantes do próprio processo"""
+    
+    def __init__(self):
+        self._assinaturas: Dict[str, Set[Assinatura]] = {}
+        self._lock = threading.Lock()
+    
+    def publicar(self, canal: str, mensagem: dict) -> None:
+        with self._lock:
+            assinaturas = list(self._assinaturas.get(canal, ()))
+        for assinatura in assinaturas:
+            try:
+                assinatura.entregar(mensagem)
+            except RuntimeError:
+                # Event loop já foi fechado
+                self.cancelar(assinatura)
+    
+    def assinar(self, canal: str) -> Assinatura:
+        assinatura = Assinatura(self, canal)
+        with self._lock:
+            self._assinaturas.setdefault(canal, set()).add(assinatura)
+        return assinatura
+    
+    def cancelar(self, assinatura: Assinatura) -> None:
+        with self._lock:
+            assinaturas = self._assinaturas.get(assinatura.canal)
+            if assinaturas is not None:
+                assinaturas.discard(assinatura)
+                if not assinaturas:
+                    del self._assinaturas[assinatura.canal]
+    
+    def tem_assinantes(self, canal: str) -> bool:
+        return canal in self._assinaturas
+    
+    def total_assinantes(self) -> int:
+        with self._lock:
+            return sum(len(assinaturas) for assinaturas in self._assinaturas.values())
+
+
+_broker: Optional[BrokerEventos] = None
+_broker_lock = threading.Lock()
+
+def obter_broker() -> BrokerEventos:
+    """Obter o broker configurado (instanciado sob demanda)"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                modulo, _, nome_classe = EVENT_BROKER.rpartition(".")
+                _broker = getattr(importlib.import_module(modulo), nome_classe)()
+    return _broker
+
+def configurar_broker(broker: BrokerEventos) -> None:
+    """Substituir o broker em uso"""
+    global _broker
+    _broker = broker
+
+def canal_usuario(id_usuario: int) -> str:
+    """Nome do canal de eventos de um usuário"""
+    return f"user:{id_usuario}"
+
+def publicar_notificacao(notificacao) -> None:
+    """Publicar nova notificação e contagem de não lidas para o usuário"""
+    from app.schemas.notificacao import NotificationResponse
+    
+    broker = obter_broker()
+    canal = canal_usuario(notificacao.id_usuario)
+    if not broker.tem_assinantes(canal):
+        return
+    
+    broker.publicar(canal, {
+        "event": "notification",
+        "data": NotificationResponse.model_validate(notificacao).model_dump(by_alias=True, mode="json")
+    })
+    publicar_contagem_nao_lidas(notificacao.id_usuario)
+
+def publicar_contagem_nao_lidas(id_usuario: int) -> None:
+    """Publicar contagem atualizada de notificações não lidas"""
+    from app.models.notificacao import Notification
+    
+    broker = obter_broker()
+    canal = canal_usuario(id_usuario)
+    if not broker.tem_assinantes(canal):
+        return
+    
+    broker.publicar(canal, {
+        "event": "unread_count",
+        "data": {"unread_count": Notification.contar_nao_lidas(id_usuario)}
+    })
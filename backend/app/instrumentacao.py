@@ -0,0 +1,187 @@
+"""
+Instrumentação de consultas SQL por requisição
+
+Hooks before/after_cursor_execute do SQLAlchemy contam as consultas, somam o
+tempo de banco e guardam as mais lentas de cada requisição. O resultado vai
+no header Server-Timing e nas últimas requisições listadas em
+/api/debug/queries. Consultas idênticas repetidas (padrão N+1) geram aviso
+no log e podem ser verificadas em testes com detectar_n_mais_1().
+
+Configuração:
+- QUERY_INSTRUMENTATION: ativa o middleware (padrão true)
+- QUERY_REPEAT_THRESHOLD: repetições de uma mesma consulta para considerar N+1 (10)
+- QUERY_SLOWEST_KEPT: consultas mais lentas guardadas por requisição (5)
+- QUERY_HISTORY_SIZE: requisições guardadas para o endpoint de debug (100)
+"""
+import logging
+import heapq
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+QUERY_INSTRUMENTATION = os.getenv("QUERY_INSTRUMENTATION", "true").lower() == "true"
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "10"))
+QUERY_SLOWEST_KEPT = int(os.getenv("QUERY_SLOWEST_KEPT", "5"))
+QUERY_HISTORY_SIZE = int(os.getenv("QUERY_HISTORY_SIZE", "100"))
+
+
+class ConsultasRepetidasError(AssertionError):
+    """Consulta idêntica executada mais vezes que o permitido (provável N+1)"""
+    pass
+
+
+class ColetorConsultas:
+    """Acumula as consultas executadas em um contexto (requisição ou bloco)"""
+    
+    def __init__(self, maximo_lentas: int = QUERY_SLOWEST_KEPT):
+        self.maximo_lentas = maximo_lentas
+        self.quantidade = 0
+        self.tempo_total = 0.0
+        self.lentas: List[Tuple[float, str]] = []
+        self.repeticoes: Counter = Counter()
+        self._lock = threading.Lock()
+    
+    def registrar(self, sql: str, duracao: float) -> None:
+        with self._lock:
+            self.quantidade += 1
+            self.tempo_total += duracao
+            self.repeticoes[sql] += 1
+            if len(self.lentas) < self.maximo_lentas:
+                heapq.heappush(self.lentas, (duracao, sql))
+            elif duracao > self.lentas[0][0]:
+                heapq.heapreplace(self.lentas, (duracao, sql))
+    
+    def mais_lentas(self) -> List[dict]:
+        return [
+            {"duration_ms": round(duracao * 1000, 3), "statement": sql}
+            for duracao, sql in sorted(self.lentas, reverse=True)
+        ]
+    
+    def repetidas(self, limite: int = QUERY_REPEAT_THRESHOLD) -> List[dict]:
+        """Consultas executadas pelo menos `limite` vezes"""
+        return [
+            {"count": quantidade, "statement": sql}
+            for sql, quantidade in self.repeticoes.most_common()
+            if quantidade >= limite
+        ]
+
+
+_coletores: ContextVar[Tuple[ColetorConsultas, ...]] = ContextVar("coletores_consultas", default=())
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_consulta(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _coletores.get():
+        conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_consulta(conn, cursor, statement, parameters, context, executemany) -> None:
+    coletores = _coletores.get()
+    inicios = conn.info.get("inicio_consultas")
+    if not coletores or not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    for coletor in coletores:
+        coletor.registrar(statement, duracao)
+
+@contextmanager
+def coletar_consultas():
+    """Coletar as consultas executadas dentro do bloco (inclusive em threadpool)"""
+    coletor = ColetorConsultas()
+    token = _coletores.set(_coletores.get() + (coletor,))
+    try:
+        yield coletor
+    finally:
+        _coletores.reset(token)
+
+@contextmanager
+def detectar_n_mais_1(limite: int = QUERY_REPEAT_THRESHOLD):
+    """Falhar se alguma consulta idêntica for executada `limite` vezes ou mais
+    
+    Uso em testes:
+        with detectar_n_mais_1(limite=3):
+            ForumPost.listar()
+    """
+    with coletar_consultas() as coletor:
+        yield coletor
+    repetidas = coletor.repetidas(limite)
+    if repetidas:
+        detalhes = "\n".join(f"{item['count']}x {item['statement']}" for item in repetidas)
+        raise ConsultasRepetidasError(f"Consultas repetidas (possível N+1):\n{detalhes}")
+
+
+historico_requisicoes: deque = deque(maxlen=QUERY_HISTORY_SIZE)
+
+def modelo_rota(scope) -> str:
+    """Caminho da rota com parâmetros (ex.: /api/forum/posts/{id_post})"""
+    contexto = scope.get("fastapi", {}).get("effective_route_context")
+    if contexto is not None and getattr(contexto, "path", None):
+        return contexto.path
+    rota = scope.get("route")
+    return getattr(rota, "path", None) or scope.get("path", "")
+
+
+class MiddlewareInstrumentacao:
+    """Middleware ASGI que instrumenta cada requisição HTTP"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        inicio = time.perf_counter()
+        coletor = ColetorConsultas()
+        token = _coletores.set(_coletores.get() + (coletor,))
+        status_resposta = {}
+        
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                status_resposta["codigo"] = mensagem["status"]
+                total_ms = (time.perf_counter() - inicio) * 1000
+                server_timing = (
+                    f'db;dur={coletor.tempo_total * 1000:.2f};desc="{coletor.quantidade} queries", '
+                    f'app;dur={total_ms:.2f}'
+                )
+                mensagem["headers"] = list(mensagem.get("headers", [])) + [
+                    (b"server-timing", server_timing.encode("latin-1"))
+                ]
+            await send(mensagem)
+        
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _coletores.reset(token)
+            self._registrar(scope, status_resposta.get("codigo"), coletor, time.perf_counter() - inicio)
+    
+    def _registrar(self, scope, codigo, coletor: ColetorConsultas, duracao: float) -> None:
+        caminho = modelo_rota(scope)
+        repetidas = coletor.repetidas()
+        historico_requisicoes.append({
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "route": caminho,
+            "status": codigo,
+            "duration_ms": round(duracao * 1000, 3),
+            "query_count": coletor.quantidade,
+            "db_time_ms": round(coletor.tempo_total * 1000, 3),
+            "slowest": coletor.mais_lentas(),
+            "repeated": repetidas,
+        })
+        if repetidas:
+            logger.warning(
+                "Possível N+1 em %s %s: %sx %s",
+                scope.get("method"), caminho, repetidas[0]["count"], repetidas[0]["statement"][:200]
+            )
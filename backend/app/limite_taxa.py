@@ -0,0 +1,153 @@
+"""
+Limite de taxa (rate limit) para as rotas de autenticação
+
+Usa contadores de janela deslizante aproximada: para cada chave guarda a
+contagem da janela fixa atual e da anterior, ponderando a anterior pela
+fração da janela que ainda se sobrepõe. Ocupa memória constante por chave.
+
+O backend é plugável: por padrão é usado o BackendMemoria (um processo).
+Em implantações com vários workers, defina RATE_LIMIT_BACKEND com o caminho
+de uma classe que implemente BackendLimite (ex.: baseada em Redis).
+
+Limites no formato "<tentativas>/<segundos>" (vazio ou 0 desativa):
+- RATE_LIMIT_LOGIN_IP (padrão 20/60), RATE_LIMIT_LOGIN_EMAIL (10/300)
+- RATE_LIMIT_REGISTER_IP (10/3600), RATE_LIMIT_REFRESH_IP (60/60)
+"""
+import importlib
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+from app.instrumentacao import modelo_rota
+
+load_dotenv()
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "app.limite_taxa.BackendMemoria")
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+def _ler_limite(nome: str, padrao: str) -> Optional[Tuple[int, int]]:
+    """Ler limite "<tentativas>/<segundos>" de uma variável de ambiente"""
+    valor = os.getenv(nome, padrao).strip()
+    if not valor:
+        return None
+    tentativas, _, segundos = valor.partition("/")
+    if int(tentativas) <= 0:
+        return None
+    return int(tentativas), int(segundos or 60)
+
+
+class BackendLimite:
+    """Interface de armazenamento dos contadores"""
+    
+    def registrar(self, chave: str, janela: int) -> float:
+        """Registrar uma tentativa e retornar a contagem estimada na janela deslizante"""
+        raise NotImplementedError
+
+
+class BackendMemoria(BackendLimite):
+    """Contadores em memória, válidos apenas para o próprio processo"""
+    
+    def __init__(self, maximo_chaves: int = 100000):
+        self.maximo_chaves = maximo_chaves
+        self._contadores: Dict[str, List[float]] = {}  # chave -> [inicio_janela, atual, anterior]
+        self._lock = threading.Lock()
+    
+    def registrar(self, chave: str, janela: int) -> float:
+        agora = time.time()
+        inicio_janela = agora - (agora % janela)
+        with self._lock:
+            contador = self._contadores.get(chave)
+            if contador is None:
+                if len(self._contadores) >= self.maximo_chaves:
+                    self._limpar(agora, janela)
+                contador = self._contadores[chave] = [inicio_janela, 0, 0]
+            elif contador[0] != inicio_janela:
+                # Janela avançou: a atual vira a anterior (ou zera se passou mais de uma)
+                contador[2] = contador[1] if inicio_janela - contador[0] == janela else 0
+                contador[1] = 0
+                contador[0] = inicio_janela
+            contador[1] += 1
+            peso_anterior = 1 - (agora - inicio_janela) / janela
+            return contador[1] + contador[2] * peso_anterior
+    
+    def _limpar(self, agora: float, janela: int) -> None:
+        """Descartar chaves sem tentativas nas duas últimas janelas"""
+        self._contadores = {
+            chave: contador for chave, contador in self._contadores.items()
+            if agora - contador[0] < 2 * janela
+        }
+
+
+class LimitadorTaxa:
+    """Aplica as políticas de limite por rota, chaveadas por IP e por email"""
+    
+    def __init__(self, backend: Optional[BackendLimite] = None):
+        self._backend = backend
+        self.rejeitadas: Dict[str, int] = {}
+        self.politicas = {
+            "/login": [
+                ("ip", _ler_limite("RATE_LIMIT_LOGIN_IP", "20/60")),
+                ("email", _ler_limite("RATE_LIMIT_LOGIN_EMAIL", "10/300")),
+            ],
+            "/register": [
+                ("ip", _ler_limite("RATE_LIMIT_REGISTER_IP", "10/3600")),
+            ],
+            "/refresh": [
+                ("ip", _ler_limite("RATE_LIMIT_REFRESH_IP", "60/60")),
+            ],
+        }
+    
+    @property
+    def backend(self) -> BackendLimite:
+        if self._backend is None:
+            modulo, _, nome_classe = RATE_LIMIT_BACKEND.rpartition(".")
+            self._backend = getattr(importlib.import_module(modulo), nome_classe)()
+        return self._backend
+    
+    def configurar_backend(self, backend: BackendLimite) -> None:
+        self._backend = backend
+    
+    async def __call__(self, request: Request) -> None:
+        """Dependência do router de autenticação: rejeita antes de banco ou bcrypt"""
+        modelo = modelo_rota(request.scope)
+        caminho = next((sufixo for sufixo in self.politicas if modelo.endswith(sufixo)), None)
+        if caminho is None:
+            return
+        politicas = self.politicas[caminho]
+        
+        for tipo, limite in politicas:
+            if limite is None:
+                continue
+            valor = await self._valor_chave(request, tipo)
+            if not valor:
+                continue
+            tentativas, janela = limite
+            contagem = self.backend.registrar(f"{caminho}:{tipo}:{valor}", janela)
+            if contagem > tentativas:
+                nome = f"{caminho}:{tipo}"
+                self.rejeitadas[nome] = self.rejeitadas.get(nome, 0) + 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Muitas tentativas. Tente novamente mais tarde.",
+                    headers={"Retry-After": str(math.ceil(janela - time.time() % janela))},
+                )
+    
+    async def _valor_chave(self, request: Request, tipo: str) -> Optional[str]:
+        if tipo == "ip":
+            if RATE_LIMIT_TRUST_FORWARDED:
+                encaminhado = request.headers.get("x-forwarded-for")
+                if encaminhado:
+                    return encaminhado.split(",")[0].strip()
+            return request.client.host if request.client else None
+        if tipo == "email":
+            # O corpo já foi lido pelo FastAPI; form() reaproveita o resultado em cache
+            formulario = await request.form()
+            email = formulario.get("username") or formulario.get("email")
+            return str(email).strip().lower() if email else None
+        return None
+
+
+limitador_autenticacao = LimitadorTaxa()
@@ -0,0 +1,81 @@
+"""
+Configuração de logging da aplicação
+
+Os handlers de saída rodam em uma thread própria (QueueHandler +
+QueueListener), então registrar uma mensagem só coloca o registro em uma
+fila; a formatação e a escrita acontecem fora da requisição. Mensagens
+abaixo do nível configurado são descartadas antes de qualquer formatação
+(use sempre o formato lazy: logger.debug("id=%s", valor)).
+
+Configuração:
+- LOG_LEVEL: nível mínimo (padrão INFO)
+- LOG_FORMAT: "json" (padrão) ou "text"
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+
+# Atributos padrão de LogRecord; o que vier além disso (extra=...) vai para o JSON
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class FormatadorJson(logging.Formatter):
+    """Formata cada registro como uma linha JSON"""
+    
+    def format(self, registro: logging.LogRecord) -> str:
+        dados = {
+            "timestamp": datetime.fromtimestamp(registro.created, timezone.utc).isoformat(),
+            "level": registro.levelname,
+            "logger": registro.name,
+            "message": registro.getMessage(),
+        }
+        for chave, valor in vars(registro).items():
+            if chave not in _ATRIBUTOS_PADRAO and not chave.startswith("_"):
+                dados[chave] = valor
+        if registro.exc_info:
+            dados["exception"] = self.formatException(registro.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def configurar_logs(nivel: str = LOG_LEVEL, formato: str = LOG_FORMAT) -> None:
+    """Configurar o logger "app" com fila não bloqueante (idempotente)"""
+    global _listener
+    if _listener is not None:
+        return
+    
+    saida = logging.StreamHandler(sys.stderr)
+    if formato == "json":
+        saida.setFormatter(FormatadorJson())
+    else:
+        saida.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    fila: queue.Queue = queue.Queue(-1)
+    _listener = logging.handlers.QueueListener(fila, saida, respect_handler_level=True)
+    _listener.start()
+    atexit.register(parar_logs)
+    
+    logger_app = logging.getLogger("app")
+    logger_app.setLevel(nivel)
+    logger_app.handlers = [logging.handlers.QueueHandler(fila)]
+    logger_app.propagate = False
+
+def parar_logs() -> None:
+    """Esvaziar a fila e parar a thread de escrita"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
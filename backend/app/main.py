@@ -8,29 +8,70 @@ Execute a aplicação usando um dos seguintes métodos:
 
 NUNCA execute: python app/main.py ou python main.py
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-import sys
-from app.controllers import (
-    auth_router, user_router, psychologist_router, search_router,
-    review_router, appointment_router, favorite_router, forum_router,
-    emotion_diary_router, payment_router, payment_method_router, admin_router, availability_router,
-    notification_router, questionnaire_router, pre_registration_router,
-    withdrawal_router, treatment_map_router
-)
-from app.database import engine, Base
-from app.models import *  # Importar todos os models para criar as tabelas
+import logging
+from app.logs import configurar_logs, parar_logs
+from app.controllers import registrar_rotas
+from app.database import DATABASE_REPLICA_URLS, DB_READY_MAX_LATENCY_MS, engine, estatisticas_pool, medir_latencia, preparar_esquema
+from app.instrumentacao import MiddlewareInstrumentacao, QUERY_INSTRUMENTATION
+from app.metricas import MiddlewareMetricas, METRICS_ENABLED, configurar_metricas
+from app.perfilador import MiddlewarePerfilador
+from app.compressao import MiddlewareCompressao, COMPRESSION_ENABLED
+from app.serializacao import RespostaJson
+
+configurar_logs()
+logger = logging.getLogger(__name__)
 
-# Criar tabelas
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    """Startup: schema (SCHEMA_CHECK), rotas, dados de referência e serviços em segundo plano (incluindo a verificação das réplicas)"""
+    # Importados aqui: carregam models e controllers, que não precisam pesar no import do módulo
+    from app import dados_referencia
+    from app.entrega_notificacoes import processador_outbox
+    from app.retencao_notificacoes import agendador_retencao
+    from app.arquivamento_historico import agendador_arquivamento
+    from app.pool_senhas import pool_senhas
+    from app.metricas import agregador_metricas
+    from app.replicas import roteador_replicas
+    
+    preparar_esquema()
+    if not app.state.rotas_registradas:
+        registrar_rotas(app, ignorar=() if METRICS_ENABLED else ("metrics_router",))
+        app.state.rotas_registradas = True
+    if METRICS_ENABLED:
+        configurar_metricas(engine)
+    dados_referencia.carregar()
+    processador_outbox.iniciar()
+    agendador_retencao.iniciar()
+    agendador_arquivamento.iniciar()
+    pool_senhas.iniciar()
+    agregador_metricas.iniciar()
+    roteador_replicas.iniciar()
+    try:
+        yield
+    finally:
+        # Parar o processador entregando o que ainda estiver no outbox
+        agendador_retencao.parar()
+        agendador_arquivamento.parar()
+        processador_outbox.parar()
+        pool_senhas.encerrar()
+        agregador_metricas.parar()
+        roteador_replicas.parar()
+        parar_logs()
 
 app = FastAPI(
     title="Lumine API",
     description="Plataforma de conexão entre pacientes e psicólogos",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=RespostaJson,
+    lifespan=ciclo_de_vida
 )
+app.state.rotas_registradas = False
 
 # CORS
 app.add_middleware(
@@ -41,25 +82,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Controllers (rotas)
-app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
-app.include_router(user_router, prefix="/api/users", tags=["users"])
-app.include_router(psychologist_router, prefix="/api/psychologists", tags=["psychologists"])
-app.include_router(search_router, prefix="/api/search", tags=["search"])
-app.include_router(review_router, prefix="/api/reviews", tags=["reviews"])
-app.include_router(appointment_router, prefix="/api/appointments", tags=["appointments"])
-app.include_router(favorite_router, prefix="/api/favorites", tags=["favorites"])
-app.include_router(forum_router, prefix="/api/forum", tags=["forum"])
-app.include_router(emotion_diary_router, prefix="/api/emotion-diary", tags=["emotion-diary"])
-app.include_router(payment_router, prefix="/api/payments", tags=["payments"])
-app.include_router(payment_method_router, prefix="/api/payment-methods", tags=["payment-methods"])
-app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
-app.include_router(availability_router, prefix="/api/availability", tags=["availability"])
-app.include_router(notification_router, prefix="/api/notifications", tags=["notifications"])
-app.include_router(questionnaire_router, prefix="/api/questionnaires", tags=["questionnaires"])
-app.include_router(pre_registration_router, prefix="/api/pre-registration", tags=["pre-registration"])
-app.include_router(withdrawal_router, prefix="/api/withdrawals", tags=["withdrawals"])
-app.include_router(treatment_map_router, prefix="/api/treatment-map", tags=["treatment-map"])
+# Contagem/tempo de consultas SQL por requisição (header Server-Timing)
+if QUERY_INSTRUMENTATION:
+    app.add_middleware(MiddlewareInstrumentacao)
+
+# Perfil por amostragem da requisição quando um admin envia o header X-Profile
+app.add_middleware(MiddlewarePerfilador)
+
+# Compressão gzip/brotli negociada por Accept-Encoding (antes das métricas: o tempo medido inclui a compressão)
+if COMPRESSION_ENABLED:
+    app.add_middleware(MiddlewareCompressao)
+
+# Usuário do token para manter leituras no principal após escritas próprias (réplicas)
+if DATABASE_REPLICA_URLS:
+    from app.replicas import MiddlewareUsuarioLeitura
+    app.add_middleware(MiddlewareUsuarioLeitura)
+
+# Métricas por rota, pool do banco e filas (/metrics)
+if METRICS_ENABLED:
+    app.add_middleware(MiddlewareMetricas)
 
 @app.get("/")
 async def root():
@@ -67,20 +108,44 @@ async def root():
 
 @app.get("/api/health")
 async def health():
-    return {"status": "healthy"}
+    """Liveness: não consulta o banco, só informa o estado do pool (e das réplicas)"""
+    estado = {"status": "healthy", "pool": estatisticas_pool()}
+    if DATABASE_REPLICA_URLS:
+        from app.replicas import roteador_replicas
+        estado["replicas"] = roteador_replicas.estatisticas()
+    return estado
+
+@app.get("/api/health/ready")
+def readiness():
+    """Readiness: 503 se o banco não responde ou responde acima de DB_READY_MAX_LATENCY_MS"""
+    try:
+        latencia = medir_latencia()
+    except Exception as e:
+        logger.warning("Readiness: banco indisponível: %s", e)
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "database": {"error": type(e).__name__}, "pool": estatisticas_pool()}
+        )
+    pronto = latencia <= DB_READY_MAX_LATENCY_MS
+    return JSONResponse(
+        status_code=200 if pronto else 503,
+        content={
+            "status": "ready" if pronto else "degraded",
+            "database": {"latency_ms": round(latencia, 2), "max_latency_ms": DB_READY_MAX_LATENCY_MS},
+            "pool": estatisticas_pool(),
+        }
+    )
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handler para erros de validação - loga os erros para debug"""
-    print(f"=== ERRO DE VALIDAÇÃO ===", file=sys.stderr, flush=True)
-    print(f"URL: {request.url}", file=sys.stderr, flush=True)
-    print(f"Method: {request.method}", file=sys.stderr, flush=True)
-    print(f"Errors: {exc.errors()}", file=sys.stderr, flush=True)
-    try:
-        body = await request.body()
-        print(f"Request body: {body.decode('utf-8') if body else 'empty'}", file=sys.stderr, flush=True)
-    except Exception as e:
-        print(f"Erro ao ler body: {e}", file=sys.stderr, flush=True)
+    logger.info("Erro de validação em %s %s: %s", request.method, request.url.path, exc.errors())
+    if logger.isEnabledFor(logging.DEBUG):
+        try:
+            body = await request.body()
+            logger.debug("Request body: %s", body.decode('utf-8', errors='replace') if body else 'empty')
+        except Exception as e:
+            logger.debug("Erro ao ler body: %s", e)
     return JSONResponse(
         status_code=422,
         content={"detail": exc.errors()}
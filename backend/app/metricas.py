@@ -0,0 +1,388 @@
+"""
+Métricas da aplicação no formato de texto do Prometheus (/metrics)
+
+- Contagem e histograma de latência por rota (modelo da rota, não o caminho)
+- Requisições em andamento
+- Tempo de checkout de conexões do pool do banco e timeouts
+- Profundidade das filas em segundo plano (outbox, pool de senhas, SSE)
+- Acertos e falhas do cache de leitura por namespace (app/cache.py)
+
+Os contadores são do próprio worker e não usam lock: o middleware roda no
+event loop (uma thread) e o checkout do pool usa um histograma por thread.
+Com vários workers (uvicorn --workers / gunicorn), defina METRICS_DIR: cada
+worker grava periodicamente um snapshot em METRICS_DIR/metricas-<pid>.json e
+o /metrics soma os snapshots de todos os workers vivos.
+
+Configuração:
+- METRICS_ENABLED: ativa middleware e endpoint (padrão true)
+- METRICS_DIR: diretório compartilhado entre workers (vazio = um processo)
+- METRICS_FLUSH_SECONDS: intervalo de gravação do snapshot (padrão 5)
+- METRICS_BUCKETS: limites do histograma em segundos
+- METRICS_TOKEN: se definido, exige "Authorization: Bearer <token>"
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as TimeoutPool
+from app.instrumentacao import modelo_rota
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+METRICS_BUCKETS = tuple(
+    float(limite) for limite in
+    os.getenv("METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10").split(",")
+)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+ROTA_NAO_ENCONTRADA = "unmatched"
+
+
+class Histograma:
+    """Histograma cumulativo no estilo Prometheus (contagem por faixa + soma)"""
+    
+    def __init__(self, limites: Tuple[float, ...] = METRICS_BUCKETS):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # última faixa: +Inf
+        self.soma = 0.0
+    
+    def observar(self, valor: float) -> None:
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+    
+    def snapshot(self) -> list:
+        return [list(self.contagens), self.soma]
+
+
+class RegistroMetricas:
+    """Contadores do worker atual"""
+    
+    def __init__(self):
+        self.requisicoes: Dict[Tuple[str, str, int], int] = {}
+        self.latencias: Dict[Tuple[str, str], Histograma] = {}
+        self.em_andamento = 0
+        self.timeouts_pool: Dict[str, int] = {}
+        self._checkout_por_thread: List[Tuple[str, Histograma]] = []
+        self._local = threading.local()
+        self._lock_registro = threading.Lock()  # só na primeira observação de cada thread
+        self._medidores: Dict[str, Callable[[], float]] = {}
+    
+    def observar_requisicao(self, metodo: str, rota: str, codigo: int, duracao: float) -> None:
+        """Chamado no event loop pelo middleware"""
+        chave = (metodo, rota, codigo)
+        self.requisicoes[chave] = self.requisicoes.get(chave, 0) + 1
+        histograma = self.latencias.get((metodo, rota))
+        if histograma is None:
+            histograma = self.latencias[(metodo, rota)] = Histograma()
+        histograma.observar(duracao)
+    
+    def observar_checkout(self, pool: str, duracao: float) -> None:
+        """Chamado na thread que obteve a conexão"""
+        histogramas = getattr(self._local, "checkout", None)
+        if histogramas is None:
+            histogramas = self._local.checkout = {}
+        histograma = histogramas.get(pool)
+        if histograma is None:
+            histograma = histogramas[pool] = Histograma()
+            with self._lock_registro:
+                self._checkout_por_thread.append((pool, histograma))
+        histograma.observar(duracao)
+    
+    def registrar_medidor(self, nome: str, funcao: Callable[[], float]) -> None:
+        """Registrar gauge lido no momento do snapshot (ex.: tamanho de fila)"""
+        self._medidores[nome] = funcao
+    
+    def snapshot(self) -> dict:
+        """Estado atual do worker em formato serializável"""
+        checkout: Dict[str, list] = {}
+        with self._lock_registro:
+            por_thread = list(self._checkout_por_thread)
+        for pool, histograma in por_thread:
+            contagens, soma = histograma.snapshot()
+            if pool in checkout:
+                checkout[pool] = _somar_histogramas(checkout[pool], [contagens, soma])
+            else:
+                checkout[pool] = [contagens, soma]
+        
+        medidores = {}
+        for nome, funcao in list(self._medidores.items()):
+            try:
+                medidores[nome] = float(funcao())
+            except Exception:
+                logger.exception("Falha ao ler o medidor %s", nome)
+        
+        return {
+            "pid": os.getpid(),
+            "requests": [[*chave, total] for chave, total in list(self.requisicoes.items())],
+            "latency": [[*chave, *histograma.snapshot()] for chave, histograma in list(self.latencias.items())],
+            "in_flight": self.em_andamento,
+            "pool_checkout": checkout,
+            "pool_timeouts": dict(self.timeouts_pool),
+            "gauges": medidores,
+        }
+
+
+def _somar_histogramas(a: list, b: list) -> list:
+    return [[x + y for x, y in zip(a[0], b[0])], a[1] + b[1]]
+
+
+registro_metricas = RegistroMetricas()
+
+def instrumentar_pool(engine, nome: str = "primary") -> None:
+    """Medir o tempo de espera por conexão no pool do engine"""
+    def instrumentar(pool) -> None:
+        original = pool._do_get
+        
+        def _do_get():
+            inicio = time.perf_counter()
+            try:
+                return original()
+            except TimeoutPool:
+                registro_metricas.timeouts_pool[nome] = registro_metricas.timeouts_pool.get(nome, 0) + 1
+                raise
+            finally:
+                registro_metricas.observar_checkout(nome, time.perf_counter() - inicio)
+        
+        pool._do_get = _do_get
+    
+    instrumentar(engine.pool)
+    registro_metricas.registrar_medidor(
+        f'db_pool_checked_out{{pool="{nome}"}}',
+        lambda: engine.pool.checkedout() if hasattr(engine.pool, "checkedout") else 0
+    )
+    
+    @event.listens_for(engine, "engine_disposed")
+    def _reinstrumentar(_engine) -> None:
+        # dispose() troca o pool por um novo
+        instrumentar(engine.pool)
+
+
+def configurar_metricas(engine) -> None:
+    """Instrumentar o pool principal e registrar os medidores das filas do worker"""
+    from app.eventos import obter_broker
+    from app.pool_senhas import pool_senhas
+    from app.cache import cache
+    from app.replicas import roteador_replicas
+    
+    instrumentar_pool(engine)
+    for replica in roteador_replicas.replicas:
+        instrumentar_pool(replica.engine, replica.nome)
+    registro_metricas.registrar_medidor("password_pool_pending", lambda: pool_senhas.metricas()["pending"])
+    registro_metricas.registrar_medidor("password_pool_queued", lambda: pool_senhas.metricas()["queued"])
+    registro_metricas.registrar_medidor(
+        "sse_subscribers",
+        lambda: obter_broker().total_assinantes() if hasattr(obter_broker(), "total_assinantes") else 0
+    )
+    for namespace in cache.namespaces():
+        for tipo in ("hits", "misses"):
+            registro_metricas.registrar_medidor(
+                f'app_cache_{tipo}{{namespace="{namespace}"}}',
+                lambda namespace=namespace, tipo=tipo: cache.estatisticas()[namespace][tipo]
+            )
+    registro_metricas.registrar_medidor("app_cache_entries", cache.backend.tamanho)
+
+
+class MiddlewareMetricas:
+    """Middleware ASGI que conta requisições e mede latência por rota"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        inicio = time.perf_counter()
+        registro_metricas.em_andamento += 1
+        codigo = [500]
+        
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                codigo[0] = mensagem["status"]
+            await send(mensagem)
+        
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            registro_metricas.em_andamento -= 1
+            # Sem rota casada (404) o caminho bruto explodiria a cardinalidade
+            rota = modelo_rota(scope) if "route" in scope else ROTA_NAO_ENCONTRADA
+            registro_metricas.observar_requisicao(scope["method"], rota, codigo[0], time.perf_counter() - inicio)
+
+
+class AgregadorMetricas:
+    """Grava o snapshot do worker em METRICS_DIR e soma os dos demais workers"""
+    
+    def __init__(self, diretorio: str = METRICS_DIR, intervalo: float = METRICS_FLUSH_SECONDS):
+        self.diretorio = diretorio
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+    
+    @property
+    def _arquivo(self) -> str:
+        return os.path.join(self.diretorio, f"metricas-{os.getpid()}.json")
+    
+    def iniciar(self) -> None:
+        if not self.diretorio or (self._thread and self._thread.is_alive()):
+            return
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="metricas", daemon=True)
+        self._thread.start()
+    
+    def parar(self, timeout: float = 5.0) -> None:
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+            try:
+                os.remove(self._arquivo)
+            except OSError:
+                pass
+    
+    def gravar(self) -> None:
+        """Gravar o snapshot de forma atômica (arquivo temporário + rename)"""
+        temporario = f"{self._arquivo}.tmp"
+        with open(temporario, "w") as arquivo:
+            json.dump(registro_metricas.snapshot(), arquivo)
+        os.replace(temporario, self._arquivo)
+    
+    def snapshots(self) -> List[dict]:
+        """Snapshot atual deste worker + últimos snapshots dos outros workers vivos"""
+        snapshots = [registro_metricas.snapshot()]
+        if not self.diretorio or not os.path.isdir(self.diretorio):
+            return snapshots
+        for nome in os.listdir(self.diretorio):
+            if not (nome.startswith("metricas-") and nome.endswith(".json")):
+                continue
+            pid = int(nome[len("metricas-"):-len(".json")])
+            if pid == os.getpid():
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            if not _processo_vivo(pid):
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(caminho) as arquivo:
+                    snapshots.append(json.load(arquivo))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+    
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.gravar()
+            except Exception:
+                logger.exception("Falha ao gravar snapshot de métricas")
+
+
+def _processo_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+agregador_metricas = AgregadorMetricas()
+
+def _rotulos(**rotulos) -> str:
+    return ",".join(f'{chave}="{valor}"' for chave, valor in rotulos.items())
+
+def _linhas_histograma(nome: str, rotulos: str, contagens: List[int], soma: float) -> List[str]:
+    linhas = []
+    acumulado = 0
+    separador = "," if rotulos else ""
+    for limite, contagem in zip(list(METRICS_BUCKETS) + ["+Inf"], contagens):
+        acumulado += contagem
+        linhas.append(f'{nome}_bucket{{{rotulos}{separador}le="{limite}"}} {acumulado}')
+    chaves = f"{{{rotulos}}}" if rotulos else ""
+    linhas.append(f"{nome}_sum{chaves} {soma}")
+    linhas.append(f"{nome}_count{chaves} {acumulado}")
+    return linhas
+
+def renderizar(medidores_globais: Optional[Dict[str, float]] = None) -> str:
+    """Somar os snapshots dos workers e gerar o texto no formato do Prometheus"""
+    requisicoes: Dict[tuple, int] = {}
+    latencias: Dict[tuple, list] = {}
+    checkout: Dict[str, list] = {}
+    timeouts: Dict[str, int] = {}
+    medidores: Dict[str, float] = {}
+    em_andamento = 0
+    snapshots = agregador_metricas.snapshots()
+    
+    for snapshot in snapshots:
+        for metodo, rota, codigo, total in snapshot["requests"]:
+            requisicoes[(metodo, rota, codigo)] = requisicoes.get((metodo, rota, codigo), 0) + total
+        for metodo, rota, contagens, soma in snapshot["latency"]:
+            atual = latencias.get((metodo, rota))
+            latencias[(metodo, rota)] = _somar_histogramas(atual, [contagens, soma]) if atual else [contagens, soma]
+        for pool, histograma in snapshot["pool_checkout"].items():
+            checkout[pool] = _somar_histogramas(checkout[pool], histograma) if pool in checkout else histograma
+        for pool, total in snapshot["pool_timeouts"].items():
+            timeouts[pool] = timeouts.get(pool, 0) + total
+        for nome, valor in snapshot["gauges"].items():
+            medidores[nome] = medidores.get(nome, 0) + valor
+        em_andamento += snapshot["in_flight"]
+    
+    linhas = [
+        "# HELP http_requests_total Requisições HTTP concluídas",
+        "# TYPE http_requests_total counter",
+    ]
+    for (metodo, rota, codigo), total in sorted(requisicoes.items()):
+        linhas.append(f"http_requests_total{{{_rotulos(method=metodo, route=rota, status=codigo)}}} {total}")
+    
+    linhas += [
+        "# HELP http_request_duration_seconds Latência das requisições HTTP",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (metodo, rota), (contagens, soma) in sorted(latencias.items()):
+        linhas += _linhas_histograma("http_request_duration_seconds", _rotulos(method=metodo, route=rota), contagens, soma)
+    
+    linhas += [
+        "# HELP http_requests_in_flight Requisições HTTP em andamento",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {em_andamento}",
+        "# HELP db_pool_checkout_seconds Espera para obter conexão do pool",
+        "# TYPE db_pool_checkout_seconds histogram",
+    ]
+    for pool, (contagens, soma) in sorted(checkout.items()):
+        linhas += _linhas_histograma("db_pool_checkout_seconds", _rotulos(pool=pool), contagens, soma)
+    
+    linhas += [
+        "# HELP db_pool_checkout_timeouts_total Checkouts que excederam o timeout do pool",
+        "# TYPE db_pool_checkout_timeouts_total counter",
+    ]
+    for pool, total in sorted(timeouts.items()):
+        linhas.append(f"db_pool_checkout_timeouts_total{{{_rotulos(pool=pool)}}} {total}")
+    
+    medidores.update(medidores_globais or {})
+    tipos_emitidos = set()
+    for nome, valor in sorted(medidores.items()):
+        base = nome.split("{", 1)[0]
+        if base not in tipos_emitidos:
+            tipos_emitidos.add(base)
+            linhas.append(f"# TYPE {base} gauge")
+        linhas.append(f"{nome} {valor:g}")
+    
+    linhas.append("# TYPE metrics_workers gauge")
+    linhas.append(f"metrics_workers {len(snapshots)}")
+    return "\n".join(linhas) + "\n"
@@ -15,9 +15,15 @@ from app.models.pagamento import Payment
 from app.models.metodo_pagamento import PaymentMethod
 from app.models.disponibilidade_psicologo import PsychologistAvailability
 from app.models.notificacao import Notification
+from app.models.contador_notificacao import NotificationCounter
+from app.models.outbox_notificacao import NotificationOutbox
+from app.models.arquivo_notificacao import NotificationArchive
+from app.models.arquivo_agendamento import AppointmentArchive
+from app.models.arquivo_pagamento import PaymentArchive
 from app.models.questionario import Questionnaire
 from app.models.pre_registro_psicologo import PsychologistPreRegistration
 from app.models.saque import Withdrawal
+from app.models.versao_recurso import ResourceVersion
 
 __all__ = [
     "favorites",
@@ -36,8 +42,14 @@ __all__ = [
     "PaymentMethod",
     "PsychologistAvailability",
     "Notification",
+    "NotificationCounter",
+    "NotificationOutbox",
+    "NotificationArchive",
+    "AppointmentArchive",
+    "PaymentArchive",
     "Questionnaire",
     "PsychologistPreRegistration",
     "Withdrawal",
+    "ResourceVersion",
 ]
 
@@ -1,15 +1,32 @@
 """
 Appointment Model
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship, Session, joinedload
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship, Session, joinedload, undefer
 from sqlalchemy.sql import func
 from typing import Optional, List
 from datetime import datetime
 from app.database import Base, get_db_session
+from app.models.outbox_notificacao import NotificationOutbox
+from app.models.arquivo_agendamento import AppointmentArchive
+
+def _com_historico(atuais: list, arquivados: list) -> list:
+    """Agendamentos atuais e arquivados juntos, do mais recente para o mais antigo"""
+    if not arquivados:
+        return atuais
+    return sorted(atuais + arquivados, key=lambda agendamento: agendamento.data_agendamento, reverse=True)
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        Index("ix_appointments_psychologist_id_date_status", "psychologist_id", "appointment_date", "status"),
+        # A data no fim atende o ORDER BY: sem ela o SQLite prefere ix_appointments_status_date
+        Index("ix_appointments_user_id_status_date", "user_id", "status", "appointment_date"),
+        # Usado pelo arquivamento para localizar agendamentos encerrados antigos
+        Index("ix_appointments_status_date", "status", "appointment_date"),
+        # IDs nunca reutilizados no SQLite: agendamentos arquivados mantêm o ID original
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     id_psicologo = Column("psychologist_id", Integer, ForeignKey("psychologists.id"), nullable=False)
@@ -29,8 +46,13 @@ class Appointment(Base):
     
     # Métodos de acesso ao banco
     @classmethod
-    def obter_por_id(cls, id_agendamento: int, carregar_relacionamentos: bool = False) -> Optional["Appointment"]:
-        """Obter agendamento por ID"""
+    def obter_por_id(
+        cls,
+        id_agendamento: int,
+        carregar_relacionamentos: bool = False,
+        incluir_historico: bool = False
+    ) -> Optional["Appointment"]:
+        """Obter agendamento por ID (incluir_historico procura também no arquivo, somente leitura)"""
         db = get_db_session()
         try:
             query = db.query(cls)
@@ -42,19 +64,49 @@ class Appointment(Base):
                     joinedload(cls.psychologist).joinedload(Psychologist.approaches),
                     joinedload(cls.user)
                 )
-            return query.filter(cls.id == id_agendamento).first()
+            agendamento = query.filter(cls.id == id_agendamento).first()
         finally:
             db.close()
+        if agendamento is None and incluir_historico:
+            return AppointmentArchive.obter_por_id(id_agendamento, carregar_relacionamentos)
+        return agendamento
     
     @classmethod
-    def listar_por_usuario(cls, id_usuario: int, status: Optional[str] = None, carregar_relacionamentos: bool = True) -> List["Appointment"]:
-        """Listar agendamentos de um usuário"""
+    def listar_por_usuario(
+        cls,
+        id_usuario: int,
+        status: Optional[str] = None,
+        carregar_relacionamentos: bool = True,
+        opcoes_carregamento: Optional[list] = None,
+        incluir_historico: bool = False,
+        opcoes_historico: Optional[list] = None
+    ) -> List["Appointment"]:
+        """Listar agendamentos de um usuário (opcoes_carregamento substitui o carregamento padrão)
+        
+        Por padrão só a tabela appointments (recentes e em andamento) é lida;
+        incluir_historico acrescenta os arquivados (AppointmentArchive), com
+        opcoes_historico no lugar de opcoes_carregamento.
+        """
+        if incluir_historico:
+            # A data ordena a junção das duas listas: carregada mesmo fora da projeção
+            return _com_historico(
+                cls.listar_por_usuario(
+                    id_usuario, status, carregar_relacionamentos,
+                    opcoes_carregamento and [*opcoes_carregamento, undefer(cls.data_agendamento)]
+                ),
+                AppointmentArchive.listar_por_usuario(
+                    id_usuario, status, carregar_relacionamentos,
+                    opcoes_historico and [*opcoes_historico, undefer(AppointmentArchive.data_agendamento)]
+                )
+            )
         db = get_db_session()
         try:
             query = db.query(cls).filter(cls.id_usuario == id_usuario)
             if status:
                 query = query.filter(cls.status == status)
-            if carregar_relacionamentos:
+            if opcoes_carregamento:
+                query = query.options(*opcoes_carregamento)
+            elif carregar_relacionamentos:
                 from app.models.psicologo import Psychologist
                 query = query.options(
                     joinedload(cls.psychologist).joinedload(Psychologist.user),
@@ -67,8 +119,19 @@ class Appointment(Base):
             db.close()
     
     @classmethod
-    def listar_por_psicologo(cls, id_psicologo: int, status: Optional[str] = None, carregar_relacionamentos: bool = True) -> List["Appointment"]:
-        """Listar agendamentos de um psicólogo"""
+    def listar_por_psicologo(
+        cls,
+        id_psicologo: int,
+        status: Optional[str] = None,
+        carregar_relacionamentos: bool = True,
+        incluir_historico: bool = False
+    ) -> List["Appointment"]:
+        """Listar agendamentos de um psicólogo (incluir_historico acrescenta os arquivados)"""
+        if incluir_historico:
+            return _com_historico(
+                cls.listar_por_psicologo(id_psicologo, status, carregar_relacionamentos),
+                AppointmentArchive.listar_por_psicologo(id_psicologo, status, carregar_relacionamentos)
+            )
         db = get_db_session()
         try:
             query = db.query(cls).filter(cls.id_psicologo == id_psicologo)
@@ -101,29 +164,48 @@ class Appointment(Base):
             db.close()
     
     @classmethod
-    def criar(cls, **kwargs) -> "Appointment":
+    def criar(cls, notificacoes: Optional[List[dict]] = None, **kwargs) -> "Appointment":
         """Criar novo agendamento"""
         db = get_db_session()
         try:
             agendamento = cls(**kwargs)
             db.add(agendamento)
+            db.flush()
+            NotificationOutbox.adicionar(db, notificacoes, id_relacionado=agendamento.id)
             db.commit()
             db.refresh(agendamento)
             return agendamento
         finally:
             db.close()
     
-    def atualizar(self, **kwargs) -> "Appointment":
-        """Atualizar agendamento"""
+    def atualizar(
+        self,
+        notificacoes: Optional[List[dict]] = None,
+        credito_psicologo: Optional[float] = None,
+        **kwargs
+    ) -> "Appointment":
+        """Atualizar agendamento
+        
+        credito_psicologo soma o valor ao saldo do psicólogo na mesma transação,
+        só se o agendamento ainda não estava concluído (a linha fica travada no
+        PostgreSQL, então duas conclusões simultâneas não creditam duas vezes).
+        """
         db = get_db_session()
         try:
-            agendamento = db.query(Appointment).filter(Appointment.id == self.id).first()
+            query = db.query(Appointment).filter(Appointment.id == self.id)
+            if credito_psicologo:
+                query = query.with_for_update()
+            agendamento = query.first()
             if not agendamento:
                 raise ValueError("Agendamento não encontrado")
             
+            if credito_psicologo and agendamento.status != 'completed':
+                from app.models.psicologo import Psychologist
+                Psychologist.ajustar_saldo(db, agendamento.id_psicologo, credito_psicologo)
             for key, value in kwargs.items():
                 if hasattr(agendamento, key):
                     setattr(agendamento, key, value)
+            NotificationOutbox.adicionar(db, notificacoes, id_relacionado=self.id)
             db.commit()
             db.refresh(agendamento)
             return agendamento
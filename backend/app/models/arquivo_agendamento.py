@@ -0,0 +1,163 @@
+"""
+AppointmentArchive Model - Agendamentos encerrados antigos movidos pelo arquivamento
+
+Mesmas colunas de appointments (e mesmos IDs, que não se repetem: appointments
+usa AUTOINCREMENT no SQLite e sequence no PostgreSQL). No PostgreSQL a tabela é
+particionada por mês em appointment_date (ver app/particionamento.py), por
+isso a chave primária inclui a data. A tabela appointments fica restrita aos
+agendamentos recentes ou ainda em andamento.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, select, insert, delete, func
+from sqlalchemy.orm import relationship, joinedload
+from datetime import datetime
+from typing import Optional, List
+from app.database import Base, get_db_session
+from app.particionamento import garantir_particoes
+
+# Status que não mudam mais: só esses agendamentos são arquivados
+STATUS_ENCERRADOS = ("completed", "cancelled", "rejected")
+
+class AppointmentArchive(Base):
+    __tablename__ = "appointments_archive"
+    __table_args__ = (
+        Index("ix_appointments_archive_user_id_date", "user_id", "appointment_date"),
+        Index("ix_appointments_archive_psychologist_id_date", "psychologist_id", "appointment_date"),
+        {"postgresql_partition_by": "RANGE (appointment_date)"},
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)  # Mesmo ID do agendamento original
+    data_agendamento = Column("appointment_date", DateTime(timezone=True), primary_key=True)
+    id_psicologo = Column("psychologist_id", Integer, nullable=False)
+    id_usuario = Column("user_id", Integer, nullable=False)
+    tipo_agendamento = Column("appointment_type", String, nullable=False)
+    status = Column(String)
+    motivo_recusa = Column("rejection_reason", Text)
+    observacoes = Column("notes", Text)
+    status_pagamento = Column("payment_status", String)
+    id_pagamento = Column("payment_id", String)
+    criado_em = Column("created_at", DateTime(timezone=True))
+    atualizado_em = Column("updated_at", DateTime(timezone=True))
+    arquivado_em = Column("archived_at", DateTime(timezone=True), server_default=func.now())
+    
+    # Sem chaves estrangeiras na tabela de arquivo: relacionamentos apenas para leitura
+    psychologist = relationship(
+        "Psychologist", primaryjoin="foreign(AppointmentArchive.id_psicologo) == Psychologist.id", viewonly=True
+    )
+    user = relationship("User", primaryjoin="foreign(AppointmentArchive.id_usuario) == User.id", viewonly=True)
+    
+    # Métodos de acesso ao banco
+    @classmethod
+    def _opcoes_padrao(cls) -> list:
+        from app.models.psicologo import Psychologist
+        return [
+            joinedload(cls.psychologist).joinedload(Psychologist.user),
+            joinedload(cls.psychologist).joinedload(Psychologist.specialties),
+            joinedload(cls.psychologist).joinedload(Psychologist.approaches),
+            joinedload(cls.user)
+        ]
+    
+    @classmethod
+    def arquivar_lote(cls, limite_data: datetime, tamanho_lote: int = 500) -> tuple:
+        """Mover um lote de agendamentos encerrados anteriores a limite_data, com os pagamentos deles
+        
+        Agendamento e pagamentos saem na mesma transação curta (INSERT ...
+        SELECT seguido de DELETE pelos mesmos IDs): payments referencia
+        appointments, então os dois precisam ser movidos juntos. As partições
+        dos meses ocupados pelo lote são criadas antes (PostgreSQL).
+        Retorna (agendamentos movidos, pagamentos movidos).
+        """
+        from app.models.agendamento import Appointment
+        from app.models.pagamento import Payment
+        from app.models.arquivo_pagamento import PaymentArchive
+        
+        db = get_db_session()
+        try:
+            ids = db.execute(
+                select(Appointment.id).where(
+                    Appointment.status.in_(STATUS_ENCERRADOS),
+                    Appointment.data_agendamento < limite_data
+                ).order_by(Appointment.data_agendamento, Appointment.id).limit(tamanho_lote)
+            ).scalars().all()
+            if not ids:
+                return 0, 0
+            
+            garantir_particoes(db, cls.__tablename__, *db.execute(
+                select(func.min(Appointment.data_agendamento), func.max(Appointment.data_agendamento))
+                .where(Appointment.id.in_(ids))
+            ).one())
+            garantir_particoes(db, PaymentArchive.__tablename__, *db.execute(
+                select(func.min(Payment.criado_em), func.max(Payment.criado_em))
+                .where(Payment.id_agendamento.in_(ids))
+            ).one())
+            
+            colunas = ["id", "data_agendamento", "id_psicologo", "id_usuario", "tipo_agendamento", "status",
+                       "motivo_recusa", "observacoes", "status_pagamento", "id_pagamento", "criado_em", "atualizado_em"]
+            db.execute(
+                insert(cls).from_select(
+                    [getattr(cls, coluna) for coluna in colunas],
+                    select(*(getattr(Appointment, coluna) for coluna in colunas)).where(Appointment.id.in_(ids))
+                )
+            )
+            pagamentos = PaymentArchive.copiar_por_agendamentos(db, ids)
+            db.execute(delete(Payment).where(Payment.id_agendamento.in_(ids)))
+            db.execute(delete(Appointment).where(Appointment.id.in_(ids)))
+            db.commit()
+            return len(ids), pagamentos
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    @classmethod
+    def obter_por_id(cls, id_agendamento: int, carregar_relacionamentos: bool = False) -> Optional["AppointmentArchive"]:
+        """Obter agendamento arquivado por ID"""
+        db = get_db_session(somente_leitura=True)
+        try:
+            query = db.query(cls)
+            if carregar_relacionamentos:
+                query = query.options(*cls._opcoes_padrao())
+            return query.filter(cls.id == id_agendamento).first()
+        finally:
+            db.close()
+    
+    @classmethod
+    def listar_por_usuario(
+        cls,
+        id_usuario: int,
+        status: Optional[str] = None,
+        carregar_relacionamentos: bool = True,
+        opcoes_carregamento: Optional[list] = None
+    ) -> List["AppointmentArchive"]:
+        """Listar agendamentos arquivados de um usuário"""
+        db = get_db_session(somente_leitura=True)
+        try:
+            query = db.query(cls).filter(cls.id_usuario == id_usuario)
+            if status:
+                query = query.filter(cls.status == status)
+            if opcoes_carregamento:
+                query = query.options(*opcoes_carregamento)
+            elif carregar_relacionamentos:
+                query = query.options(*cls._opcoes_padrao())
+            return query.order_by(cls.data_agendamento.desc()).all()
+        finally:
+            db.close()
+    
+    @classmethod
+    def listar_por_psicologo(
+        cls,
+        id_psicologo: int,
+        status: Optional[str] = None,
+        carregar_relacionamentos: bool = True
+    ) -> List["AppointmentArchive"]:
+        """Listar agendamentos arquivados de um psicólogo"""
+        db = get_db_session(somente_leitura=True)
+        try:
+            query = db.query(cls).filter(cls.id_psicologo == id_psicologo)
+            if status:
+                query = query.filter(cls.status == status)
+            if carregar_relacionamentos:
+                query = query.options(*cls._opcoes_padrao())
+            return query.order_by(cls.data_agendamento.desc()).all()
+        finally:
+            db.close()
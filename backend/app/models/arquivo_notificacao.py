@@ -0,0 +1,89 @@
+"""
+NotificationArchive Model - Notificações lidas antigas movidas pela retenção
+
+Mantém apenas as colunas necessárias para consulta histórica; a tabela
+notifications fica restrita às notificações recentes ou ainda não lidas.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, select, insert, delete, func
+from datetime import datetime
+from typing import Optional, List
+from app.database import Base, get_db_session
+
+class NotificationArchive(Base):
+    __tablename__ = "notifications_archive"
+    __table_args__ = (
+        Index("ix_notifications_archive_user_id_created_at", "user_id", "created_at"),
+    )
+    
+    # Chave própria: no SQLite o ID de notifications pode ser reutilizado depois que as maiores saem da tabela
+    id = Column(Integer, primary_key=True)
+    id_notificacao = Column("notification_id", Integer, nullable=False, index=True)  # ID da notificação original
+    id_usuario = Column("user_id", Integer, nullable=False)
+    titulo = Column("title", String, nullable=False)
+    mensagem = Column("message", Text, nullable=False)
+    tipo = Column("type", String, nullable=False)
+    id_relacionado = Column("related_id", Integer)
+    tipo_relacionado = Column("related_type", String)
+    criado_em = Column("created_at", DateTime(timezone=True))
+    arquivado_em = Column("archived_at", DateTime(timezone=True), server_default=func.now())
+    
+    # Métodos de acesso ao banco
+    @classmethod
+    def arquivar_lote(
+        cls,
+        limite_data: datetime,
+        tamanho_lote: int = 1000,
+        tipos: Optional[List[str]] = None,
+        excluir_tipos: Optional[List[str]] = None
+    ) -> int:
+        """Mover um lote de notificações lidas criadas antes de limite_data
+        
+        Cada lote é uma transação curta (INSERT ... SELECT seguido de DELETE
+        pelos mesmos IDs), para não segurar locks na tabela de notificações.
+        Retorna quantas notificações foram movidas.
+        """
+        from app.models.notificacao import Notification
+        
+        db = get_db_session()
+        try:
+            consulta = select(Notification.id).where(
+                Notification.foi_lida == True,
+                Notification.criado_em < limite_data
+            )
+            if tipos is not None:
+                consulta = consulta.where(Notification.tipo.in_(tipos))
+            if excluir_tipos:
+                consulta = consulta.where(Notification.tipo.not_in(excluir_tipos))
+            
+            ids = db.execute(consulta.order_by(Notification.id).limit(tamanho_lote)).scalars().all()
+            if not ids:
+                return 0
+            
+            db.execute(
+                insert(cls).from_select(
+                    [cls.id_notificacao, cls.id_usuario, cls.titulo, cls.mensagem, cls.tipo,
+                     cls.id_relacionado, cls.tipo_relacionado, cls.criado_em],
+                    select(
+                        Notification.id, Notification.id_usuario, Notification.titulo,
+                        Notification.mensagem, Notification.tipo, Notification.id_relacionado,
+                        Notification.tipo_relacionado, Notification.criado_em
+                    ).where(Notification.id.in_(ids))
+                )
+            )
+            db.execute(delete(Notification).where(Notification.id.in_(ids)))
+            db.commit()
+            return len(ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    @classmethod
+    def listar_por_usuario(cls, id_usuario: int, limite: int = 50) -> List["NotificationArchive"]:
+        """Listar notificações arquivadas de um usuário"""
+        db = get_db_session()
+        try:
+            return db.query(cls).filter(cls.id_usuario == id_usuario).order_by(cls.criado_em.desc()).limit(limite).all()
+        finally:
+            db.close()
@@ -0,0 +1,95 @@
+"""
+PaymentArchive Model - Pagamentos de agendamentos arquivados
+
+Mesmas colunas de payments (e mesmos IDs, que não se repetem: payments usa
+AUTOINCREMENT no SQLite e sequence no PostgreSQL). Os pagamentos são arquivados
+junto com o agendamento (ver AppointmentArchive.arquivar_lote). No
+PostgreSQL a tabela é particionada por mês em created_at, por isso a chave
+primária inclui a data.
+"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, select, insert, func
+from sqlalchemy.orm import relationship, joinedload, Session
+from typing import List
+from app.database import Base, get_db_session
+
+class PaymentArchive(Base):
+    __tablename__ = "payments_archive"
+    __table_args__ = (
+        Index("ix_payments_archive_user_id_created_at", "user_id", "created_at"),
+        Index("ix_payments_archive_appointment_id", "appointment_id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)  # Mesmo ID do pagamento original
+    criado_em = Column("created_at", DateTime(timezone=True), primary_key=True)
+    id_agendamento = Column("appointment_id", Integer, nullable=False)
+    id_usuario = Column("user_id", Integer, nullable=False)
+    valor = Column("amount", Float, nullable=False)
+    metodo_pagamento = Column("payment_method", String, nullable=False)
+    status = Column(String)
+    id_pagamento = Column("payment_id", String)
+    id_transacao = Column("transaction_id", String)
+    atualizado_em = Column("updated_at", DateTime(timezone=True))
+    arquivado_em = Column("archived_at", DateTime(timezone=True), server_default=func.now())
+    
+    # O agendamento do pagamento arquivado também está no arquivo
+    appointment = relationship(
+        "AppointmentArchive",
+        primaryjoin="foreign(PaymentArchive.id_agendamento) == AppointmentArchive.id",
+        viewonly=True
+    )
+    
+    # Métodos de acesso ao banco
+    @classmethod
+    def copiar_por_agendamentos(cls, db: Session, ids_agendamentos: List[int]) -> int:
+        """Copiar para o arquivo os pagamentos dos agendamentos (na transação de quem chama)"""
+        from app.models.pagamento import Payment
+        
+        colunas = ["id", "criado_em", "id_agendamento", "id_usuario", "valor", "metodo_pagamento",
+                   "status", "id_pagamento", "id_transacao", "atualizado_em"]
+        resultado = db.execute(
+            insert(cls).from_select(
+                [getattr(cls, coluna) for coluna in colunas],
+                select(*(getattr(Payment, coluna) for coluna in colunas)).where(Payment.id_agendamento.in_(ids_agendamentos))
+            )
+        )
+        return resultado.rowcount
+    
+    @classmethod
+    def _opcoes_padrao(cls) -> list:
+        from app.models.arquivo_agendamento import AppointmentArchive
+        from app.models.psicologo import Psychologist
+        
+        agendamento = joinedload(cls.appointment)
+        return [
+            agendamento.joinedload(AppointmentArchive.psychologist).joinedload(Psychologist.user),
+            agendamento.joinedload(AppointmentArchive.psychologist).joinedload(Psychologist.specialties),
+            agendamento.joinedload(AppointmentArchive.psychologist).joinedload(Psychologist.approaches),
+            agendamento.joinedload(AppointmentArchive.user)
+        ]
+    
+    @classmethod
+    def listar_por_usuario(cls, id_usuario: int) -> List["PaymentArchive"]:
+        """Listar pagamentos arquivados de um usuário"""
+        db = get_db_session(somente_leitura=True)
+        try:
+            return db.query(cls).filter(cls.id_usuario == id_usuario).options(
+                *cls._opcoes_padrao()
+            ).order_by(cls.criado_em.desc()).all()
+        finally:
+            db.close()
+    
+    @classmethod
+    def listar_pagos_por_psicologo(cls, id_psicologo: int) -> List["PaymentArchive"]:
+        """Listar pagamentos arquivados com status paid dos agendamentos de um psicólogo"""
+        from app.models.arquivo_agendamento import AppointmentArchive
+        
+        db = get_db_session(somente_leitura=True)
+        try:
+            ids_agendamentos = select(AppointmentArchive.id).where(AppointmentArchive.id_psicologo == id_psicologo)
+            return db.query(cls).options(*cls._opcoes_padrao()).filter(
+                cls.id_agendamento.in_(ids_agendamentos),
+                cls.status == 'paid'
+            ).order_by(cls.criado_em.desc()).all()
+        finally:
+            db.close()
@@ -1,13 +1,16 @@
 """
 Review Model
 """
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship, Session, joinedload
 from typing import Optional, List
 from app.database import Base, get_db_session
 
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("ix_reviews_psychologist_id_created_at", "psychologist_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     id_psicologo = Column("psychologist_id", Integer, ForeignKey("psychologists.id"), nullable=False)
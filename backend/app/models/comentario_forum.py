@@ -1,7 +1,7 @@
 """
 ForumComment Model
 """
-from sqlalchemy import Column, Integer, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship, Session, joinedload
 from sqlalchemy.sql import func
 from typing import Optional, List
@@ -9,6 +9,9 @@ from app.database import Base, get_db_session
 
 class ForumComment(Base):
     __tablename__ = "forum_comments"
+    __table_args__ = (
+        Index("ix_forum_comments_post_id_created_at", "post_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     id_post = Column("post_id", Integer, ForeignKey("forum_posts.id"), nullable=False)
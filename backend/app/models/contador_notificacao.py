@@ -0,0 +1,80 @@
+"""
+NotificationCounter Model - Contador de notificações não lidas por usuário
+"""
+from sqlalchemy import Column, Integer, ForeignKey, case, func, update, insert
+from sqlalchemy.orm import Session
+from app.database import Base, get_db_session
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+    
+    id_usuario = Column("user_id", Integer, ForeignKey("users.id"), primary_key=True)
+    nao_lidas = Column("unread_count", Integer, nullable=False, default=0)
+    
+    # Métodos de acesso ao banco
+    @classmethod
+    def obter(cls, id_usuario: int) -> int:
+        """Obter contagem de não lidas (recalcula apenas se o contador ainda não existir)"""
+        db = get_db_session()
+        try:
+            nao_lidas = db.query(cls.nao_lidas).filter(cls.id_usuario == id_usuario).scalar()
+            if nao_lidas is None:
+                nao_lidas = cls.recalcular(db, id_usuario)
+                db.commit()
+            return nao_lidas
+        finally:
+            db.close()
+    
+    @classmethod
+    def ajustar(cls, db: Session, id_usuario: int, delta: int) -> None:
+        """Somar delta ao contador, dentro da transação de quem chama"""
+        if not delta:
+            return
+        novo_valor = cls.nao_lidas + delta
+        atualizados = db.execute(
+            update(cls)
+            .where(cls.id_usuario == id_usuario)
+            .values(nao_lidas=case((novo_valor < 0, 0), else_=novo_valor))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not atualizados:
+            cls.recalcular(db, id_usuario)
+    
+    @classmethod
+    def recalcular(cls, db: Session, id_usuario: int) -> int:
+        """Recalcular o contador a partir da tabela de notificações"""
+        from app.models.notificacao import Notification
+        
+        db.flush()
+        nao_lidas = db.query(func.count(Notification.id)).filter(
+            Notification.id_usuario == id_usuario,
+            Notification.filtro_nao_lidas()
+        ).scalar()
+        cls._gravar(db, id_usuario, nao_lidas)
+        return nao_lidas
+    
+    @classmethod
+    def _gravar(cls, db: Session, id_usuario: int, nao_lidas: int) -> None:
+        """Inserir ou sobrescrever o contador (upsert)"""
+        dialeto = db.get_bind().dialect.name
+        if dialeto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as insert_dialeto
+        elif dialeto == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as insert_dialeto
+        else:
+            insert_dialeto = None
+        
+        if insert_dialeto is None:
+            atualizados = db.execute(
+                update(cls).where(cls.id_usuario == id_usuario).values(nao_lidas=nao_lidas)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not atualizados:
+                db.execute(insert(cls).values(id_usuario=id_usuario, nao_lidas=nao_lidas))
+            return
+        
+        comando = insert_dialeto(cls).values(id_usuario=id_usuario, nao_lidas=nao_lidas)
+        db.execute(comando.on_conflict_do_update(
+            index_elements=[cls.id_usuario],
+            set_={"unread_count": comando.excluded.unread_count}
+        ))
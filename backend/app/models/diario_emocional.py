@@ -1,14 +1,17 @@
 """
 EmotionDiary Model
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func, insert
 from sqlalchemy.orm import relationship, Session
-from typing import Optional, List
+from typing import Optional, List, Iterator
 from datetime import datetime
 from app.database import Base, get_db_session
 
 class EmotionDiary(Base):
     __tablename__ = "emotion_diaries"
+    __table_args__ = (
+        Index("ix_emotion_diaries_user_id_date", "user_id", "date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     id_usuario = Column("user_id", Integer, ForeignKey("users.id"), nullable=False)
@@ -128,6 +131,52 @@ class EmotionDiary(Base):
         finally:
             db.close()
     
+    @classmethod
+    def criar_em_lote(cls, id_usuario: int, entradas: List[dict], tamanho_lote: int = 500) -> int:
+        """Inserir várias entradas do diário usando executemany em lotes"""
+        db = get_db_session()
+        try:
+            total = 0
+            for inicio in range(0, len(entradas), tamanho_lote):
+                lote = [
+                    {**entrada, "id_usuario": id_usuario}
+                    for entrada in entradas[inicio:inicio + tamanho_lote]
+                ]
+                db.execute(insert(cls), lote)
+                db.commit()
+                total += len(lote)
+            return total
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    @classmethod
+    def iterar_por_usuario(
+        cls,
+        id_usuario: int,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        tamanho_lote: int = 500
+    ) -> Iterator[tuple]:
+        """Iterar entradas do diário de um usuário sem carregar tudo em memória"""
+        db = get_db_session()
+        try:
+            query = db.query(
+                cls.data, cls.emocao, cls.intensidade, cls.notas, cls.tags, cls.criado_em
+            ).filter(cls.id_usuario == id_usuario)
+            
+            if data_inicio:
+                query = query.filter(cls.data >= data_inicio)
+            if data_fim:
+                query = query.filter(cls.data <= data_fim)
+            
+            for linha in query.order_by(cls.data.asc()).yield_per(tamanho_lote):
+                yield linha
+        finally:
+            db.close()
+    
     def atualizar(self, **kwargs) -> "EmotionDiary":
         """Atualizar entrada"""
         db = get_db_session()
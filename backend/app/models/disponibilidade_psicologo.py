@@ -37,7 +37,7 @@ class PsychologistAvailability(Base):
     @classmethod
     def listar_por_psicologo(cls, id_psicologo: int, apenas_disponiveis: bool = False) -> List["PsychologistAvailability"]:
         """Listar disponibilidades de um psicólogo"""
-        db = get_db_session()
+        db = get_db_session(somente_leitura=True)
         try:
             query = db.query(cls).filter(cls.id_psicologo == id_psicologo)
             if apenas_disponiveis:
@@ -16,6 +16,10 @@ class Specialty(Base):
     
     psychologists = relationship("Psychologist", secondary=psychologist_specialties, back_populates="specialties")
     
+    def tags_cache(self) -> List[str]:
+        """Tags invalidadas no cache quando o registro é alterado (perfis que o incluem)"""
+        return [f"specialty:{self.id}"]
+    
     # Métodos de acesso ao banco
     @classmethod
     def listar_todos(cls) -> List["Specialty"]:
@@ -1,13 +1,20 @@
 """
 Notification Model
 """
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, func, update, or_
 from sqlalchemy.orm import relationship, Session
 from typing import Optional, List
 from app.database import Base, get_db_session
+from app.eventos import publicar_notificacao, publicar_contagem_nao_lidas
+from app.models.contador_notificacao import NotificationCounter
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id_is_read_created_at", "user_id", "is_read", "created_at"),
+        # Usado pela retenção para localizar notificações lidas antigas
+        Index("ix_notifications_is_read_created_at", "is_read", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     id_usuario = Column("user_id", Integer, ForeignKey("users.id"), nullable=False)
@@ -21,6 +28,11 @@ class Notification(Base):
     
     user = relationship("User", foreign_keys=[id_usuario], back_populates="notifications", overlaps="notifications")
     
+    @classmethod
+    def filtro_nao_lidas(cls):
+        """Predicado de não lida: is_read é anulável e linhas antigas com NULL contam como não lidas"""
+        return or_(cls.foi_lida == False, cls.foi_lida.is_(None))
+    
     # Métodos de acesso ao banco
     @classmethod
     def listar_por_usuario(
@@ -35,7 +47,7 @@ class Notification(Base):
             query = db.query(cls).filter(cls.id_usuario == id_usuario)
             
             if lida is not None:
-                query = query.filter(cls.foi_lida == lida)
+                query = query.filter(cls.foi_lida == True if lida else cls.filtro_nao_lidas())
             
             return query.order_by(cls.criado_em.desc()).limit(limite).all()
         finally:
@@ -43,15 +55,8 @@ class Notification(Base):
     
     @classmethod
     def contar_nao_lidas(cls, id_usuario: int) -> int:
-        """Contar notificações não lidas de um usuário"""
-        db = get_db_session()
-        try:
-            return db.query(func.count(cls.id)).filter(
-                cls.id_usuario == id_usuario,
-                cls.foi_lida == False
-            ).scalar()
-        finally:
-            db.close()
+        """Contar notificações não lidas de um usuário (contador mantido em notification_counters)"""
+        return NotificationCounter.obter(id_usuario)
     
     @classmethod
     def criar(cls, **kwargs) -> "Notification":
@@ -60,25 +65,64 @@ class Notification(Base):
         try:
             notificacao = cls(**kwargs)
             db.add(notificacao)
+            if not notificacao.foi_lida:
+                db.flush()
+                NotificationCounter.ajustar(db, notificacao.id_usuario, 1)
             db.commit()
             db.refresh(notificacao)
-            return notificacao
         finally:
             db.close()
+        
+        publicar_notificacao(notificacao)
+        return notificacao
     
-    def marcar_como_lida(self) -> "Notification":
-        """Marcar notificação como lida"""
+    @classmethod
+    def marcar_como_lida(cls, id_notificacao: int, id_usuario: int) -> Optional["Notification"]:
+        """Marcar notificação do usuário como lida (um único UPDATE ... RETURNING)"""
+        notificacoes = cls.marcar_como_lidas(id_usuario, [id_notificacao])
+        if notificacoes:
+            return notificacoes[0]
+        
+        # Nada foi alterado: a notificação já estava lida ou não pertence ao usuário
         db = get_db_session()
         try:
-            notificacao = db.query(Notification).filter(Notification.id == self.id).first()
-            if notificacao:
-                notificacao.foi_lida = True
-                db.commit()
-                db.refresh(notificacao)
-                return notificacao
-            return self
+            return db.query(cls).filter(
+                cls.id == id_notificacao,
+                cls.id_usuario == id_usuario
+            ).first()
+        finally:
+            db.close()
+    
+    @classmethod
+    def marcar_como_lidas(cls, id_usuario: int, ids_notificacoes: List[int]) -> List["Notification"]:
+        """Marcar uma lista de notificações não lidas do usuário como lidas em um único UPDATE"""
+        ids_notificacoes = list(dict.fromkeys(ids_notificacoes))
+        if not ids_notificacoes:
+            return []
+        
+        db = get_db_session()
+        try:
+            notificacoes = db.scalars(
+                update(cls)
+                .where(
+                    cls.id.in_(ids_notificacoes),
+                    cls.id_usuario == id_usuario,
+                    cls.filtro_nao_lidas()
+                )
+                .values(foi_lida=True)
+                .returning(cls)
+            ).all()
+            NotificationCounter.ajustar(db, id_usuario, -len(notificacoes))
+            # Desanexar antes do commit para manter os atributos retornados carregados
+            for notificacao in notificacoes:
+                db.expunge(notificacao)
+            db.commit()
         finally:
             db.close()
+        
+        if notificacoes:
+            publicar_contagem_nao_lidas(id_usuario)
+        return notificacoes
     
     @classmethod
     def marcar_todas_como_lidas(cls, id_usuario: int) -> int:
@@ -87,12 +131,17 @@ class Notification(Base):
         try:
             atualizadas = db.query(cls).filter(
                 cls.id_usuario == id_usuario,
-                cls.foi_lida == False
-            ).update({"foi_lida": True})
+                cls.filtro_nao_lidas()
+            ).update({"foi_lida": True}, synchronize_session=False)
+            # Desconta só as marcadas: notificações criadas em paralelo continuam contadas
+            NotificationCounter.ajustar(db, id_usuario, -atualizadas)
             db.commit()
-            return atualizadas
         finally:
             db.close()
+        
+        if atualizadas:
+            publicar_contagem_nao_lidas(id_usuario)
+        return atualizadas
     
     def deletar(self) -> None:
         """Deletar notificação"""
@@ -101,6 +150,8 @@ class Notification(Base):
             notificacao = db.query(Notification).filter(Notification.id == self.id).first()
             if notificacao:
                 db.delete(notificacao)
+                if not notificacao.foi_lida:
+                    NotificationCounter.ajustar(db, notificacao.id_usuario, -1)
                 db.commit()
         finally:
             db.close()
@@ -0,0 +1,113 @@
+"""
+NotificationOutbox Model - Notificações pendentes de entrega (transactional outbox)
+
+As notificações são gravadas aqui na mesma transação da alteração de negócio
+e depois drenadas em lote pelo processador em app/entrega_notificacoes.py.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, delete, select, func
+from sqlalchemy.orm import Session
+from typing import Optional, List
+from app.database import Base, get_db_session
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    id_usuario = Column("user_id", Integer, nullable=False)
+    titulo = Column("title", String, nullable=False)
+    mensagem = Column("message", Text, nullable=False)
+    tipo = Column("type", String, nullable=False)
+    id_relacionado = Column("related_id", Integer)
+    tipo_relacionado = Column("related_type", String)
+    criado_em = Column("created_at", DateTime(timezone=True), server_default=func.now())
+    
+    # Métodos de acesso ao banco
+    @classmethod
+    def adicionar(
+        cls,
+        db: Session,
+        notificacoes: Optional[List[dict]],
+        id_relacionado: Optional[int] = None
+    ) -> None:
+        """Enfileirar notificações na transação de quem chama
+        
+        Cada notificação usa os nomes de atributo de Notification (id_usuario,
+        titulo, mensagem, tipo, tipo_relacionado, id_relacionado). Quando
+        id_relacionado não é informado, usa o ID do recurso sendo gravado.
+        """
+        if not notificacoes:
+            return
+        
+        for dados in notificacoes:
+            dados = {k: v for k, v in dados.items() if k != "foi_lida"}
+            dados.setdefault("id_relacionado", id_relacionado)
+            db.add(cls(**dados))
+        db.info["notificacoes_pendentes"] = True
+    
+    @classmethod
+    def consumir_lote(cls, limite: int = 100) -> List["Notification"]:
+        """Mover um lote do outbox para a tabela de notificações
+        
+        As linhas são reivindicadas com DELETE ... RETURNING, então vários
+        workers podem drenar o outbox ao mesmo tempo sem entregar duas vezes.
+        """
+        from app.models.notificacao import Notification
+        from app.models.contador_notificacao import NotificationCounter
+        
+        db = get_db_session()
+        try:
+            ids_lote = select(cls.id).order_by(cls.id).limit(limite)
+            if db.get_bind().dialect.name == "postgresql":
+                ids_lote = ids_lote.with_for_update(skip_locked=True)
+            
+            pendentes = db.execute(
+                delete(cls)
+                .where(cls.id.in_(ids_lote.scalar_subquery()))
+                .returning(
+                    cls.id_usuario, cls.titulo, cls.mensagem, cls.tipo,
+                    cls.id_relacionado, cls.tipo_relacionado
+                )
+            ).all()
+            if not pendentes:
+                return []
+            
+            notificacoes = [
+                Notification(
+                    id_usuario=pendente.id_usuario,
+                    titulo=pendente.titulo,
+                    mensagem=pendente.mensagem,
+                    tipo=pendente.tipo,
+                    id_relacionado=pendente.id_relacionado,
+                    tipo_relacionado=pendente.tipo_relacionado,
+                    foi_lida=False
+                )
+                for pendente in pendentes
+            ]
+            db.add_all(notificacoes)
+            db.flush()
+            
+            por_usuario = {}
+            for notificacao in notificacoes:
+                por_usuario[notificacao.id_usuario] = por_usuario.get(notificacao.id_usuario, 0) + 1
+            for id_usuario, quantidade in por_usuario.items():
+                NotificationCounter.ajustar(db, id_usuario, quantidade)
+            
+            # Desanexar antes do commit para manter os atributos carregados
+            for notificacao in notificacoes:
+                db.expunge(notificacao)
+            db.commit()
+            return notificacoes
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    @classmethod
+    def contar_pendentes(cls) -> int:
+        """Contar notificações aguardando entrega"""
+        db = get_db_session()
+        try:
+            return db.query(func.count(cls.id)).scalar()
+        finally:
+            db.close()
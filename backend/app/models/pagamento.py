@@ -1,14 +1,20 @@
 """
 Payment Model
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship, Session
 from sqlalchemy.sql import func
 from typing import Optional, List
 from app.database import Base, get_db_session
+from app.models.outbox_notificacao import NotificationOutbox
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_appointment_id", "appointment_id"),
+        # IDs nunca reutilizados no SQLite: pagamentos arquivados mantêm o ID original
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     id_agendamento = Column("appointment_id", Integer, ForeignKey("appointments.id"), nullable=False)
@@ -44,8 +50,8 @@ class Payment(Base):
             db.close()
     
     @classmethod
-    def listar_por_usuario(cls, id_usuario: int) -> List["Payment"]:
-        """Listar pagamentos de um usuário"""
+    def listar_por_usuario(cls, id_usuario: int, incluir_historico: bool = False) -> List["Payment"]:
+        """Listar pagamentos de um usuário (incluir_historico acrescenta os arquivados, em PaymentArchive)"""
         from sqlalchemy.orm import joinedload
         from app.models.agendamento import Appointment
         from app.models.psicologo import Psychologist
@@ -53,19 +59,31 @@ class Payment(Base):
         
         db = get_db_session()
         try:
-            return db.query(cls).filter(cls.id_usuario == id_usuario).options(
-                joinedload(cls.appointment).joinedload(Appointment.psychologist).joinedload(Psychologist.user)
+            agendamento = joinedload(cls.appointment)
+            pagamentos = db.query(cls).filter(cls.id_usuario == id_usuario).options(
+                agendamento.joinedload(Appointment.psychologist).joinedload(Psychologist.user),
+                agendamento.joinedload(Appointment.psychologist).joinedload(Psychologist.specialties),
+                agendamento.joinedload(Appointment.psychologist).joinedload(Psychologist.approaches),
+                agendamento.joinedload(Appointment.user)
             ).order_by(cls.criado_em.desc()).all()
         finally:
             db.close()
+        if incluir_historico:
+            from app.models.arquivo_pagamento import PaymentArchive
+            arquivados = PaymentArchive.listar_por_usuario(id_usuario)
+            if arquivados:
+                pagamentos = sorted(pagamentos + arquivados, key=lambda pagamento: pagamento.criado_em, reverse=True)
+        return pagamentos
     
     @classmethod
-    def criar(cls, **kwargs) -> "Payment":
+    def criar(cls, notificacoes: Optional[List[dict]] = None, **kwargs) -> "Payment":
         """Criar novo pagamento"""
         db = get_db_session()
         try:
             pagamento = cls(**kwargs)
             db.add(pagamento)
+            db.flush()
+            NotificationOutbox.adicionar(db, notificacoes, id_relacionado=pagamento.id)
             db.commit()
             db.refresh(pagamento)
             return pagamento
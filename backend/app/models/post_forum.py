@@ -6,6 +6,7 @@ from sqlalchemy.orm import relationship, Session, joinedload
 from sqlalchemy import desc, or_
 from typing import Optional, List
 from app.database import Base, get_db_session
+from app.models.outbox_notificacao import NotificationOutbox
 
 class ForumPost(Base):
     __tablename__ = "forum_posts"
@@ -28,7 +29,7 @@ class ForumPost(Base):
     @classmethod
     def obter_por_id(cls, id_post: int) -> Optional["ForumPost"]:
         """Obter post por ID"""
-        db = get_db_session()
+        db = get_db_session(somente_leitura=True)
         try:
             post = db.query(cls).options(
                 joinedload(cls.user)
@@ -55,7 +56,7 @@ class ForumPost(Base):
         tamanho_pagina: int = 20
     ) -> List["ForumPost"]:
         """Listar posts do fórum"""
-        db = get_db_session()
+        db = get_db_session(somente_leitura=True)
         try:
             query = db.query(cls).options(joinedload(cls.user))
             
@@ -131,13 +132,14 @@ class ForumPost(Base):
         finally:
             db.close()
     
-    def deletar(self) -> None:
+    def deletar(self, notificacoes: Optional[List[dict]] = None) -> None:
         """Deletar post"""
         db = get_db_session()
         try:
             post = db.query(ForumPost).filter(ForumPost.id == self.id).first()
             if post:
                 db.delete(post)
+                NotificationOutbox.adicionar(db, notificacoes, id_relacionado=self.id)
                 db.commit()
         finally:
             db.close()
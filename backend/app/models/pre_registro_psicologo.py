@@ -6,6 +6,7 @@ from sqlalchemy.orm import relationship, Session
 from sqlalchemy.sql import func
 from typing import Optional, List
 from app.database import Base, get_db_session
+from app.models.outbox_notificacao import NotificationOutbox
 
 class PsychologistPreRegistration(Base):
     __tablename__ = "psychologist_pre_registrations"
@@ -97,7 +98,7 @@ class PsychologistPreRegistration(Base):
         finally:
             db.close()
     
-    def atualizar(self, **kwargs) -> "PsychologistPreRegistration":
+    def atualizar(self, notificacoes: Optional[List[dict]] = None, **kwargs) -> "PsychologistPreRegistration":
         """Atualizar pré-cadastro"""
         db = get_db_session()
         try:
@@ -108,6 +109,7 @@ class PsychologistPreRegistration(Base):
             for key, value in kwargs.items():
                 if hasattr(pre_cadastro, key):
                     setattr(pre_cadastro, key, value)
+            NotificationOutbox.adicionar(db, notificacoes, id_relacionado=self.id)
             db.commit()
             db.refresh(pre_cadastro)
             return pre_cadastro
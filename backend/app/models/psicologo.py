@@ -1,15 +1,34 @@
 """
 Psychologist Model
 """
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, or_
+import logging
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Index, inspect, or_, update
 from sqlalchemy.orm import relationship, Session, joinedload
 from sqlalchemy.sql import func
 from typing import Optional, List
 from app.database import Base, get_db_session
+from app.cache import em_cache
+from app.models.outbox_notificacao import NotificationOutbox
 from app.models.tabelas_associacao import psychologist_specialties, psychologist_approaches
 
+logger = logging.getLogger(__name__)
+
+def _tags_relacionamentos(psicologo: "Psychologist") -> List[str]:
+    """Tags do usuário, especialidades e abordagens carregados junto com o psicólogo"""
+    carregados = inspect(psicologo).dict
+    tags = []
+    if carregados.get("user") is not None:
+        tags += carregados["user"].tags_cache()
+    for chave in ("specialties", "approaches"):
+        for item in carregados.get(chave, ()):
+            tags += item.tags_cache()
+    return tags
+
 class Psychologist(Base):
     __tablename__ = "psychologists"
+    __table_args__ = (
+        Index("ix_psychologists_is_verified_rating", "is_verified", "rating"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     id_usuario = Column("user_id", Integer, ForeignKey("users.id"), unique=True, nullable=False)
@@ -30,6 +49,7 @@ class Psychologist(Base):
     rejeitado = Column("rejected", Boolean, default=False)  # Indica se foi rejeitado pelo admin
     saldo = Column("balance", Float, default=0.0)  # Saldo disponível para saque
     criado_em = Column("created_at", DateTime(timezone=True), server_default=func.now())
+    versao = Column("version", Integer, nullable=False, default=1, server_default="1")  # Incrementada a cada alteração (ETag)
     
     # Relacionamentos
     user = relationship("User", back_populates="psychologist_profile")
@@ -40,8 +60,13 @@ class Psychologist(Base):
     availability = relationship("PsychologistAvailability", back_populates="psychologist", overlaps="availability")
     withdrawals = relationship("Withdrawal", back_populates="psychologist", overlaps="withdrawals")
     
+    def tags_cache(self) -> List[str]:
+        """Tags invalidadas no cache quando o psicólogo é alterado"""
+        return [f"psychologist:{self.id}"]
+    
     # Métodos de acesso ao banco
     @classmethod
+    @em_cache("psychologist", tags=lambda psicologo: psicologo.tags_cache() + _tags_relacionamentos(psicologo))
     def obter_por_id(cls, id_psicologo: int, carregar_relacionamentos: bool = False) -> Optional["Psychologist"]:
         """Obter psicólogo por ID"""
         db = get_db_session()
@@ -58,6 +83,7 @@ class Psychologist(Base):
             db.close()
     
     @classmethod
+    @em_cache("psychologist_by_user", tags=lambda psicologo: psicologo.tags_cache())
     def obter_por_user_id(cls, id_usuario: int) -> Optional["Psychologist"]:
         """Obter psicólogo por id_usuario"""
         db = get_db_session()
@@ -76,14 +102,63 @@ class Psychologist(Base):
             db.close()
     
     @classmethod
-    def listar_verificados(cls, pular: int = 0, limite: int = 20) -> List["Psychologist"]:
-        """Listar psicólogos verificados"""
+    def obter_versao(cls, id_psicologo: int) -> Optional[int]:
+        """Versão atual do perfil (None se o psicólogo não existir), sem carregar a linha inteira"""
+        db = get_db_session(somente_leitura=True)
+        try:
+            return db.query(cls.versao).filter(cls.id == id_psicologo).scalar()
+        finally:
+            db.close()
+    
+    @classmethod
+    def obter_saldo(cls, id_psicologo: int) -> Optional[float]:
+        """Saldo atual lido do banco principal (None se o psicólogo não existir)
+        
+        Sem cache nem réplica: o saldo de obter_por_id pode estar defasado.
+        """
         db = get_db_session()
+        try:
+            saldo = db.query(cls.saldo).filter(cls.id == id_psicologo).first()
+            return None if saldo is None else (saldo[0] or 0.0)
+        finally:
+            db.close()
+    
+    @classmethod
+    def ajustar_saldo(cls, db: Session, id_psicologo: int, valor: float, saldo_minimo: Optional[float] = None) -> bool:
+        """Somar valor ao saldo em um único UPDATE, na transação de quem chama
+        
+        O saldo não é lido antes (balance = balance + valor), então créditos e
+        saques simultâneos não se sobrescrevem. Com saldo_minimo o UPDATE só
+        acontece se o saldo for pelo menos esse valor. Retorna se o saldo foi
+        alterado.
+        """
+        tabela = cls.__table__
+        saldo = func.coalesce(tabela.c.balance, 0.0)
+        comando = update(tabela).where(tabela.c.id == id_psicologo).values(balance=saldo + valor)
+        if saldo_minimo is not None:
+            comando = comando.where(saldo >= saldo_minimo)
+        if db.execute(comando).rowcount == 0:
+            return False
+        # UPDATE direto não passa pelo after_flush: invalidar o cache após o commit
+        db.info.setdefault("tags_cache_alteradas", set()).add(f"psychologist:{id_psicologo}")
+        return True
+    
+    @classmethod
+    def _opcoes_lista(cls) -> list:
+        """Carregamento padrão dos itens de listagem (PsychologistListItem)"""
+        return [
+            joinedload(cls.user),
+            joinedload(cls.specialties),
+            joinedload(cls.approaches)
+        ]
+    
+    @classmethod
+    def listar_verificados(cls, pular: int = 0, limite: int = 20, opcoes_carregamento: Optional[list] = None) -> List["Psychologist"]:
+        """Listar psicólogos verificados (opcoes_carregamento substitui o carregamento padrão)"""
+        db = get_db_session(somente_leitura=True)
         try:
             return db.query(cls).options(
-                joinedload(cls.user),
-                joinedload(cls.specialties),
-                joinedload(cls.approaches)
+                *(opcoes_carregamento or cls._opcoes_lista())
             ).filter(cls.esta_verificado == True).offset(pular).limit(limite).all()
         finally:
             db.close()
@@ -131,8 +206,7 @@ class Psychologist(Base):
         **kwargs
     ) -> "Psychologist":
         """Criar psicólogo com especialidades e abordagens"""
-        from app.models.especialidade import Specialty
-        from app.models.tratamento import Approach
+        from app import dados_referencia
         
         db = get_db_session()
         try:
@@ -142,14 +216,14 @@ class Psychologist(Base):
             
             # Adicionar especialidades
             if specialty_ids and len(specialty_ids) > 0:
-                especialidades = Specialty.obter_por_ids(specialty_ids)
+                especialidades = dados_referencia.especialidades.anexar(db, specialty_ids)
                 psicologo.specialties = especialidades
             else:
                 psicologo.specialties = []
             
             # Adicionar abordagens
             if approach_ids and len(approach_ids) > 0:
-                abordagens = Approach.obter_por_ids(approach_ids)
+                abordagens = dados_referencia.abordagens.anexar(db, approach_ids)
                 psicologo.approaches = abordagens
             else:
                 psicologo.approaches = []
@@ -163,7 +237,7 @@ class Psychologist(Base):
         finally:
             db.close()
     
-    def atualizar(self, **kwargs) -> "Psychologist":
+    def atualizar(self, notificacoes: Optional[List[dict]] = None, **kwargs) -> "Psychologist":
         """Atualizar psicólogo"""
         db = get_db_session()
         try:
@@ -174,6 +248,7 @@ class Psychologist(Base):
             for key, value in kwargs.items():
                 if hasattr(psicologo, key):
                     setattr(psicologo, key, value)
+            NotificationOutbox.adicionar(db, notificacoes, id_relacionado=self.id)
             db.commit()
             db.refresh(psicologo)
             return psicologo
@@ -187,8 +262,7 @@ class Psychologist(Base):
         **kwargs
     ) -> "Psychologist":
         """Atualizar psicólogo com especialidades e abordagens"""
-        from app.models.especialidade import Specialty
-        from app.models.tratamento import Approach
+        from app import dados_referencia
         
         db = get_db_session()
         try:
@@ -204,7 +278,7 @@ class Psychologist(Base):
             # Atualizar especialidades
             if specialty_ids is not None:
                 if len(specialty_ids) > 0:
-                    especialidades = Specialty.obter_por_ids(specialty_ids)
+                    especialidades = dados_referencia.especialidades.anexar(db, specialty_ids)
                     psicologo.specialties = especialidades
                 else:
                     psicologo.specialties = []
@@ -212,7 +286,7 @@ class Psychologist(Base):
             # Atualizar abordagens
             if approach_ids is not None:
                 if len(approach_ids) > 0:
-                    abordagens = Approach.obter_por_ids(approach_ids)
+                    abordagens = dados_referencia.abordagens.anexar(db, approach_ids)
                     psicologo.approaches = abordagens
                 else:
                     psicologo.approaches = []
@@ -223,7 +297,7 @@ class Psychologist(Base):
             return psicologo
         except Exception as e:
             db.rollback()
-            print(f"ERRO ao atualizar psicólogo: {e}")
+            logger.error("Erro ao atualizar psicólogo %s: %s", self.id, e)
             raise e
         finally:
             db.close()
@@ -253,25 +327,19 @@ class Psychologist(Base):
         preco_maximo: Optional[float] = None,
         experiencia_minima: Optional[int] = None,
         pagina: int = 1,
-        tamanho_pagina: int = 20
+        tamanho_pagina: int = 20,
+        opcoes_carregamento: Optional[list] = None
     ) -> dict:
         """Buscar psicólogos com filtros"""
         from app.models.usuario import User
         
-        db = get_db_session()
+        db = get_db_session(somente_leitura=True)
         try:
-            # Debug: Verificar quantos psicólogos existem no total
-            total_all = db.query(cls).count()
-            total_verified = db.query(cls).filter(cls.esta_verificado == True).count()
-            total_with_user = db.query(cls).join(User).count()
-            total_with_left_join = db.query(cls).outerjoin(User).count()
-            print(f"🔍 DEBUG busca_com_filtros: Total={total_all}, Verificados={total_verified}, Com User={total_with_user}, Com Left Join={total_with_left_join}")
-            
             # Usar outerjoin (LEFT JOIN) para incluir psicólogos mesmo sem user associado
             # TEMPORARIAMENTE: Remover filtro is_verified para debug - retornar todos os psicólogos
             # TODO: Restaurar filtro is_verified após confirmar que os dados estão sendo retornados
             q = db.query(cls).outerjoin(User)  # Usar outerjoin em vez de join para não excluir psicólogos sem user
-            print(f"🔍 DEBUG: Query inicial criada, filtros aplicados: consulta={consulta}, cidade={cidade}, estado={estado}")
+            logger.debug("buscar_com_filtros: consulta=%s, cidade=%s, estado=%s", consulta, cidade, estado)
             
             # Filtro por busca textual
             if consulta:
@@ -340,26 +408,18 @@ class Psychologist(Base):
             else:
                 total = q.count()
             
-            print(f"🔍 DEBUG: Total após filtros={total}, Página={pagina}, Tamanho={tamanho_pagina}")
+            logger.debug("buscar_com_filtros: total após filtros=%s, página=%s, tamanho=%s", total, pagina, tamanho_pagina)
             
             # Paginação
             skip = (pagina - 1) * tamanho_pagina
             psychologists = q.options(
-                joinedload(cls.user),
-                joinedload(cls.specialties),
-                joinedload(cls.approaches)
+                *(opcoes_carregamento or cls._opcoes_lista())
             ).order_by(
                 cls.avaliacao.desc(),
                 cls.total_avaliacoes.desc()
             ).offset(skip).limit(tamanho_pagina).all()
             
-            print(f"🔍 DEBUG: Psicólogos retornados={len(psychologists)}")
-            if psychologists:
-                print(f"🔍 DEBUG: Primeiro psicólogo: id={psychologists[0].id}, id_usuario={psychologists[0].id_usuario}, esta_verificado={psychologists[0].esta_verificado}")
-                if psychologists[0].user:
-                    print(f"🔍 DEBUG: User do primeiro: id={psychologists[0].user.id}, name={psychologists[0].user.nome_completo}")
-                else:
-                    print(f"⚠️ DEBUG: Primeiro psicólogo não tem user associado!")
+            logger.debug("buscar_com_filtros: psicólogos retornados=%s", len(psychologists))
             
             return {
                 "psychologists": psychologists,
@@ -6,6 +6,7 @@ from sqlalchemy.orm import relationship, Session
 from sqlalchemy.sql import func
 from typing import Optional, List
 from app.database import Base, get_db_session
+from app.models.outbox_notificacao import NotificationOutbox
 
 class Withdrawal(Base):
     __tablename__ = "withdrawals"
@@ -50,18 +51,46 @@ class Withdrawal(Base):
             db.close()
     
     @classmethod
-    def criar(cls, **kwargs) -> "Withdrawal":
+    def criar(cls, notificacoes: Optional[List[dict]] = None, **kwargs) -> "Withdrawal":
         """Criar novo saque"""
         db = get_db_session()
         try:
             saque = cls(**kwargs)
             db.add(saque)
+            db.flush()
+            NotificationOutbox.adicionar(db, notificacoes, id_relacionado=saque.id)
             db.commit()
             db.refresh(saque)
             return saque
         finally:
             db.close()
     
+    @classmethod
+    def criar_com_reserva(cls, notificacoes: Optional[List[dict]] = None, **kwargs) -> Optional["Withdrawal"]:
+        """Criar saque subtraindo o valor do saldo do psicólogo na mesma transação
+        
+        Retorna None (nada é gravado) se o saldo não cobre o valor.
+        """
+        from app.models.psicologo import Psychologist
+        
+        db = get_db_session()
+        try:
+            saque = cls(**kwargs)
+            if not Psychologist.ajustar_saldo(db, saque.id_psicologo, -saque.valor, saldo_minimo=saque.valor):
+                db.rollback()
+                return None
+            db.add(saque)
+            db.flush()
+            NotificationOutbox.adicionar(db, notificacoes, id_relacionado=saque.id)
+            db.commit()
+            db.refresh(saque)
+            return saque
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
     def atualizar(self, **kwargs) -> "Withdrawal":
         """Atualizar saque"""
         db = get_db_session()
@@ -1,7 +1,7 @@
 """
 Tabelas de associação (many-to-many)
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, Index
 from app.database import Base
 
 # Tabela de associação para favoritos
@@ -9,7 +9,9 @@ favorites = Table(
     'favorites',
     Base.metadata,
     Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
-    Column('psychologist_id', Integer, ForeignKey('psychologists.id'), primary_key=True)
+    Column('psychologist_id', Integer, ForeignKey('psychologists.id'), primary_key=True),
+    # A chave primária cobre user_id; este índice cobre "quem favoritou o psicólogo"
+    Index('ix_favorites_psychologist_id', 'psychologist_id')
 )
 
 # Tabela de associação para especialidades
@@ -17,7 +19,9 @@ psychologist_specialties = Table(
     'psychologist_specialties',
     Base.metadata,
     Column('psychologist_id', Integer, ForeignKey('psychologists.id')),
-    Column('specialty_id', Integer, ForeignKey('specialties.id'))
+    Column('specialty_id', Integer, ForeignKey('specialties.id')),
+    Index('ix_psychologist_specialties_psychologist_id_specialty_id', 'psychologist_id', 'specialty_id'),
+    Index('ix_psychologist_specialties_specialty_id_psychologist_id', 'specialty_id', 'psychologist_id')
 )
 
 # Tabela de associação para abordagens
@@ -25,6 +29,8 @@ psychologist_approaches = Table(
     'psychologist_approaches',
     Base.metadata,
     Column('psychologist_id', Integer, ForeignKey('psychologists.id')),
-    Column('approach_id', Integer, ForeignKey('approaches.id'))
+    Column('approach_id', Integer, ForeignKey('approaches.id')),
+    Index('ix_psychologist_approaches_psychologist_id_approach_id', 'psychologist_id', 'approach_id'),
+    Index('ix_psychologist_approaches_approach_id_psychologist_id', 'approach_id', 'psychologist_id')
 )
 
@@ -16,6 +16,10 @@ class Approach(Base):
     
     psychologists = relationship("Psychologist", secondary=psychologist_approaches, back_populates="approaches")
     
+    def tags_cache(self) -> List[str]:
+        """Tags invalidadas no cache quando o registro é alterado (perfis que o incluem)"""
+        return [f"approach:{self.id}"]
+    
     # Métodos de acesso ao banco
     @classmethod
     def listar_todos(cls) -> List["Approach"]:
@@ -4,8 +4,9 @@ User Model
 from sqlalchemy import Column, Integer, String, Boolean, DateTime
 from sqlalchemy.orm import relationship, Session, joinedload
 from sqlalchemy.sql import func
-from typing import Optional
+from typing import List, Optional
 from app.database import Base, get_db_session
+from app.cache import em_cache
 from app.models.tabelas_associacao import favorites
 
 class User(Base):
@@ -35,8 +36,13 @@ class User(Base):
     questionnaires = relationship("Questionnaire", back_populates="user", overlaps="questionnaires")
     pre_registrations = relationship("PsychologistPreRegistration", back_populates="user", overlaps="pre_registrations")
     
+    def tags_cache(self) -> List[str]:
+        """Tags invalidadas no cache quando o usuário é alterado"""
+        return [f"user:{self.id}"]
+    
     # Métodos de acesso ao banco
     @classmethod
+    @em_cache("user", tags=lambda usuario: usuario.tags_cache())
     def obter_por_id(cls, id_usuario: int) -> Optional["User"]:
         """Obter usuário por ID"""
         db = get_db_session()
@@ -109,15 +115,16 @@ class User(Base):
         finally:
             db.close()
     
-    def obter_com_favoritos_completo(self):
-        """Obter usuário com favoritos e seus relacionamentos completos"""
+    def obter_com_favoritos_completo(self, opcoes_carregamento: Optional[list] = None):
+        """Obter usuário com favoritos e seus relacionamentos completos
+        (opcoes_carregamento, relativas ao psicólogo, substituem o carregamento padrão)"""
         from app.models.psicologo import Psychologist
         db = get_db_session()
         try:
             return db.query(User).options(
-                joinedload(User.favorite_psychologists).joinedload(Psychologist.user),
-                joinedload(User.favorite_psychologists).joinedload(Psychologist.specialties),
-                joinedload(User.favorite_psychologists).joinedload(Psychologist.approaches)
+                joinedload(User.favorite_psychologists).options(
+                    *(opcoes_carregamento or Psychologist._opcoes_lista())
+                )
             ).filter(User.id == self.id).first()
         finally:
             db.close()
@@ -0,0 +1,116 @@
+"""
+ResourceVersion Model - Contadores de versão de recursos agregados (ETags)
+
+Recursos que não são uma única linha (lista de especialidades, agenda de um
+psicólogo) têm um contador monotônico aqui, incrementado na mesma transação
+de qualquer alteração que mude a resposta. O perfil do psicólogo usa a
+coluna própria psychologists.version.
+
+Os incrementos são feitos no before_flush da sessão, então valem para
+qualquer caminho de escrita pelo ORM (exceto query.update/delete em massa).
+"""
+from sqlalchemy import Column, Integer, String, event, update, select
+from sqlalchemy.orm import Session
+from app.database import Base, SessionLocal, get_db_session
+
+CHAVE_ESPECIALIDADES = "specialties"
+CHAVE_ABORDAGENS = "approaches"
+
+def chave_agenda(id_psicologo: int) -> str:
+    """Disponibilidade e agendamentos de um psicólogo (calendário e horários livres)"""
+    return f"schedule:{id_psicologo}"
+
+
+class ResourceVersion(Base):
+    __tablename__ = "resource_versions"
+    
+    chave = Column("key", String, primary_key=True)
+    versao = Column("version", Integer, nullable=False, default=0)
+    
+    # Métodos de acesso ao banco
+    @classmethod
+    def obter(cls, chave: str) -> int:
+        """Versão atual do recurso (0 se nunca foi alterado)"""
+        db = get_db_session(somente_leitura=True)
+        try:
+            return db.query(cls.versao).filter(cls.chave == chave).scalar() or 0
+        finally:
+            db.close()
+    
+    @classmethod
+    def incrementar(cls, db: Session, chaves) -> None:
+        """Incrementar as versões na transação de quem chama (upsert)"""
+        conexao = db.connection()
+        dialeto = conexao.dialect.name
+        for chave in sorted(set(chaves)):
+            if dialeto in ("postgresql", "sqlite"):
+                if dialeto == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert
+                comando = insert(cls.__table__).values(key=chave, version=1)
+                conexao.execute(comando.on_conflict_do_update(
+                    index_elements=["key"],
+                    set_={"version": cls.__table__.c.version + 1}
+                ))
+            else:
+                resultado = conexao.execute(
+                    update(cls.__table__).where(cls.__table__.c.key == chave).values(version=cls.__table__.c.version + 1)
+                )
+                if resultado.rowcount == 0:
+                    conexao.execute(cls.__table__.insert().values(key=chave, version=1))
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _incrementar_versoes(sessao, contexto, instancias) -> None:
+    from app.models.psicologo import Psychologist
+    from app.models.usuario import User
+    from app.models.especialidade import Specialty
+    from app.models.tratamento import Approach
+    from app.models.disponibilidade_psicologo import PsychologistAvailability
+    from app.models.agendamento import Appointment
+    from app.models.tabelas_associacao import psychologist_specialties, psychologist_approaches
+    
+    chaves = set()
+    usuarios_alterados = set()
+    especialidades_alteradas = set()
+    abordagens_alteradas = set()
+    for objeto in list(sessao.new) + list(sessao.dirty) + list(sessao.deleted):
+        if isinstance(objeto, Psychologist):
+            if objeto in sessao.dirty and sessao.is_modified(objeto):
+                # Incremento em SQL: não perde atualizações concorrentes
+                objeto.versao = Psychologist.versao + 1
+        elif isinstance(objeto, User):
+            if objeto in sessao.dirty and objeto.id is not None and sessao.is_modified(objeto, include_collections=False):
+                usuarios_alterados.add(objeto.id)
+        elif isinstance(objeto, (Specialty, Approach)):
+            # Só a coleção psychologists mudou (vínculo com um perfil): a lista não muda
+            if objeto in sessao.dirty and not sessao.is_modified(objeto, include_collections=False):
+                continue
+            chaves.add(CHAVE_ESPECIALIDADES if isinstance(objeto, Specialty) else CHAVE_ABORDAGENS)
+            if objeto.id is not None:
+                (especialidades_alteradas if isinstance(objeto, Specialty) else abordagens_alteradas).add(objeto.id)
+        elif isinstance(objeto, (PsychologistAvailability, Appointment)):
+            if objeto.id_psicologo is not None:
+                chaves.add(chave_agenda(objeto.id_psicologo))
+    
+    # O perfil do psicólogo inclui os dados do usuário
+    if usuarios_alterados:
+        tabela = Psychologist.__table__
+        sessao.connection().execute(
+            update(tabela).where(tabela.c.user_id.in_(usuarios_alterados)).values(version=tabela.c.version + 1)
+        )
+    # ... e o nome das especialidades e abordagens vinculadas (ainda presentes
+    # na tabela de associação quando a especialidade é excluída)
+    for associacao, coluna, ids in (
+        (psychologist_specialties, "specialty_id", especialidades_alteradas),
+        (psychologist_approaches, "approach_id", abordagens_alteradas),
+    ):
+        if ids:
+            tabela = Psychologist.__table__
+            vinculados = select(associacao.c.psychologist_id).where(associacao.c[coluna].in_(ids))
+            sessao.connection().execute(
+                update(tabela).where(tabela.c.id.in_(vinculados)).values(version=tabela.c.version + 1)
+            )
+    if chaves:
+        ResourceVersion.incrementar(sessao, chaves)
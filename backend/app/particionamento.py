@@ -0,0 +1,71 @@
+"""
+Partições mensais das tabelas de arquivo (PostgreSQL)
+
+No PostgreSQL appointments_archive e payments_archive são particionadas por
+intervalo (PARTITION BY RANGE) na coluna de data, uma partição por mês
+(ex.: appointments_archive_2025_01). As partições são criadas sob demanda,
+antes de cada lote de arquivamento, para os meses que o lote vai ocupar.
+
+Em outros bancos (SQLite) as tabelas de arquivo são tabelas comuns e as
+funções daqui não fazem nada.
+"""
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+def inicio_do_mes(data: datetime) -> datetime:
+    """Primeiro instante do mês (UTC)"""
+    if data.tzinfo is not None:
+        data = data.astimezone(timezone.utc)
+    return datetime(data.year, data.month, 1, tzinfo=timezone.utc)
+
+def proximo_mes(data: datetime) -> datetime:
+    return data.replace(year=data.year + data.month // 12, month=data.month % 12 + 1)
+
+def meses_entre(inicio: datetime, fim: datetime) -> List[datetime]:
+    """Início de cada mês de inicio até fim (inclusive)"""
+    meses = []
+    mes = inicio_do_mes(inicio)
+    ultimo = inicio_do_mes(fim)
+    while mes <= ultimo:
+        meses.append(mes)
+        mes = proximo_mes(mes)
+    return meses
+
+def nome_particao(tabela: str, mes: datetime) -> str:
+    return f"{tabela}_{mes.year:04d}_{mes.month:02d}"
+
+def particionado(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def garantir_particoes(db: Session, tabela: str, inicio: Optional[datetime], fim: Optional[datetime]) -> List[str]:
+    """Criar (se faltarem) as partições mensais de inicio a fim; retorna os nomes
+    
+    Executa na transação da sessão: se o lote for desfeito, as partições
+    criadas nele também são.
+    """
+    if not particionado(db) or inicio is None or fim is None:
+        return []
+    nomes = []
+    for mes in meses_entre(inicio, fim):
+        nome = nome_particao(tabela, mes)
+        de, ate = mes.isoformat(), proximo_mes(mes).isoformat()
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {nome} PARTITION OF {tabela} "
+            f"FOR VALUES FROM ('{de}') TO ('{ate}')"
+        ))
+        nomes.append(nome)
+    return nomes
+
+def listar_particoes(db: Session, tabela: str) -> List[Tuple[str, str]]:
+    """Partições existentes da tabela com os limites (vazio fora do PostgreSQL)"""
+    if not particionado(db):
+        return []
+    return [tuple(linha) for linha in db.execute(text(
+        "SELECT filho.relname, pg_get_expr(filho.relpartbound, filho.oid) "
+        "FROM pg_inherits "
+        "JOIN pg_class pai ON pai.oid = pg_inherits.inhparent "
+        "JOIN pg_class filho ON filho.oid = pg_inherits.inhrelid "
+        "WHERE pai.relname = :tabela ORDER BY filho.relname"
+    ), {"tabela": tabela})]
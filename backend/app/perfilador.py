@@ -0,0 +1,239 @@
+"""
+Profiler estatístico por amostragem para diagnóstico em produção
+
+Uma thread lê as pilhas de todas as threads (sys._current_frames) a cada
+intervalo e conta quantas vezes cada pilha apareceu. Não instrumenta as
+funções, então o custo fica restrito à thread de amostragem enquanto o
+perfil está sendo coletado. O resultado sai em formato collapsed (flame
+graphs: "thread;func_a;func_b <amostras>") ou speedscope (JSON).
+
+Perfis por requisição: admins podem enviar o header "X-Profile: collapsed"
+(ou "speedscope") em qualquer rota; a resposta volta com "X-Profile-Id" e o
+perfil fica disponível em /api/debug/profiles/{id}.
+
+Configuração:
+- PROFILER_INTERVAL_MS: intervalo entre amostras (padrão 5)
+- PROFILER_MAX_SECONDS: duração máxima de uma coleta (padrão 60)
+- PROFILER_HISTORY_SIZE: perfis por requisição guardados (padrão 20)
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Iterable, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+PROFILER_HISTORY_SIZE = int(os.getenv("PROFILER_HISTORY_SIZE", "20"))
+
+FORMATOS = ("collapsed", "speedscope")
+
+
+class PerfiladorOcupado(Exception):
+    """Já existe uma coleta global em andamento"""
+    pass
+
+
+def _descrever_frame(frame) -> Tuple[str, str, int]:
+    codigo = frame.f_code
+    return codigo.co_name, codigo.co_filename, frame.f_lineno
+
+
+class AmostradorPilhas:
+    """Coleta amostras das pilhas das threads até parar() ser chamado"""
+    
+    def __init__(self, intervalo: float = PROFILER_INTERVAL_MS / 1000):
+        self.intervalo = intervalo
+        self.amostras: Counter = Counter()
+        self.total_amostras = 0
+        self.inicio = 0.0
+        self.duracao = 0.0
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def iniciar(self) -> "AmostradorPilhas":
+        self.inicio = time.perf_counter()
+        self._thread = threading.Thread(target=self._executar, name="perfilador", daemon=True)
+        self._thread.start()
+        return self
+    
+    def parar(self) -> "AmostradorPilhas":
+        self._parar.set()
+        if self._thread:
+            self._thread.join()
+        self.duracao = time.perf_counter() - self.inicio
+        return self
+    
+    def _executar(self) -> None:
+        proprio = threading.get_ident()
+        while not self._parar.wait(self.intervalo):
+            nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == proprio:
+                    continue
+                pilha = []
+                while frame is not None:
+                    pilha.append(_descrever_frame(frame))
+                    frame = frame.f_back
+                pilha.reverse()
+                self.amostras[(nomes.get(ident, str(ident)), tuple(pilha))] += 1
+            self.total_amostras += 1
+    
+    def collapsed(self) -> str:
+        """Formato "collapsed" (flamegraph.pl, speedscope, inferno)"""
+        linhas = []
+        for (thread, pilha), quantidade in self.amostras.most_common():
+            quadros = ";".join(f"{nome} ({os.path.basename(arquivo)}:{linha})" for nome, arquivo, linha in pilha)
+            linhas.append(f"{thread};{quadros} {quantidade}")
+        return "\n".join(linhas) + "\n"
+    
+    def speedscope(self, nome: str = "lumine") -> dict:
+        """Formato JSON do speedscope (um perfil "sampled" por thread)"""
+        quadros = []
+        indices = {}
+        por_thread = {}
+        for (thread, pilha), quantidade in self.amostras.items():
+            indices_pilha = []
+            for nome_funcao, arquivo, linha in pilha:
+                chave = (nome_funcao, arquivo, linha)
+                if chave not in indices:
+                    indices[chave] = len(quadros)
+                    quadros.append({"name": nome_funcao, "file": arquivo, "line": linha})
+                indices_pilha.append(indices[chave])
+            amostras, pesos = por_thread.setdefault(thread, ([], []))
+            amostras.append(indices_pilha)
+            pesos.append(quantidade * self.intervalo)
+        
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": nome,
+            "exporter": "lumine-perfilador",
+            "shared": {"frames": quadros},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(pesos),
+                    "samples": amostras,
+                    "weights": pesos,
+                }
+                for thread, (amostras, pesos) in por_thread.items()
+            ],
+        }
+    
+    def exportar(self, formato: str, nome: str = "lumine"):
+        return self.speedscope(nome) if formato == "speedscope" else self.collapsed()
+
+
+_lock_coleta = threading.Lock()
+
+def coletar_perfil(segundos: float, intervalo_ms: float = PROFILER_INTERVAL_MS) -> AmostradorPilhas:
+    """Amostrar todas as threads por `segundos` (bloqueia a thread chamadora)"""
+    if not _lock_coleta.acquire(blocking=False):
+        raise PerfiladorOcupado()
+    try:
+        amostrador = AmostradorPilhas(intervalo_ms / 1000).iniciar()
+        time.sleep(min(segundos, PROFILER_MAX_SECONDS))
+        return amostrador.parar()
+    finally:
+        _lock_coleta.release()
+
+
+class HistoricoPerfis:
+    """Últimos perfis coletados por requisição, acessados pelo ID"""
+    
+    def __init__(self, maximo: int = PROFILER_HISTORY_SIZE):
+        self.maximo = maximo
+        self._perfis: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def adicionar(self, perfil: dict, id_perfil: Optional[str] = None) -> str:
+        id_perfil = id_perfil or uuid.uuid4().hex[:12]
+        with self._lock:
+            self._perfis[id_perfil] = perfil
+            while len(self._perfis) > self.maximo:
+                self._perfis.popitem(last=False)
+        return id_perfil
+    
+    def obter(self, id_perfil: str) -> Optional[dict]:
+        with self._lock:
+            return self._perfis.get(id_perfil)
+    
+    def listar(self) -> list:
+        with self._lock:
+            return [
+                {"id": id_perfil, **{chave: valor for chave, valor in perfil.items() if chave != "profile"}}
+                for id_perfil, perfil in reversed(self._perfis.items())
+            ]
+
+
+historico_perfis = HistoricoPerfis()
+
+def _eh_admin(headers: Iterable[Tuple[bytes, bytes]]) -> bool:
+    """Validar o token de acesso do header Authorization sem acessar o banco"""
+    from app.auth import PrincipalToken, decodificar_token
+    
+    autorizacao = next((valor for nome, valor in headers if nome == b"authorization"), b"").decode("latin-1")
+    esquema, _, token = autorizacao.partition(" ")
+    if esquema.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = decodificar_token(token)
+    except Exception:
+        return False
+    if "uid" not in payload:
+        return False
+    principal = PrincipalToken(payload)
+    return principal.eh_admin and principal.esta_ativo
+
+
+class MiddlewarePerfilador:
+    """Middleware ASGI: perfil da requisição quando um admin envia X-Profile"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        formato = next((valor for nome, valor in scope["headers"] if nome == b"x-profile"), None)
+        if formato is None:
+            await self.app(scope, receive, send)
+            return
+        formato = formato.decode("latin-1").strip().lower()
+        formato = formato if formato in FORMATOS else "collapsed"
+        if not _eh_admin(scope["headers"]) or not _lock_coleta.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        
+        id_perfil = uuid.uuid4().hex[:12]
+        
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                mensagem["headers"] = list(mensagem.get("headers", [])) + [(b"x-profile-id", id_perfil.encode())]
+            await send(mensagem)
+        
+        # Todas as threads são amostradas: endpoints síncronos rodam no threadpool
+        amostrador = AmostradorPilhas().iniciar()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            amostrador.parar()
+            _lock_coleta.release()
+            historico_perfis.adicionar({
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "format": formato,
+                "duration_seconds": round(amostrador.duracao, 4),
+                "samples": amostrador.total_amostras,
+                "profile": amostrador.exportar(formato, f"{scope.get('method')} {scope.get('path')}"),
+            }, id_perfil)
@@ -0,0 +1,110 @@
+"""
+Pool dedicado para o trabalho de bcrypt (hash e verificação de senhas)
+
+bcrypt com custo 12 leva centenas de milissegundos de CPU. Executá-lo no
+threadpool padrão faz uma rajada de logins ocupar todas as threads e travar
+os demais endpoints. Aqui o trabalho vai para um executor próprio e limitado:
+- PASSWORD_POOL_KIND: "process" (padrão, paralelismo real) ou "thread"
+- PASSWORD_POOL_WORKERS: número de workers (padrão: núcleos de CPU)
+- PASSWORD_POOL_MAX_PENDING: tarefas aceitas ao mesmo tempo (em execução +
+  na fila); acima disso PoolSenhasCheio é lançado e a API responde 429
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from dotenv import load_dotenv
+from app.senhas import verificar_senha, gerar_hash_senha
+
+load_dotenv()
+
+PASSWORD_POOL_KIND = os.getenv("PASSWORD_POOL_KIND", "process")
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", str(PASSWORD_POOL_WORKERS * 8)))
+
+
+class PoolSenhasCheio(Exception):
+    """Fila do pool de senhas atingiu o limite"""
+    pass
+
+
+class PoolSenhas:
+    """Executor limitado para bcrypt, com métricas de fila"""
+    
+    def __init__(
+        self,
+        tipo: str = PASSWORD_POOL_KIND,
+        workers: int = PASSWORD_POOL_WORKERS,
+        maximo_pendentes: int = PASSWORD_POOL_MAX_PENDING
+    ):
+        self.tipo = tipo
+        self.workers = workers
+        self.maximo_pendentes = maximo_pendentes
+        self.pendentes = 0
+        self.pico_pendentes = 0
+        self.concluidas = 0
+        self.rejeitadas = 0
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+    
+    def iniciar(self) -> None:
+        """Criar o executor (também é criado sob demanda no primeiro uso)"""
+        with self._lock:
+            if self._executor is None:
+                if self.tipo == "thread":
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="senhas")
+                else:
+                    # spawn: os workers não herdam threads/conexões do processo da API
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+    
+    def encerrar(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    async def verificar(self, senha: str, senha_hash: str) -> bool:
+        """Verificar senha fora do event loop"""
+        return await self._executar(verificar_senha, senha, senha_hash)
+    
+    async def gerar_hash(self, senha: str) -> str:
+        """Gerar hash de senha fora do event loop"""
+        return await self._executar(gerar_hash_senha, senha)
+    
+    async def _executar(self, funcao, *args):
+        with self._lock:
+            if self.pendentes >= self.maximo_pendentes:
+                self.rejeitadas += 1
+                raise PoolSenhasCheio()
+            self.pendentes += 1
+            self.pico_pendentes = max(self.pico_pendentes, self.pendentes)
+        try:
+            if self._executor is None:
+                self.iniciar()
+            return await asyncio.get_running_loop().run_in_executor(self._executor, funcao, *args)
+        finally:
+            with self._lock:
+                self.pendentes -= 1
+                self.concluidas += 1
+    
+    def metricas(self) -> dict:
+        """Métricas de fila do pool"""
+        with self._lock:
+            return {
+                "kind": self.tipo,
+                "workers": self.workers,
+                "max_pending": self.maximo_pendentes,
+                "pending": self.pendentes,
+                "queued": max(self.pendentes - self.workers, 0),
+                "peak_pending": self.pico_pendentes,
+                "completed": self.concluidas,
+                "rejected": self.rejeitadas
+            }
+
+
+pool_senhas = PoolSenhas()
@@ -0,0 +1,181 @@
+"""
+Projeção de campos (sparse fieldsets) para endpoints de listagem
+
+O parâmetro `fields` recebe nomes de campos do schema de resposta separados
+por vírgula; campos de objetos aninhados usam ponto. Exemplo em
+/api/appointments/meus-agendamentos:
+
+    fields=id,appointment_date,status,psychologist.profile_picture,psychologist.user.nome_completo
+
+Um relacionamento pedido sem subcampos ("psychologist") vem completo.
+A projeção limita as duas pontas:
+- SQL: load_only nas colunas pedidas e joinedload só nos relacionamentos
+  pedidos (os demais não são carregados)
+- Resposta: um schema parcial com os mesmos campos é gerado (e guardado em
+  cache) e serializado direto para bytes por serializacao.resposta_json
+"""
+import copy
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Union, get_args, get_origin
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only
+from app.serializacao import para_dict, resposta_json
+
+# Árvore de campos: tupla ordenada de (campo, subárvore ou None = objeto completo)
+Arvore = Tuple[Tuple[str, Optional["Arvore"]], ...]
+
+MAXIMO_CAMPOS = 100
+
+
+class CamposInvalidos(ValueError):
+    """Campo pedido em `fields` não existe no schema de resposta"""
+    pass
+
+
+def _schema_aninhado(anotacao: Any) -> Optional[type]:
+    """Schema Pydantic dentro de X, Optional[X] ou List[X] (None se não houver)"""
+    if isinstance(anotacao, type) and issubclass(anotacao, BaseModel):
+        return anotacao
+    for argumento in get_args(anotacao):
+        schema = _schema_aninhado(argumento)
+        if schema is not None:
+            return schema
+    return None
+
+def _trocar_schema(anotacao: Any, schema: type, novo: type) -> Any:
+    """Reconstruir a anotação trocando o schema aninhado pelo schema parcial"""
+    if anotacao is schema:
+        return novo
+    origem = get_origin(anotacao)
+    if origem is None:
+        return anotacao
+    argumentos = tuple(_trocar_schema(argumento, schema, novo) for argumento in get_args(anotacao))
+    if origem is Union:
+        return Union[argumentos]
+    if origem is list:
+        return List[argumentos[0]]
+    return origem[argumentos]
+
+def _atributo(schema: type, campo: str) -> str:
+    """Nome do atributo no model (validation_alias em português, ou o próprio campo)"""
+    alias = schema.model_fields[campo].validation_alias
+    return alias if isinstance(alias, str) else campo
+
+
+def interpretar_campos(campos: Optional[str], schema: type) -> Optional[Arvore]:
+    """Converter "a,b.c,b.d" na árvore de campos validada contra o schema"""
+    if campos is None or not campos.strip():
+        return None
+    caminhos = [caminho.strip() for caminho in campos.split(",") if caminho.strip()]
+    if len(caminhos) > MAXIMO_CAMPOS:
+        raise CamposInvalidos(f"Máximo de {MAXIMO_CAMPOS} campos")
+    
+    arvore: dict = {}
+    invalidos = []
+    for caminho in caminhos:
+        no, atual = arvore, schema
+        partes = caminho.split(".")
+        for indice, parte in enumerate(partes):
+            if atual is None or parte not in atual.model_fields:
+                invalidos.append(caminho)
+                break
+            ultimo = indice == len(partes) - 1
+            if ultimo:
+                # Campo completo prevalece sobre subcampos pedidos para o mesmo objeto
+                no[parte] = None
+            elif no.get(parte, {}) is not None:
+                no = no.setdefault(parte, {})
+                atual = _schema_aninhado(atual.model_fields[parte].annotation)
+            else:
+                break
+    if invalidos:
+        raise CamposInvalidos(f"Campos inválidos: {', '.join(invalidos)}")
+    
+    def congelar(no: dict) -> Arvore:
+        return tuple(sorted((campo, congelar(sub) if sub is not None else None) for campo, sub in no.items()))
+    return congelar(arvore)
+
+
+@lru_cache(maxsize=256)
+def schema_parcial(schema: type, arvore: Arvore) -> type:
+    """Schema com apenas os campos da árvore (gerado uma vez por combinação)"""
+    definicoes = {}
+    pedidos = dict(arvore)
+    for campo in (nome for nome in schema.model_fields if nome in pedidos):
+        subarvore = pedidos[campo]
+        info = copy.copy(schema.model_fields[campo])
+        anotacao = info.annotation
+        if subarvore is not None:
+            aninhado = _schema_aninhado(anotacao)
+            anotacao = _trocar_schema(anotacao, aninhado, schema_parcial(aninhado, subarvore))
+        definicoes[campo] = (anotacao, info)
+    return create_model(
+        f"{schema.__name__}Parcial",
+        __config__=ConfigDict(from_attributes=True, populate_by_name=True),
+        **definicoes
+    )
+
+def opcoes_carregamento(modelo: type, schema: type, arvore: Arvore) -> list:
+    """load_only nas colunas e joinedload nos relacionamentos pedidos"""
+    mapeador = inspect(modelo)
+    colunas = []
+    opcoes = []
+    somente_colunas = True
+    for campo, subarvore in arvore:
+        atributo = _atributo(schema, campo)
+        if atributo in mapeador.relationships:
+            aninhado = _schema_aninhado(schema.model_fields[campo].annotation)
+            carregamento = joinedload(getattr(modelo, atributo))
+            if aninhado is not None:
+                # Objeto completo: carregar todos os campos do schema aninhado (e os relacionamentos dele)
+                if subarvore is None:
+                    subarvore = tuple((nome, None) for nome in aninhado.model_fields)
+                carregamento = carregamento.options(*opcoes_carregamento(
+                    mapeador.relationships[atributo].mapper.class_,
+                    aninhado,
+                    subarvore
+                ))
+            opcoes.append(carregamento)
+        elif atributo in mapeador.column_attrs:
+            colunas.append(getattr(modelo, atributo))
+        else:
+            # Propriedade calculada: não dá para saber quais colunas ela lê
+            somente_colunas = False
+    if somente_colunas:
+        chaves = [getattr(modelo, mapeador.get_property_by_column(coluna).key) for coluna in mapeador.primary_key]
+        opcoes.append(load_only(*(colunas or chaves)))
+    return opcoes
+
+
+class Projecao:
+    """Campos pedidos em `fields` para um schema de resposta"""
+    
+    def __init__(self, schema: type, arvore: Arvore):
+        self.schema = schema
+        self.arvore = arvore
+        self.schema_parcial = schema_parcial(schema, arvore)
+    
+    @classmethod
+    def de_parametro(cls, campos: Optional[str], schema: type) -> Optional["Projecao"]:
+        """None quando `fields` não foi informado (resposta completa)"""
+        arvore = interpretar_campos(campos, schema)
+        return cls(schema, arvore) if arvore is not None else None
+    
+    def opcoes(self, modelo: type) -> list:
+        return opcoes_carregamento(modelo, self.schema, self.arvore)
+    
+    def para_dict(self, objeto: Any, lista: bool = False) -> Any:
+        return para_dict(self.schema_parcial, objeto, lista=lista)
+    
+    def resposta(self, objeto: Any, lista: bool = False):
+        return resposta_json(self.schema_parcial, objeto, lista=lista)
+
+
+def obter_projecao(campos: Optional[str], schema: type) -> Optional[Projecao]:
+    """Projeção do parâmetro `fields` para o controller (400 se houver campo inválido)"""
+    try:
+        return Projecao.de_parametro(campos, schema)
+    except CamposInvalidos as e:
+        raise HTTPException(status_code=400, detail=str(e))
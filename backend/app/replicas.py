@@ -0,0 +1,209 @@
+"""
+Roteamento de leituras para réplicas do banco
+
+Métodos de leitura dos models que aceitam dados levemente atrasados pedem
+get_db_session(somente_leitura=True). Com DATABASE_REPLICA_URLS definido,
+essas sessões vão para uma réplica saudável em round-robin; sem réplicas (ou
+com todas fora do ar) tudo continua no banco principal.
+
+- Saúde: uma thread executa SELECT 1 em cada réplica a cada
+  REPLICA_HEALTH_CHECK_SECONDS; réplicas que falham ou passam de
+  REPLICA_MAX_LATENCY_MS saem do rodízio até a próxima verificação boa
+- Read-your-writes: após um commit com escrita, as leituras do mesmo usuário
+  autenticado vão para o principal por REPLICA_STICKY_SECONDS (o usuário da
+  requisição vem do token: MiddlewareUsuarioLeitura e auth.py). O registro é
+  do processo: com vários workers, o prazo deve cobrir o atraso de replicação
+- Sessões de réplica não gravam: um flush com alterações gera erro
+
+Teste local com dois SQLite (a "réplica" é uma cópia do arquivo):
+
+    cp lumine.db replica.db
+    DATABASE_REPLICA_URLS=sqlite:///./replica.db uvicorn app.main:app
+
+Configuração:
+- DATABASE_REPLICA_URLS: URLs das réplicas separadas por vírgula
+- REPLICA_HEALTH_CHECK_SECONDS: intervalo da verificação (padrão 10)
+- REPLICA_MAX_LATENCY_MS: latência máxima do SELECT 1 (padrão 1000)
+- REPLICA_STICKY_SECONDS: janela de leitura no principal após escrita (padrão 5)
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from jose import JWTError, jwt
+from sqlalchemy import event
+from starlette.datastructures import Headers
+from sqlalchemy.orm import Session
+from app.database import DATABASE_REPLICA_URLS, SessionLocal, criar_engine, estatisticas_pool, medir_latencia
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", "10"))
+REPLICA_MAX_LATENCY_MS = float(os.getenv("REPLICA_MAX_LATENCY_MS", "1000"))
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+MAXIMO_ESCRITAS_REGISTRADAS = 10000
+
+_usuario_atual: ContextVar[Optional[int]] = ContextVar("usuario_atual", default=None)
+
+def definir_usuario_atual(id_usuario: Optional[int]) -> None:
+    """Usuário da requisição atual (chamado na autenticação)"""
+    _usuario_atual.set(id_usuario)
+
+
+class MiddlewareUsuarioLeitura:
+    """Define o usuário atual a partir do token também em rotas sem autenticação
+    
+    As claims são lidas sem validar a assinatura: servem só para escolher
+    entre réplica e principal, nunca para autorizar.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            autorizacao = Headers(scope=scope).get("authorization", "")
+            if autorizacao.lower().startswith("bearer "):
+                try:
+                    id_usuario = jwt.get_unverified_claims(autorizacao[7:]).get("uid")
+                except JWTError:
+                    id_usuario = None
+                if isinstance(id_usuario, int):
+                    _usuario_atual.set(id_usuario)
+        await self.app(scope, receive, send)
+
+
+class Replica:
+    def __init__(self, url: str, nome: str):
+        self.nome = nome
+        self.engine = criar_engine(url)
+        self.saudavel = True
+        self.latencia_ms: Optional[float] = None
+
+
+class RoteadorReplicas:
+    """Escolhe a réplica das sessões somente leitura e verifica a saúde delas"""
+    
+    def __init__(self, urls: List[str], intervalo: float = REPLICA_HEALTH_CHECK_SECONDS):
+        self.replicas = [Replica(url, f"replica-{indice}") for indice, url in enumerate(urls)]
+        self.intervalo = intervalo
+        self._proxima = itertools.count()
+        self._escritas: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def sessao_leitura(self) -> Session:
+        """Sessão em uma réplica saudável, ou no principal (sem réplica ou após escrita recente do usuário)"""
+        replica = None if self._leitura_no_principal() else self._escolher()
+        if replica is None:
+            return SessionLocal()
+        return SessionLocal(bind=replica.engine, info={"somente_leitura": True, "replica": replica.nome})
+    
+    def _escolher(self) -> Optional[Replica]:
+        saudaveis = [replica for replica in self.replicas if replica.saudavel]
+        if not saudaveis:
+            return None
+        return saudaveis[next(self._proxima) % len(saudaveis)]
+    
+    def _leitura_no_principal(self) -> bool:
+        id_usuario = _usuario_atual.get()
+        if id_usuario is None:
+            return False
+        escrita = self._escritas.get(id_usuario)
+        return escrita is not None and time.monotonic() - escrita < REPLICA_STICKY_SECONDS
+    
+    def registrar_escrita(self) -> None:
+        """Commit com escrita: o usuário atual passa a ler do principal"""
+        id_usuario = _usuario_atual.get()
+        if id_usuario is None:
+            return
+        agora = time.monotonic()
+        with self._lock:
+            self._escritas[id_usuario] = agora
+            if len(self._escritas) > MAXIMO_ESCRITAS_REGISTRADAS:
+                self._escritas = {
+                    usuario: instante for usuario, instante in self._escritas.items()
+                    if agora - instante < REPLICA_STICKY_SECONDS
+                }
+    
+    def verificar(self) -> None:
+        """SELECT 1 em cada réplica, tirando do rodízio as que falham ou estão lentas"""
+        for replica in self.replicas:
+            try:
+                replica.latencia_ms = medir_latencia(replica.engine)
+                saudavel = replica.latencia_ms <= REPLICA_MAX_LATENCY_MS
+            except Exception as e:
+                logger.debug("Réplica %s falhou na verificação: %s", replica.nome, e)
+                replica.latencia_ms = None
+                saudavel = False
+            if saudavel != replica.saudavel:
+                logger.warning("Réplica %s %s", replica.nome, "voltou ao rodízio" if saudavel else "saiu do rodízio")
+            replica.saudavel = saudavel
+    
+    def iniciar(self) -> None:
+        """Verificar as réplicas agora e depois periodicamente"""
+        if not self.replicas or (self._thread and self._thread.is_alive()):
+            return
+        self.verificar()
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="verificacao-replicas", daemon=True)
+        self._thread.start()
+    
+    def parar(self, timeout: float = 5.0) -> None:
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception:
+                logger.exception("Erro na verificação das réplicas")
+    
+    def estatisticas(self) -> List[dict]:
+        return [
+            {
+                "name": replica.nome,
+                "healthy": replica.saudavel,
+                "latency_ms": round(replica.latencia_ms, 2) if replica.latencia_ms is not None else None,
+                "pool": estatisticas_pool(replica.engine),
+            }
+            for replica in self.replicas
+        ]
+
+
+roteador_replicas = RoteadorReplicas(DATABASE_REPLICA_URLS)
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _bloquear_escrita_em_replica(sessao, contexto, instancias) -> None:
+    if sessao.info.get("somente_leitura") and (sessao.new or sessao.dirty or sessao.deleted):
+        raise RuntimeError(f"Sessão somente leitura ({sessao.info.get('replica')}) não pode gravar")
+
+@event.listens_for(SessionLocal, "after_flush")
+def _marcar_escrita(sessao, contexto) -> None:
+    sessao.info["escreveu"] = True
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _marcar_escrita_em_massa(estado) -> None:
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        estado.session.info["escreveu"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _registrar_escrita_apos_commit(sessao) -> None:
+    if sessao.info.pop("escreveu", False):
+        roteador_replicas.registrar_escrita()
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_escrita(sessao) -> None:
+    sessao.info.pop("escreveu", None)
@@ -0,0 +1,141 @@
+"""
+Retenção de notificações: arquiva notificações lidas antigas em lotes
+
+Políticas por tipo de notificação (dias de retenção):
+- NOTIFICATION_RETENTION_DAYS: padrão para todos os tipos (90)
+- NOTIFICATION_RETENTION_POLICIES: exceções no formato "tipo:dias,tipo:dias"
+  (ex.: "payment:365,system:30"); dias <= 0 desativa a retenção do tipo
+- NOTIFICATION_ARCHIVE_BATCH_SIZE: notificações movidas por transação (1000)
+- NOTIFICATION_RETENTION_INTERVAL_HOURS: intervalo da execução periódica
+  iniciada junto com a aplicação (0 desativa; use o script
+  arquivar_notificacoes.py em um agendador externo)
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from dotenv import load_dotenv
+from app.models.arquivo_notificacao import NotificationArchive
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DIAS_RETENCAO_PADRAO = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+TAMANHO_LOTE_ARQUIVAMENTO = int(os.getenv("NOTIFICATION_ARCHIVE_BATCH_SIZE", "1000"))
+INTERVALO_RETENCAO_HORAS = float(os.getenv("NOTIFICATION_RETENTION_INTERVAL_HOURS", "0"))
+
+def carregar_politicas(valor: Optional[str] = None) -> Dict[str, int]:
+    """Ler políticas por tipo ("tipo:dias,tipo:dias")"""
+    if valor is None:
+        valor = os.getenv("NOTIFICATION_RETENTION_POLICIES", "")
+    politicas = {}
+    for item in valor.split(","):
+        if not item.strip():
+            continue
+        tipo, _, dias = item.partition(":")
+        politicas[tipo.strip()] = int(dias)
+    return politicas
+
+
+class ResultadoRetencao:
+    """Métricas de uma execução da retenção"""
+    
+    def __init__(self):
+        self.movidas: Dict[str, int] = {}
+        self.lotes = 0
+        self.segundos = 0.0
+        self.iniciado_em = datetime.now(timezone.utc)
+    
+    @property
+    def total_movidas(self) -> int:
+        return sum(self.movidas.values())
+    
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.iniciado_em.isoformat(),
+            "rows_moved": self.total_movidas,
+            "rows_moved_by_type": dict(self.movidas),
+            "batches": self.lotes,
+            "duration_seconds": round(self.segundos, 3)
+        }
+
+
+ultimo_resultado: Optional[ResultadoRetencao] = None
+
+def executar_retencao(
+    dias_padrao: Optional[int] = None,
+    politicas: Optional[Dict[str, int]] = None,
+    tamanho_lote: Optional[int] = None,
+    agora: Optional[datetime] = None
+) -> ResultadoRetencao:
+    """Arquivar notificações lidas mais antigas que a retenção de cada tipo"""
+    global ultimo_resultado
+    
+    dias_padrao = DIAS_RETENCAO_PADRAO if dias_padrao is None else dias_padrao
+    politicas = carregar_politicas() if politicas is None else politicas
+    tamanho_lote = tamanho_lote or TAMANHO_LOTE_ARQUIVAMENTO
+    agora = agora or datetime.now(timezone.utc)
+    
+    resultado = ResultadoRetencao()
+    inicio = time.perf_counter()
+    
+    # Tipos com política própria primeiro; o padrão cobre todos os demais
+    execucoes = [([tipo], None, dias, tipo) for tipo, dias in politicas.items()]
+    execucoes.append((None, list(politicas), dias_padrao, "*"))
+    
+    for tipos, excluir_tipos, dias, chave in execucoes:
+        if dias <= 0:
+            continue
+        limite_data = agora - timedelta(days=dias)
+        while True:
+            movidas = NotificationArchive.arquivar_lote(
+                limite_data, tamanho_lote, tipos=tipos, excluir_tipos=excluir_tipos
+            )
+            if not movidas:
+                break
+            resultado.lotes += 1
+            resultado.movidas[chave] = resultado.movidas.get(chave, 0) + movidas
+            if movidas < tamanho_lote:
+                break
+    
+    resultado.segundos = time.perf_counter() - inicio
+    ultimo_resultado = resultado
+    logger.info(
+        "Retenção de notificações: %s arquivadas em %s lote(s), %.2fs %s",
+        resultado.total_movidas, resultado.lotes, resultado.segundos, resultado.movidas
+    )
+    return resultado
+
+
+class AgendadorRetencao:
+    """Thread que executa a retenção periodicamente"""
+    
+    def __init__(self, intervalo_horas: float = INTERVALO_RETENCAO_HORAS):
+        self.intervalo_horas = intervalo_horas
+        self._parar = threading.Event()
+        self._thread = None
+    
+    def iniciar(self) -> None:
+        if self.intervalo_horas <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="retencao-notificacoes", daemon=True)
+        self._thread.start()
+    
+    def parar(self, timeout: float = 5.0) -> None:
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+    
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo_horas * 3600):
+            try:
+                executar_retencao()
+            except Exception:
+                logger.exception("Falha na retenção de notificações")
+
+
+agendador_retencao = AgendadorRetencao()
@@ -1,7 +1,7 @@
 """
 Schemas package - Todos os schemas Pydantic (Views)
 """
-from app.schemas.autenticacao import Token, TokenData, UserLogin, UserCreate, UserResponse
+from app.schemas.autenticacao import Token, TokenData, RefreshTokenRequest, UserLogin, UserCreate, UserResponse
 from app.schemas.especialidade import SpecialtyBase, SpecialtyResponse
 from app.schemas.abordagem import ApproachBase, ApproachResponse
 from app.schemas.psicologo import (
@@ -17,9 +17,10 @@ from app.schemas.forum import (
     ForumCommentCreate, ForumCommentResponse
 )
 from app.schemas.diario_emocional import (
-    EmotionDiaryCreate, EmotionDiaryUpdate, EmotionDiaryResponse
+    EmotionDiaryCreate, EmotionDiaryUpdate, EmotionDiaryResponse,
+    EmotionDiaryImportError, EmotionDiaryImportResult
 )
-from app.schemas.pagamento import PaymentCreate, PaymentResponse
+from app.schemas.pagamento import PaymentCreate, PaymentResponse, PaymentDetailResponse
 from app.schemas.metodo_pagamento import (
     PaymentMethodCreate, PaymentMethodUpdate, PaymentMethodResponse
 )
@@ -27,15 +28,18 @@ from app.schemas.disponibilidade import (
     PsychologistAvailabilityCreate, PsychologistAvailabilityUpdate,
     PsychologistAvailabilityResponse
 )
-from app.schemas.notificacao import NotificationResponse, NotificationUpdate
+from app.schemas.notificacao import NotificationResponse, NotificationUpdate, NotificationBatchRead
 from app.schemas.questionario import QuestionnaireCreate, QuestionnaireResponse
 from app.schemas.pre_registro import (
     PsychologistPreRegistrationCreate, PsychologistPreRegistrationResponse
 )
 from app.schemas.saque import WithdrawalCreate, WithdrawalResponse
 
+# PaymentDetailResponse referencia AppointmentResponse só como anotação (evita import circular)
+PaymentDetailResponse.model_rebuild(_types_namespace={"AppointmentResponse": AppointmentResponse})
+
 __all__ = [
-    "Token", "TokenData", "UserLogin", "UserCreate", "UserResponse",
+    "Token", "TokenData", "RefreshTokenRequest", "UserLogin", "UserCreate", "UserResponse",
     "SpecialtyBase", "SpecialtyResponse",
     "ApproachBase", "ApproachResponse",
     "PsychologistBase", "PsychologistCreate", "PsychologistUpdate",
@@ -47,11 +51,12 @@ __all__ = [
     "ForumPostCreate", "ForumPostUpdate", "ForumPostResponse",
     "ForumCommentCreate", "ForumCommentResponse",
     "EmotionDiaryCreate", "EmotionDiaryUpdate", "EmotionDiaryResponse",
-    "PaymentCreate", "PaymentResponse",
+    "EmotionDiaryImportError", "EmotionDiaryImportResult",
+    "PaymentCreate", "PaymentResponse", "PaymentDetailResponse",
     "PaymentMethodCreate", "PaymentMethodUpdate", "PaymentMethodResponse",
     "PsychologistAvailabilityCreate", "PsychologistAvailabilityUpdate",
     "PsychologistAvailabilityResponse",
-    "NotificationResponse", "NotificationUpdate",
+    "NotificationResponse", "NotificationUpdate", "NotificationBatchRead",
     "QuestionnaireCreate", "QuestionnaireResponse",
     "PsychologistPreRegistrationCreate", "PsychologistPreRegistrationResponse",
     "WithdrawalCreate", "WithdrawalResponse",
@@ -22,17 +22,17 @@ class AppointmentUpdate(BaseModel):
 
 class AppointmentResponse(BaseModel):
     id: int
-    psychologist_id: int = Field(alias="id_psicologo", serialization_alias="psychologist_id")
-    user_id: int = Field(alias="id_usuario", serialization_alias="user_id")
-    appointment_date: datetime = Field(alias="data_agendamento", serialization_alias="appointment_date")
-    appointment_type: str = Field(alias="tipo_agendamento", serialization_alias="appointment_type")
+    psychologist_id: int = Field(validation_alias="id_psicologo")
+    user_id: int = Field(validation_alias="id_usuario")
+    appointment_date: datetime = Field(validation_alias="data_agendamento")
+    appointment_type: str = Field(validation_alias="tipo_agendamento")
     status: str
-    rejection_reason: Optional[str] = Field(default=None, alias="motivo_recusa", serialization_alias="rejection_reason")
-    notes: Optional[str] = Field(default=None, alias="observacoes", serialization_alias="notes")
-    payment_status: Optional[str] = Field(default=None, alias="status_pagamento", serialization_alias="payment_status")
-    payment_id: Optional[str] = Field(default=None, alias="id_pagamento", serialization_alias="payment_id")
-    created_at: datetime = Field(alias="criado_em", serialization_alias="created_at")
-    updated_at: Optional[datetime] = Field(default=None, alias="atualizado_em", serialization_alias="updated_at")
+    rejection_reason: Optional[str] = Field(default=None, validation_alias="motivo_recusa")
+    notes: Optional[str] = Field(default=None, validation_alias="observacoes")
+    payment_status: Optional[str] = Field(default=None, validation_alias="status_pagamento")
+    payment_id: Optional[str] = Field(default=None, validation_alias="id_pagamento")
+    created_at: datetime = Field(validation_alias="criado_em")
+    updated_at: Optional[datetime] = Field(default=None, validation_alias="atualizado_em")
     psychologist: PsychologistListItem
     user: UserResponse
     
@@ -13,11 +13,11 @@ class ReviewCreate(BaseModel):
 
 class ReviewResponse(BaseModel):
     id: int
-    psychologist_id: int = Field(alias="id_psicologo", serialization_alias="psychologist_id")
-    user_id: int = Field(alias="id_usuario", serialization_alias="user_id")
-    rating: int = Field(alias="avaliacao", serialization_alias="rating")
-    comment: Optional[str] = Field(default=None, alias="comentario", serialization_alias="comment")
-    created_at: datetime = Field(alias="criado_em", serialization_alias="created_at")
+    psychologist_id: int = Field(validation_alias="id_psicologo")
+    user_id: int = Field(validation_alias="id_usuario")
+    rating: int = Field(validation_alias="avaliacao")
+    comment: Optional[str] = Field(default=None, validation_alias="comentario")
+    created_at: datetime = Field(validation_alias="criado_em")
     user: UserResponse
     
     class Config:
@@ -2,7 +2,7 @@
 Emotion Diary Schemas
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 class EmotionDiaryCreate(BaseModel):
@@ -21,16 +21,25 @@ class EmotionDiaryUpdate(BaseModel):
 
 class EmotionDiaryResponse(BaseModel):
     id: int
-    user_id: int = Field(alias="id_usuario", serialization_alias="user_id")
-    date: datetime = Field(alias="data", serialization_alias="date")
-    emotion: str = Field(alias="emocao", serialization_alias="emotion")
-    intensity: int = Field(alias="intensidade", serialization_alias="intensity")
-    notes: Optional[str] = Field(default=None, alias="notas", serialization_alias="notes")
-    tags: Optional[str] = Field(default=None, alias="tags", serialization_alias="tags")
-    created_at: datetime = Field(alias="criado_em", serialization_alias="created_at")
-    updated_at: Optional[datetime] = Field(default=None, alias="atualizado_em", serialization_alias="updated_at")
+    user_id: int = Field(validation_alias="id_usuario")
+    date: datetime = Field(validation_alias="data")
+    emotion: str = Field(validation_alias="emocao")
+    intensity: int = Field(validation_alias="intensidade")
+    notes: Optional[str] = Field(default=None, validation_alias="notas")
+    tags: Optional[str] = Field(default=None, validation_alias="tags")
+    created_at: datetime = Field(validation_alias="criado_em")
+    updated_at: Optional[datetime] = Field(default=None, validation_alias="atualizado_em")
     
     class Config:
         from_attributes = True
         populate_by_name = True
 
+
+class EmotionDiaryImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class EmotionDiaryImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[EmotionDiaryImportError] = []
@@ -18,13 +18,13 @@ class PsychologistAvailabilityUpdate(BaseModel):
 
 class PsychologistAvailabilityResponse(BaseModel):
     id: int
-    psychologist_id: int = Field(alias="id_psicologo")
-    day_of_week: int = Field(alias="dia_da_semana")
-    start_time: str = Field(alias="horario_inicio")
-    end_time: str = Field(alias="horario_fim")
-    is_available: bool = Field(alias="esta_disponivel")
-    created_at: datetime = Field(alias="criado_em")
-    updated_at: Optional[datetime] = Field(default=None, alias="atualizado_em")
+    psychologist_id: int = Field(validation_alias="id_psicologo")
+    day_of_week: int = Field(validation_alias="dia_da_semana")
+    start_time: str = Field(validation_alias="horario_inicio")
+    end_time: str = Field(validation_alias="horario_fim")
+    is_available: bool = Field(validation_alias="esta_disponivel")
+    created_at: datetime = Field(validation_alias="criado_em")
+    updated_at: Optional[datetime] = Field(default=None, validation_alias="atualizado_em")
     
     class Config:
         from_attributes = True
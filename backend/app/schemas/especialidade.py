@@ -5,8 +5,8 @@ from pydantic import BaseModel, Field
 from typing import Optional
 
 class SpecialtyBase(BaseModel):
-    name: str = Field(alias="nome")
-    description: Optional[str] = Field(default=None, alias="descricao")
+    name: str = Field(validation_alias="nome")
+    description: Optional[str] = Field(default=None, validation_alias="descricao")
     
     class Config:
         populate_by_name = True
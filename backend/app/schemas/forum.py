@@ -19,15 +19,15 @@ class ForumPostUpdate(BaseModel):
 
 class ForumPostResponse(BaseModel):
     id: int
-    user_id: int = Field(alias="id_usuario", serialization_alias="user_id")
-    title: str = Field(alias="titulo", serialization_alias="title")
-    content: str = Field(alias="conteudo", serialization_alias="content")
-    category: str = Field(alias="categoria", serialization_alias="category")
-    is_anonymous: bool = Field(alias="eh_anonimo", serialization_alias="is_anonymous")
-    views: int = Field(alias="visualizacoes", serialization_alias="views")
-    likes: int = Field(alias="curtidas", serialization_alias="likes")
-    created_at: datetime = Field(alias="criado_em", serialization_alias="created_at")
-    updated_at: Optional[datetime] = Field(default=None, alias="atualizado_em", serialization_alias="updated_at")
+    user_id: int = Field(validation_alias="id_usuario")
+    title: str = Field(validation_alias="titulo")
+    content: str = Field(validation_alias="conteudo")
+    category: str = Field(validation_alias="categoria")
+    is_anonymous: bool = Field(validation_alias="eh_anonimo")
+    views: int = Field(validation_alias="visualizacoes")
+    likes: int = Field(validation_alias="curtidas")
+    created_at: datetime = Field(validation_alias="criado_em")
+    updated_at: Optional[datetime] = Field(default=None, validation_alias="atualizado_em")
     user: Optional[UserResponse] = None
     comments_count: int = 0
     
@@ -65,16 +65,16 @@ class PaymentMethodUpdate(BaseModel):
 
 class PaymentMethodResponse(BaseModel):
     id: int
-    user_id: int = Field(alias="id_usuario")
-    card_type: str = Field(alias="tipo_cartao")
-    card_brand: Optional[str] = Field(alias="bandeira", default=None)
-    last_four_digits: str = Field(alias="ultimos_quatro_digitos")
-    card_holder: str = Field(alias="portador")
-    expiry_month: str = Field(alias="mes_validade")
-    expiry_year: str = Field(alias="ano_validade")
-    is_default: bool = Field(alias="eh_padrao")
-    created_at: datetime = Field(alias="criado_em")
-    updated_at: Optional[datetime] = Field(alias="atualizado_em", default=None)
+    user_id: int = Field(validation_alias="id_usuario")
+    card_type: str = Field(validation_alias="tipo_cartao")
+    card_brand: Optional[str] = Field(validation_alias="bandeira", default=None)
+    last_four_digits: str = Field(validation_alias="ultimos_quatro_digitos")
+    card_holder: str = Field(validation_alias="portador")
+    expiry_month: str = Field(validation_alias="mes_validade")
+    expiry_year: str = Field(validation_alias="ano_validade")
+    is_default: bool = Field(validation_alias="eh_padrao")
+    created_at: datetime = Field(validation_alias="criado_em")
+    updated_at: Optional[datetime] = Field(validation_alias="atualizado_em", default=None)
     
     class Config:
         from_attributes = True
@@ -1,24 +1,30 @@
 """
 Notification Schemas
 """
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List
 from datetime import datetime
 
 class NotificationResponse(BaseModel):
     id: int
-    user_id: int
-    title: str
-    message: str
-    type: str
-    is_read: bool
-    related_id: Optional[int]
-    related_type: Optional[str]
-    created_at: datetime
+    user_id: int = Field(validation_alias="id_usuario")
+    title: str = Field(validation_alias="titulo")
+    message: str = Field(validation_alias="mensagem")
+    type: str = Field(validation_alias="tipo")
+    is_read: bool = Field(default=False, validation_alias="foi_lida")
+    related_id: Optional[int] = Field(default=None, validation_alias="id_relacionado")
+    related_type: Optional[str] = Field(default=None, validation_alias="tipo_relacionado")
+    created_at: datetime = Field(validation_alias="criado_em")
     
     class Config:
         from_attributes = True
+        populate_by_name = True
 
 class NotificationUpdate(BaseModel):
     is_read: Optional[bool] = None
 
+# Máximo de IDs por requisição de marcação em lote (limita o IN/UPDATE gerado)
+MAXIMO_IDS_LOTE = 500
+
+class NotificationBatchRead(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAXIMO_IDS_LOTE)
@@ -18,18 +18,20 @@ class PaymentCreate(BaseModel):
 
 class PaymentResponse(BaseModel):
     id: int
-    appointment_id: int = Field(alias="id_agendamento", serialization_alias="appointment_id")
-    user_id: int = Field(alias="id_usuario", serialization_alias="user_id")
-    amount: float = Field(alias="valor", serialization_alias="amount")
-    payment_method: str = Field(alias="metodo_pagamento", serialization_alias="payment_method")
+    appointment_id: int = Field(validation_alias="id_agendamento")
+    user_id: int = Field(validation_alias="id_usuario")
+    amount: float = Field(validation_alias="valor")
+    payment_method: str = Field(validation_alias="metodo_pagamento")
     status: str
-    payment_id: str = Field(alias="id_pagamento", serialization_alias="payment_id")
-    transaction_id: Optional[str] = Field(default=None, alias="id_transacao", serialization_alias="transaction_id")
-    created_at: datetime = Field(alias="criado_em", serialization_alias="created_at")
-    updated_at: Optional[datetime] = Field(default=None, alias="atualizado_em", serialization_alias="updated_at")
-    appointment: Optional["AppointmentResponse"] = None
+    payment_id: str = Field(validation_alias="id_pagamento")
+    transaction_id: Optional[str] = Field(default=None, validation_alias="id_transacao")
+    created_at: datetime = Field(validation_alias="criado_em")
+    updated_at: Optional[datetime] = Field(default=None, validation_alias="atualizado_em")
     
     class Config:
         from_attributes = True
         populate_by_name = True
 
+class PaymentDetailResponse(PaymentResponse):
+    """Pagamento com o agendamento: só para consultas que carregam o relacionamento (listagens)"""
+    appointment: Optional["AppointmentResponse"] = None
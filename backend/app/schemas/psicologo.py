@@ -10,16 +10,16 @@ from app.schemas.abordagem import ApproachResponse
 
 class PsychologistBase(BaseModel):
     crp: str
-    bio: Optional[str] = Field(default=None, alias="biografia")
-    experience_years: int = Field(default=0, alias="anos_experiencia")
-    consultation_price: Optional[float] = Field(default=None, alias="preco_consulta")
-    online_consultation: bool = Field(default=True, alias="consulta_online")
-    in_person_consultation: bool = Field(default=False, alias="consulta_presencial")
-    address: Optional[str] = Field(default=None, alias="endereco")
-    city: Optional[str] = Field(default=None, alias="cidade")
-    state: Optional[str] = Field(default=None, alias="estado")
-    zip_code: Optional[str] = Field(default=None, alias="cep")
-    profile_picture: Optional[str] = Field(default=None, alias="foto_perfil")
+    bio: Optional[str] = Field(default=None, validation_alias="biografia")
+    experience_years: int = Field(default=0, validation_alias="anos_experiencia")
+    consultation_price: Optional[float] = Field(default=None, validation_alias="preco_consulta")
+    online_consultation: bool = Field(default=True, validation_alias="consulta_online")
+    in_person_consultation: bool = Field(default=False, validation_alias="consulta_presencial")
+    address: Optional[str] = Field(default=None, validation_alias="endereco")
+    city: Optional[str] = Field(default=None, validation_alias="cidade")
+    state: Optional[str] = Field(default=None, validation_alias="estado")
+    zip_code: Optional[str] = Field(default=None, validation_alias="cep")
+    profile_picture: Optional[str] = Field(default=None, validation_alias="foto_perfil")
     
     class Config:
         populate_by_name = True
@@ -55,11 +55,11 @@ class PsychologistUpdate(BaseModel):
 
 class PsychologistResponse(PsychologistBase):
     id: int
-    user_id: int = Field(alias="id_usuario")
-    rating: float = Field(alias="avaliacao")
-    total_reviews: int = Field(alias="total_avaliacoes")
-    is_verified: bool = Field(alias="esta_verificado")
-    created_at: datetime = Field(alias="criado_em")
+    user_id: int = Field(validation_alias="id_usuario")
+    rating: float = Field(validation_alias="avaliacao")
+    total_reviews: int = Field(validation_alias="total_avaliacoes")
+    is_verified: bool = Field(validation_alias="esta_verificado")
+    created_at: datetime = Field(validation_alias="criado_em")
     specialties: List[SpecialtyResponse] = []
     approaches: List[ApproachResponse] = []
     user: UserResponse
@@ -70,19 +70,19 @@ class PsychologistResponse(PsychologistBase):
 
 class PsychologistListItem(BaseModel):
     id: int
-    user_id: int = Field(alias="id_usuario")
+    user_id: int = Field(validation_alias="id_usuario")
     crp: str
-    bio: Optional[str] = Field(default=None, alias="biografia")
-    experience_years: int = Field(default=0, alias="anos_experiencia")
-    consultation_price: Optional[float] = Field(default=None, alias="preco_consulta")
-    online_consultation: bool = Field(default=True, alias="consulta_online")
-    in_person_consultation: bool = Field(default=False, alias="consulta_presencial")
-    city: Optional[str] = Field(default=None, alias="cidade")
-    state: Optional[str] = Field(default=None, alias="estado")
-    profile_picture: Optional[str] = Field(default=None, alias="foto_perfil")
-    rating: float = Field(default=0.0, alias="avaliacao")
-    total_reviews: int = Field(default=0, alias="total_avaliacoes")
-    is_verified: bool = Field(default=False, alias="esta_verificado")
+    bio: Optional[str] = Field(default=None, validation_alias="biografia")
+    experience_years: int = Field(default=0, validation_alias="anos_experiencia")
+    consultation_price: Optional[float] = Field(default=None, validation_alias="preco_consulta")
+    online_consultation: bool = Field(default=True, validation_alias="consulta_online")
+    in_person_consultation: bool = Field(default=False, validation_alias="consulta_presencial")
+    city: Optional[str] = Field(default=None, validation_alias="cidade")
+    state: Optional[str] = Field(default=None, validation_alias="estado")
+    profile_picture: Optional[str] = Field(default=None, validation_alias="foto_perfil")
+    rating: float = Field(default=0.0, validation_alias="avaliacao")
+    total_reviews: int = Field(default=0, validation_alias="total_avaliacoes")
+    is_verified: bool = Field(default=False, validation_alias="esta_verificado")
     user: UserResponse
     specialties: List[SpecialtyResponse] = []
     approaches: List[ApproachResponse] = []
@@ -1,7 +1,7 @@
 """
 Withdrawal Schemas
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -14,18 +14,18 @@ class WithdrawalCreate(BaseModel):
 
 class WithdrawalResponse(BaseModel):
     id: int
-    psychologist_id: int
-    amount: float
-    bank_name: str
-    bank_account: str
-    bank_agency: str
-    account_type: str
+    psychologist_id: int = Field(validation_alias="id_psicologo")
+    amount: float = Field(validation_alias="valor")
+    bank_name: str = Field(validation_alias="nome_banco")
+    bank_account: str = Field(validation_alias="conta_bancaria")
+    bank_agency: str = Field(validation_alias="agencia")
+    account_type: str = Field(validation_alias="tipo_conta")
     status: str
-    rejection_reason: Optional[str]
-    processed_at: Optional[datetime]
-    created_at: datetime
-    updated_at: Optional[datetime]
+    rejection_reason: Optional[str] = Field(default=None, validation_alias="motivo_recusa")
+    processed_at: Optional[datetime] = Field(default=None, validation_alias="processado_em")
+    created_at: datetime = Field(validation_alias="criado_em")
+    updated_at: Optional[datetime] = Field(default=None, validation_alias="atualizado_em")
     
     class Config:
         from_attributes = True
-
+        populate_by_name = True
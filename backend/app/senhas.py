@@ -0,0 +1,42 @@
+"""
+Hash e verificação de senhas com bcrypt
+
+Módulo sem dependências do restante da aplicação para poder ser importado
+rapidamente pelos processos do pool de senhas (app/pool_senhas.py).
+"""
+import os
+import bcrypt
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+def _para_bytes(valor) -> bytes:
+    """Converter para bytes, respeitando o limite de 72 bytes do bcrypt"""
+    if isinstance(valor, str):
+        valor = valor.encode('utf-8')
+    return valor[:72]
+
+def verificar_senha(senha, senha_hash) -> bool:
+    """Verifica se a senha corresponde ao hash"""
+    try:
+        if isinstance(senha_hash, str):
+            senha_hash = senha_hash.encode('utf-8')
+        return bcrypt.checkpw(_para_bytes(senha), senha_hash)
+    except Exception:
+        return False
+
+def gerar_hash_senha(senha, rounds: Optional[int] = None) -> str:
+    """Gera hash da senha com o custo configurado"""
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_para_bytes(senha), salt).decode('utf-8')
+
+def precisa_rehash(senha_hash: str, rounds: Optional[int] = None) -> bool:
+    """Indica se o hash foi gerado com um custo diferente do configurado"""
+    try:
+        # Formato: $2b$<custo>$<salt+hash>
+        return int(senha_hash.split("$")[2]) != (rounds or BCRYPT_ROUNDS)
+    except (AttributeError, IndexError, ValueError):
+        return False
@@ -0,0 +1,70 @@
+"""
+Serialização de respostas JSON
+
+- RespostaJson: classe de resposta padrão da aplicação, codificada com orjson
+  (usada quando o endpoint retorna dicts/listas sem response_model)
+- serializar / resposta_json: validam objetos ORM com um TypeAdapter em cache
+  e geram os bytes JSON direto no núcleo em Rust do Pydantic, sem montar um
+  dict intermediário nem passar pelo json da biblioteca padrão
+
+Os schemas de resposta usam validation_alias para ler os atributos em
+português dos models, então a saída sempre usa os nomes dos campos (inglês).
+Endpoints com response_model já seguem esse caminho pelo próprio FastAPI.
+"""
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List, Optional
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def _padrao(valor: Any) -> Any:
+    """Tipos que o orjson não serializa nativamente"""
+    if isinstance(valor, BaseModel):
+        return valor.model_dump(mode="json")
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (set, frozenset, tuple)):
+        return list(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+class RespostaJson(JSONResponse):
+    """JSONResponse codificada com orjson"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_padrao, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def adaptador(tipo: Any) -> TypeAdapter:
+    """TypeAdapter reaproveitado entre requisições (construí-lo é caro)"""
+    return TypeAdapter(tipo)
+
+def serializar(schema: Any, objeto: Any, lista: bool = False) -> bytes:
+    """Validar objeto(s) ORM contra o schema e gerar os bytes JSON"""
+    tipo = List[schema] if lista else schema
+    tipo_adaptador = adaptador(tipo)
+    return tipo_adaptador.dump_json(tipo_adaptador.validate_python(objeto, from_attributes=True))
+
+def para_dict(schema: Any, objeto: Any, lista: bool = False) -> Any:
+    """Como serializar(), mas retornando tipos JSON do Python para compor respostas"""
+    tipo = List[schema] if lista else schema
+    tipo_adaptador = adaptador(tipo)
+    return tipo_adaptador.dump_python(tipo_adaptador.validate_python(objeto, from_attributes=True), mode="json")
+
+def resposta_json(
+    schema: Any,
+    objeto: Any,
+    lista: bool = False,
+    status_code: int = 200,
+    headers: Optional[dict] = None
+) -> Response:
+    """Resposta com o JSON já serializado pelo schema"""
+    return Response(
+        content=serializar(schema, objeto, lista=lista),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers
+    )
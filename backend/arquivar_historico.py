@@ -0,0 +1,19 @@
+"""
+Script para arquivar agendamentos encerrados antigos e os pagamentos deles
+Uso: python arquivar_historico.py [--meses 12] [--lote 500]
+"""
+import argparse
+import json
+from app.arquivamento_historico import executar_arquivamento
+
+def main():
+    parser = argparse.ArgumentParser(description="Arquivar agendamentos encerrados antigos e seus pagamentos")
+    parser.add_argument("--meses", type=int, default=None, help="Idade mínima em meses dos agendamentos arquivados")
+    parser.add_argument("--lote", type=int, default=None, help="Agendamentos movidos por transação")
+    args = parser.parse_args()
+    
+    resultado = executar_arquivamento(meses=args.meses, tamanho_lote=args.lote)
+    print(json.dumps(resultado.to_dict(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Script para arquivar notificações lidas antigas (retenção)
+Uso: python arquivar_notificacoes.py [--dias 90] [--politicas "payment:365,system:30"] [--lote 1000]
+"""
+import argparse
+import json
+from app.retencao_notificacoes import executar_retencao, carregar_politicas
+
+def main():
+    parser = argparse.ArgumentParser(description="Arquivar notificações lidas antigas")
+    parser.add_argument("--dias", type=int, default=None, help="Retenção padrão em dias")
+    parser.add_argument("--politicas", default=None, help='Retenção por tipo, ex.: "payment:365,system:30"')
+    parser.add_argument("--lote", type=int, default=None, help="Notificações movidas por transação")
+    args = parser.parse_args()
+    
+    politicas = carregar_politicas(args.politicas) if args.politicas is not None else None
+    resultado = executar_retencao(dias_padrao=args.dias, politicas=politicas, tamanho_lote=args.lote)
+    print(json.dumps(resultado.to_dict(), indent=2))
+
+if __name__ == "__main__":
+    main()
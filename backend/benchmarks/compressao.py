@@ -0,0 +1,169 @@
+"""
+Benchmark de compressão de respostas (app/compressao.py)
+
+Popula um banco SQLite temporário e mede, por endpoint:
+- bytes trafegados sem compressão, com gzip e com brotli (se instalado),
+  contados no corpo recebido pelo cliente (antes de descomprimir)
+- custo de CPU da compressão por resposta (time.process_time, média de N
+  repetições sobre o corpo sem compressão) para cada nível configurado
+
+Uso (a partir de backend/):
+
+    python benchmarks/compressao.py
+    python benchmarks/compressao.py --psicologos 300 --entradas-diario 20000 --repeticoes 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+_BANCO = tempfile.mktemp(suffix=".db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_BANCO}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("PASSWORD_POOL_KIND", "thread")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.compressao import algoritmos_disponiveis, comprimir
+from app.database import get_db_session
+from app.models import User, Psychologist, Specialty, Approach, PsychologistAvailability, EmotionDiary
+
+EMOCOES = ["feliz", "triste", "ansioso", "irritado", "calmo"]
+
+
+def popular(total_psicologos: int, total_entradas: int) -> dict:
+    """Psicólogos verificados com especialidades, abordagens e agenda; um paciente com diário"""
+    db = get_db_session()
+    try:
+        especialidades = [Specialty(nome=f"Especialidade {i}", descricao="Atendimento clínico " * 4) for i in range(30)]
+        abordagens = [Approach(nome=f"Abordagem {i}", descricao="Abordagem terapêutica " * 4) for i in range(15)]
+        db.add_all(especialidades + abordagens)
+        db.flush()
+        for i in range(total_psicologos):
+            usuario = User(
+                email=f"psicologo{i}@bench.local", senha_hash="x",
+                nome_completo=f"Psicólogo Benchmark {i}", eh_psicologo=True
+            )
+            db.add(usuario)
+            db.flush()
+            psicologo = Psychologist(
+                id_usuario=usuario.id, crp=f"06/{100000 + i}",
+                biografia="Atendimento humanizado com foco em ansiedade e depressão. " * 3,
+                anos_experiencia=i % 30, preco_consulta=150.0 + i % 100,
+                cidade="São Paulo", estado="SP", esta_verificado=True, avaliacao=4.5
+            )
+            psicologo.specialties = especialidades[i % 30:i % 30 + 3]
+            psicologo.approaches = abordagens[i % 15:i % 15 + 2]
+            db.add(psicologo)
+        db.flush()
+        primeiro = db.query(Psychologist).order_by(Psychologist.id).first()
+        db.add_all(
+            PsychologistAvailability(id_psicologo=primeiro.id, dia_da_semana=dia, horario_inicio="08:00", horario_fim="20:00")
+            for dia in range(7)
+        )
+        paciente = User(email="paciente@bench.local", senha_hash="x", nome_completo="Paciente Benchmark")
+        db.add(paciente)
+        db.commit()
+        id_psicologo, id_paciente = primeiro.id, paciente.id
+    finally:
+        db.close()
+    
+    inicio = datetime.now(timezone.utc) - timedelta(days=total_entradas)
+    EmotionDiary.criar_em_lote(id_paciente, [
+        {
+            "data": inicio + timedelta(hours=i),
+            "emocao": EMOCOES[i % 5],
+            "intensidade": i % 10 + 1,
+            "notas": "Dia com altos e baixos, conversei com a família.",
+            "tags": "trabalho,família"
+        }
+        for i in range(total_entradas)
+    ])
+    return {"psicologo": id_psicologo, "paciente": id_paciente}
+
+def autenticar(cliente: TestClient, id_paciente: int) -> dict:
+    """Token de acesso do paciente do benchmark (senha definida pelo fluxo normal)"""
+    from app.auth import get_password_hash
+    User.obter_por_id(id_paciente).atualizar(senha_hash=get_password_hash("senha123"))
+    resposta = cliente.post("/api/auth/login", data={"username": "paciente@bench.local", "password": "senha123"})
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+def bytes_trafegados(cliente: TestClient, url: str, codificacao: str, **kwargs) -> tuple:
+    """(bytes no corpo recebido, Content-Encoding, corpo descomprimido)"""
+    cabecalhos = {**kwargs.pop("headers", {}), "Accept-Encoding": codificacao}
+    with cliente.stream("GET", url, headers=cabecalhos, **kwargs) as resposta:
+        brutos = sum(len(pedaco) for pedaco in resposta.iter_raw())
+        return brutos, resposta.headers.get("content-encoding", "-"), resposta.headers.get("content-type", "")
+
+def corpo_sem_compressao(cliente: TestClient, url: str, **kwargs) -> bytes:
+    cabecalhos = {**kwargs.pop("headers", {}), "Accept-Encoding": "identity"}
+    return cliente.get(url, headers=cabecalhos, **kwargs).content
+
+def custo_cpu(corpo: bytes, codificacao: str, repeticoes: int, **opcoes) -> float:
+    """Milissegundos de CPU por resposta"""
+    inicio = time.process_time()
+    for _ in range(repeticoes):
+        comprimir(corpo, codificacao, **opcoes)
+    return (time.process_time() - inicio) * 1000 / repeticoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--psicologos", type=int, default=100)
+    parser.add_argument("--entradas-diario", type=int, default=5000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+    
+    algoritmos = algoritmos_disponiveis()
+    print(f"Algoritmos disponíveis: {', '.join(algoritmos)}")
+    try:
+        with TestClient(app) as cliente:
+            ids = popular(args.psicologos, args.entradas_diario)
+            auth = autenticar(cliente, ids["paciente"])
+            hoje = date.today()
+            endpoints = [
+                ("busca (100/página)", "/api/search/psychologists", {"params": {"tamanho_pagina": 100}}),
+                ("psicólogos (limite 100)", "/api/psychologists/", {"params": {"limite": 100}}),
+                ("horários livres (90 dias)", f"/api/availability/psychologist/{ids['psicologo']}/available-slots", {
+                    "params": {"start_date": hoje.isoformat(), "end_date": (hoje + timedelta(days=90)).isoformat()}
+                }),
+                ("especialidades", "/api/search/specialties", {}),
+                ("exportação diário jsonl (stream)", "/api/emotion-diary/export", {"params": {"formato": "jsonl"}, "headers": auth}),
+                ("exportação diário csv (stream)", "/api/emotion-diary/export", {"params": {"formato": "csv"}, "headers": auth}),
+            ]
+            
+            print(f"\n{'endpoint':<34} {'identity':>10} " + " ".join(f"{a:>10} {'razão':>6}" for a in algoritmos))
+            corpos = {}
+            for nome, url, kwargs in endpoints:
+                corpo = corpo_sem_compressao(cliente, url, **kwargs)
+                corpos[nome] = corpo
+                colunas = []
+                for algoritmo in algoritmos:
+                    brutos, codificacao, _ = bytes_trafegados(cliente, url, algoritmo, **kwargs)
+                    marca = "" if codificacao == algoritmo else "*"
+                    colunas.append(f"{brutos:>9}{marca or ' '} {brutos / max(len(corpo), 1):>6.2f}")
+                print(f"{nome:<34} {len(corpo):>10} " + " ".join(colunas))
+            print("(* = resposta não comprimida: abaixo de COMPRESSION_MIN_SIZE ou tipo ignorado)")
+            
+            variantes = [("gzip", {"nivel_gzip": nivel}, f"gzip-{nivel}") for nivel in (1, 6, 9)]
+            if "br" in algoritmos:
+                variantes += [("br", {"qualidade_brotli": qualidade}, f"br-{qualidade}") for qualidade in (1, 4, 11)]
+            print(f"\nCPU por resposta em ms (média de {args.repeticoes}) e bytes comprimidos")
+            print(f"{'endpoint':<34} " + " ".join(f"{rotulo:>18}" for _, _, rotulo in variantes))
+            for nome, corpo in corpos.items():
+                colunas = []
+                for algoritmo, opcoes, _ in variantes:
+                    ms = custo_cpu(corpo, algoritmo, args.repeticoes, **opcoes)
+                    tamanho = len(comprimir(corpo, algoritmo, **opcoes))
+                    colunas.append(f"{ms:>8.2f} {tamanho:>9}")
+                print(f"{nome:<34} " + " ".join(colunas))
+    finally:
+        if os.path.exists(_BANCO):
+            os.remove(_BANCO)
+
+
+if __name__ == "__main__":
+    main()
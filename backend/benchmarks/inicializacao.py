@@ -0,0 +1,90 @@
+"""
+Benchmark de cold start da aplicação
+
+Cada medição roda em um processo Python novo (como um worker recém-criado
+pelo autoscaling) e separa as fases:
+- import: `import app.main` (FastAPI, middlewares, engine)
+- startup: lifespan (schema conforme SCHEMA_CHECK, import de models e
+  controllers, registro das rotas, dados de referência, serviços)
+- primeira requisição: GET /api/search/specialties
+
+Os modos create, check e skip de SCHEMA_CHECK são comparados sobre um banco
+SQLite temporário já criado.
+
+Uso (a partir de backend/):
+
+    python benchmarks/inicializacao.py
+    python benchmarks/inicializacao.py --repeticoes 10 --modos skip,create
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Script executado no processo filho: imprime os tempos de cada fase em JSON
+_MEDICAO = """
+import json, time
+inicio = time.perf_counter()
+from app.main import app
+importado = time.perf_counter()
+from fastapi.testclient import TestClient
+cliente = TestClient(app)
+cliente.__enter__()
+iniciado = time.perf_counter()
+resposta = cliente.get("/api/search/specialties")
+respondido = time.perf_counter()
+assert resposta.status_code == 200, resposta.text
+cliente.__exit__(None, None, None)
+print(json.dumps({
+    "import": importado - inicio,
+    "startup": iniciado - importado,
+    "primeira_requisicao": respondido - iniciado,
+}))
+"""
+
+
+def medir(modo: str, banco: str) -> dict:
+    ambiente = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{banco}",
+        "SCHEMA_CHECK": modo,
+        "LOG_LEVEL": "WARNING",
+        "PASSWORD_POOL_KIND": "thread",
+    }
+    saida = subprocess.run(
+        [sys.executable, "-c", _MEDICAO], cwd=BACKEND, env=ambiente,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--modos", default="create,check,skip")
+    args = parser.parse_args()
+    
+    banco = tempfile.mktemp(suffix=".db")
+    try:
+        # Primeiro processo cria o schema usado por todos os modos
+        medir("create", banco)
+        fases = ("import", "startup", "primeira_requisicao")
+        print(f"{'SCHEMA_CHECK':<14}" + "".join(f"{fase + ' (ms)':>26}" for fase in fases) + f"{'total (ms)':>14}")
+        for modo in args.modos.split(","):
+            medicoes = [medir(modo, banco) for _ in range(args.repeticoes)]
+            medianas = {fase: statistics.median(m[fase] for m in medicoes) * 1000 for fase in fases}
+            total = statistics.median(sum(m.values()) for m in medicoes) * 1000
+            print(f"{modo:<14}" + "".join(f"{medianas[fase]:>26.1f}" for fase in fases) + f"{total:>14.1f}")
+        print(f"(mediana de {args.repeticoes} processos por modo)")
+    finally:
+        if os.path.exists(banco):
+            os.remove(banco)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Configuração dos testes: banco SQLite temporário no lugar do lumine.db
+
+As variáveis são definidas antes de qualquer import de app.* (load_dotenv não
+sobrescreve variáveis já presentes no ambiente).
+"""
+import os
+import tempfile
+
+_diretorio = tempfile.mkdtemp(prefix="lumine-testes-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_diretorio, 'testes.db')}"
+os.environ["DATABASE_REPLICA_URLS"] = ""
@@ -0,0 +1,113 @@
+"""
+Índices compostos (alembic/versions/008_add_composite_indexes.py)
+
+Cada consulta quente dos models é compilada para SQLite e passada por EXPLAIN
+QUERY PLAN: o plano precisa usar o índice criado para ela. Pega índices
+esquecidos no __table_args__ e índices novos que "roubam" o plano (foi assim
+que ix_appointments_status_date tomou a listagem do usuário, ver migration 013).
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+
+import app.models  # registra todas as tabelas no metadata
+from app.database import Base
+from app.models.agendamento import Appointment
+from app.models.avaliacao import Review
+from app.models.comentario_forum import ForumComment
+from app.models.diario_emocional import EmotionDiary
+from app.models.especialidade import Specialty
+from app.models.notificacao import Notification
+from app.models.pagamento import Payment
+from app.models.psicologo import Psychologist
+from app.models.tabelas_associacao import favorites
+from app.models.tratamento import Approach
+
+INICIO = datetime(2026, 1, 1)
+FIM = datetime(2026, 2, 1)
+
+# (índice esperado, consulta) - mesmos filtros e ordenação dos métodos dos models
+CONSULTAS = [
+    (
+        "ix_appointments_psychologist_id_date_status",
+        select(Appointment).where(
+            Appointment.id_psicologo == 1,
+            Appointment.data_agendamento >= INICIO,
+            Appointment.data_agendamento < FIM,
+            Appointment.status.in_(["pending", "confirmed"])
+        )
+    ),
+    (
+        "ix_appointments_user_id_status_date",
+        select(Appointment).where(Appointment.id_usuario == 1, Appointment.status == "pending")
+        .order_by(Appointment.data_agendamento.desc())
+    ),
+    (
+        "ix_notifications_user_id_is_read_created_at",
+        select(Notification).where(Notification.id_usuario == 1, Notification.filtro_nao_lidas())
+        .order_by(Notification.criado_em.desc())
+    ),
+    (
+        "ix_reviews_psychologist_id_created_at",
+        select(Review).where(Review.id_psicologo == 1).order_by(Review.criado_em.desc())
+    ),
+    (
+        "ix_emotion_diaries_user_id_date",
+        select(EmotionDiary).where(
+            EmotionDiary.id_usuario == 1, EmotionDiary.data >= INICIO, EmotionDiary.data <= FIM
+        ).order_by(EmotionDiary.data.desc())
+    ),
+    (
+        "ix_forum_comments_post_id_created_at",
+        select(ForumComment).where(ForumComment.id_post == 1).order_by(ForumComment.criado_em)
+    ),
+    (
+        "ix_payments_appointment_id",
+        select(Payment).where(Payment.id_agendamento == 1)
+    ),
+    (
+        "ix_psychologists_is_verified_rating",
+        select(Psychologist).where(Psychologist.esta_verificado == True).order_by(Psychologist.avaliacao.desc())
+    ),
+    (
+        "ix_favorites_psychologist_id",
+        select(favorites).where(favorites.c.psychologist_id == 1)
+    ),
+    (
+        "ix_psychologist_specialties_psychologist_id_specialty_id",
+        select(Specialty).join(Specialty.psychologists).where(Psychologist.id == 1)
+    ),
+    (
+        "ix_psychologist_specialties_specialty_id_psychologist_id",
+        select(Psychologist).join(Psychologist.specialties).where(Specialty.id.in_([1, 2]))
+    ),
+    (
+        "ix_psychologist_approaches_psychologist_id_approach_id",
+        select(Approach).join(Approach.psychologists).where(Psychologist.id == 1)
+    ),
+    (
+        "ix_psychologist_approaches_approach_id_psychologist_id",
+        select(Psychologist).join(Psychologist.approaches).where(Approach.id.in_([1, 2]))
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def plano(engine, consulta) -> str:
+    sql = str(consulta.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conexao:
+        return "\n".join(linha[3] for linha in conexao.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+@pytest.mark.parametrize("indice, consulta", CONSULTAS, ids=[indice for indice, _ in CONSULTAS])
+def test_consulta_usa_indice(engine, indice, consulta):
+    resultado = plano(engine, consulta)
+    assert f"INDEX {indice} " in resultado, resultado
@@ -0,0 +1,127 @@
+"""
+Roteamento de leituras para réplicas (app/replicas.py)
+
+As "réplicas" são dois arquivos SQLite com uma tabela origem que diz de qual
+banco a leitura veio; o principal é o banco temporário dos testes.
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+import app.models  # registra todas as tabelas no metadata
+from app import database, replicas
+from app.database import Base, SessionLocal, engine, get_db_session
+from app.models.versao_recurso import ResourceVersion
+from app.replicas import RoteadorReplicas, definir_usuario_atual
+
+
+def criar_banco(caminho, nome: str) -> str:
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("CREATE TABLE origem (nome TEXT)")
+    conexao.execute("INSERT INTO origem VALUES (?)", (nome,))
+    conexao.commit()
+    conexao.close()
+    return f"sqlite:///{caminho}"
+
+
+def origem(sessao) -> str:
+    try:
+        return sessao.execute(text("SELECT nome FROM origem")).scalar()
+    finally:
+        sessao.close()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def principal():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conexao:
+        conexao.execute(text("CREATE TABLE IF NOT EXISTS origem (nome TEXT)"))
+        conexao.execute(text("DELETE FROM origem"))
+        conexao.execute(text("INSERT INTO origem VALUES ('principal')"))
+
+
+@pytest.fixture
+def roteador(tmp_path, monkeypatch):
+    """Roteador com duas réplicas, no lugar do global (get_db_session e hooks de commit)"""
+    urls = [criar_banco(tmp_path / f"{nome}.db", nome) for nome in ("replica-a", "replica-b")]
+    roteador = RoteadorReplicas(urls)
+    monkeypatch.setattr(replicas, "roteador_replicas", roteador)
+    monkeypatch.setattr(database, "DATABASE_REPLICA_URLS", urls)
+    definir_usuario_atual(None)
+    yield roteador
+    definir_usuario_atual(None)
+    for replica in roteador.replicas:
+        replica.engine.dispose()
+
+
+def test_leituras_em_rodizio(roteador):
+    lidas = [origem(get_db_session(somente_leitura=True)) for _ in range(4)]
+    assert lidas == ["replica-a", "replica-b", "replica-a", "replica-b"]
+
+
+def test_escrita_continua_no_principal(roteador):
+    assert origem(get_db_session()) == "principal"
+
+
+def test_replica_com_falha_sai_do_rodizio(roteador, tmp_path):
+    # Diretório inexistente: a conexão falha no SELECT 1 da verificação
+    roteador.replicas[1].engine.dispose()
+    roteador.replicas[1].engine = database.criar_engine(f"sqlite:///{tmp_path / 'nao-existe' / 'replica-b.db'}")
+    roteador.verificar()
+    
+    assert [replica.saudavel for replica in roteador.replicas] == [True, False]
+    assert roteador.replicas[1].latencia_ms is None
+    assert [origem(roteador.sessao_leitura()) for _ in range(3)] == ["replica-a"] * 3
+
+
+def test_sem_replica_saudavel_le_do_principal(roteador):
+    for replica in roteador.replicas:
+        replica.saudavel = False
+    sessao = roteador.sessao_leitura()
+    assert "replica" not in sessao.info
+    assert origem(sessao) == "principal"
+
+
+def test_usuario_le_do_principal_apos_escrever(roteador, monkeypatch):
+    definir_usuario_atual(42)
+    assert origem(roteador.sessao_leitura()) != "principal"
+    
+    db = SessionLocal()
+    try:
+        db.add(ResourceVersion(chave="teste-replicas", versao=1))
+        db.commit()
+    finally:
+        db.close()
+    
+    # Read-your-writes: o usuário que escreveu lê do principal...
+    assert [origem(get_db_session(somente_leitura=True)) for _ in range(3)] == ["principal"] * 3
+    # ... os demais continuam nas réplicas
+    definir_usuario_atual(7)
+    assert origem(get_db_session(somente_leitura=True)).startswith("replica-")
+    # ... e só até o fim da janela REPLICA_STICKY_SECONDS
+    definir_usuario_atual(42)
+    monkeypatch.setattr(replicas, "REPLICA_STICKY_SECONDS", 0)
+    assert origem(get_db_session(somente_leitura=True)).startswith("replica-")
+
+
+def test_rollback_nao_prende_usuario_no_principal(roteador):
+    definir_usuario_atual(43)
+    db = SessionLocal()
+    try:
+        db.add(ResourceVersion(chave="teste-rollback", versao=1))
+        db.flush()
+        db.rollback()
+    finally:
+        db.close()
+    assert origem(roteador.sessao_leitura()).startswith("replica-")
+
+
+def test_sessao_de_replica_nao_grava(roteador):
+    sessao = roteador.sessao_leitura()
+    try:
+        sessao.add(ResourceVersion(chave="teste-somente-leitura", versao=1))
+        with pytest.raises(RuntimeError, match="somente leitura"):
+            sessao.flush()
+    finally:
+        sessao.close()